@@ -5,51 +5,85 @@ Simple, clean REST API for the neural engine.
 
 Endpoints:
     POST /api/v1/goals      - Process a goal
+    POST /api/v1/goals:batch - Process many goals, results streamed as Server-Sent-Events
     POST /api/v1/chat       - Chat-style interaction
+    POST /api/v1/chat/stream - Chat with Server-Sent-Events token streaming
     GET  /api/v1/health     - Health check
     GET  /api/v1/tools      - List available tools
+    GET  /api/v1/metrics    - Cache counters, LLM backend state and other runtime metrics
+
+Goal endpoints take an optional X-Goal-Timeout header (seconds): the
+goal is cut off after it, and optional stages are skipped near the end.
 
 Usage:
     uvicorn neural_engine.v2.api:app --host 0.0.0.0 --port 8000
 """
 
 import os
+import json
+import time
 import asyncio
 from datetime import datetime, timezone
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Literal
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
-from .core import Config, Orchestrator, EventBus
+from .core import Config, Orchestrator, EventBus, LLMClient, CancelToken, ThoughtCompactor, metrics
 
 
 # =============================================================================
 # Request/Response Models
 # =============================================================================
 
+OutputMode = Literal["raw", "structured", "rendered", "llm"]
+
+
 class GoalRequest(BaseModel):
     """Request to process a goal."""
     goal: str = Field(..., description="The goal/task to accomplish", min_length=1)
     context: Optional[Dict[str, Any]] = Field(None, description="Additional context")
+    output_mode: Optional[OutputMode] = Field(None, description="How a tool result is returned (default: server's)")
 
 
 class GoalResponse(BaseModel):
     """Response from goal processing."""
     goal_id: str
-    status: str  # completed, failed
+    status: str  # completed, failed, cancelled
     goal: str
     intent: Optional[str] = None
     result: Optional[str] = None
+    data: Optional[Any] = None  # Tool result object (structured output mode)
+    output_mode: Optional[str] = None
+    dropped_stages: List[str] = []  # Optional stages skipped to meet the deadline
     error: Optional[str] = None
     duration_ms: Optional[int] = None
 
 
+# Most goals one batch request may carry
+MAX_BATCH_GOALS = 1000
+
+
+class BatchGoalRequest(BaseModel):
+    """Request to process many goals."""
+    goals: List[str] = Field(..., description="Goals to accomplish", min_length=1, max_length=MAX_BATCH_GOALS)
+    concurrency: Optional[int] = Field(None, description="Goals run at once (default: server's)", ge=1)
+    output_mode: Optional[OutputMode] = Field(None, description="How a tool result is returned (default: server's)")
+
+
+class BatchGoalResult(GoalResponse):
+    """One goal's result in a batch."""
+    index: int  # Position in the request's goals
+    coalesced: bool = False  # Shared the run of an identical goal
+
+
 class ChatRequest(BaseModel):
     """Chat-style request."""
     message: str = Field(..., description="User message", min_length=1)
+    output_mode: Optional[OutputMode] = Field(None, description="How a tool result is returned (default: server's)")
 
 
 class ChatResponse(BaseModel):
@@ -91,13 +125,23 @@ async def lifespan(app: FastAPI):
     _config = Config.from_env()
     _orchestrator = await Orchestrator.from_config(_config)
     
+    compactor = None
+    if _config.thought_archive:
+        compactor = ThoughtCompactor.from_config(_config, _orchestrator.thought_tree)
+        compactor.start()
+    
     print(f"🧠 Neural Engine v2 API started")
-    print(f"   LLM: {_config.llm_base_url}")
+    print(f"   LLM: {', '.join(_config.llm_base_urls) or _config.llm_base_url}")
     print(f"   Redis: {_config.redis_host}:{_config.redis_port}")
     
     yield
     
     # Shutdown
+    if compactor:
+        await compactor.stop()
+    if _config.get_telemetry():
+        await _config.get_telemetry().close()
+    await LLMClient.close_all()
     print("🧠 Neural Engine v2 API stopped")
 
 
@@ -118,6 +162,51 @@ app.add_middleware(
 )
 
 
+# Seconds between client-disconnect checks while a goal runs
+DISCONNECT_POLL_INTERVAL = 0.5
+
+# Request header with the goal's time budget in seconds
+TIMEOUT_HEADER = "X-Goal-Timeout"
+
+
+def _deadline(http_request: Request) -> Optional[float]:
+    """time.monotonic() deadline from the X-Goal-Timeout header (None if absent)."""
+    value = http_request.headers.get(TIMEOUT_HEADER)
+    if value is None:
+        return None
+    try:
+        timeout = float(value)
+    except ValueError:
+        timeout = 0.0
+    if timeout <= 0:
+        raise HTTPException(status_code=400, detail=f"{TIMEOUT_HEADER} must be a positive number of seconds")
+    return time.monotonic() + timeout
+
+
+async def _process_while_connected(http_request: Request, goal: str, **options) -> Dict[str, Any]:
+    """
+    Process a goal, cancelling it if the client disconnects.
+    
+    Plain (non-streaming) handlers are not cancelled by the server when
+    the client goes away, so the connection is polled while the goal
+    runs. Cancelling frees the llama.cpp slot instead of finishing an
+    answer nobody will read.
+    
+    options are passed on to Orchestrator.process (e.g. output_mode).
+    The X-Goal-Timeout header sets the goal's deadline.
+    """
+    token = CancelToken(deadline=_deadline(http_request))
+    task = asyncio.create_task(_orchestrator.process(goal, cancel=token, **options))
+    
+    while not task.done():
+        await asyncio.wait({task}, timeout=DISCONNECT_POLL_INTERVAL)
+        if not task.done() and await http_request.is_disconnected():
+            token.cancel("client disconnected")
+            metrics.counter("api_client_disconnects").inc()
+    
+    return task.result()
+
+
 # =============================================================================
 # Endpoints
 # =============================================================================
@@ -138,8 +227,7 @@ async def health_check() -> HealthResponse:
     
     try:
         # Check LLM (quick test)
-        from .core import LLMClient
-        llm = LLMClient.from_config(_config)
+        llm = _config.get_llm()
         # Don't actually call LLM in health check - just verify config
         response.llm_status = "configured"
     except Exception:
@@ -149,31 +237,78 @@ async def health_check() -> HealthResponse:
 
 
 @app.post("/api/v1/goals")
-async def process_goal(request: GoalRequest) -> GoalResponse:
+async def process_goal(request: GoalRequest, http_request: Request) -> GoalResponse:
     """Process a goal and return result."""
     if not _orchestrator:
         raise HTTPException(status_code=503, detail="Orchestrator not initialized")
     
-    result = await _orchestrator.process(request.goal)
+    result = await _process_while_connected(http_request, request.goal, output_mode=request.output_mode)
     
-    return GoalResponse(
+    return GoalResponse(**_goal_response_fields(result))
+
+
+@app.post("/api/v1/goals:batch")
+async def process_goals(request: BatchGoalRequest, http_request: Request) -> StreamingResponse:
+    """
+    Process many goals, streamed as Server-Sent-Events.
+    
+    Emits one `result` event (a BatchGoalResult) per goal as it completes,
+    in completion order, then a `done` event with the counts. The
+    X-Goal-Timeout header applies to the whole batch. If the client
+    disconnects, the goals still running are cancelled.
+    """
+    if not _orchestrator:
+        raise HTTPException(status_code=503, detail="Orchestrator not initialized")
+    
+    deadline = _deadline(http_request)
+    
+    async def event_stream():
+        counts = {"completed": 0, "failed": 0, "cancelled": 0}
+        results = _orchestrator.process_many(
+            request.goals, concurrency=request.concurrency, deadline=deadline, output_mode=request.output_mode
+        )
+        async for result in results:
+            item = BatchGoalResult(
+                **_goal_response_fields(result), index=result["index"], coalesced=result.get("coalesced", False)
+            )
+            counts[item.status] += 1
+            yield f"event: result\ndata: {item.model_dump_json()}\n\n"
+        yield f"event: done\ndata: {json.dumps(counts)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _goal_response_fields(result: Dict[str, Any]) -> Dict[str, Any]:
+    """GoalResponse fields from an Orchestrator.process() result."""
+    status = "completed" if result["success"] else "failed"
+    if result.get("cancelled"):
+        status = "cancelled"
+    
+    return dict(
         goal_id=result["goal_id"],
-        status="completed" if result["success"] else "failed",
+        status=status,
         goal=result["goal"],
         intent=result.get("intent"),
         result=result.get("result"),
+        data=result.get("data"),
+        output_mode=result.get("output_mode"),
+        dropped_stages=result.get("dropped_stages") or [],
         error=result.get("error"),
         duration_ms=result.get("duration_ms"),
     )
 
 
 @app.post("/api/v1/chat")
-async def chat(request: ChatRequest) -> ChatResponse:
+async def chat(request: ChatRequest, http_request: Request) -> ChatResponse:
     """Chat-style interaction."""
     if not _orchestrator:
         raise HTTPException(status_code=503, detail="Orchestrator not initialized")
     
-    result = await _orchestrator.process(request.message)
+    result = await _process_while_connected(http_request, request.message, output_mode=request.output_mode)
     
     return ChatResponse(
         response=result.get("result", result.get("error", "No response")),
@@ -181,6 +316,38 @@ async def chat(request: ChatRequest) -> ChatResponse:
     )
 
 
+@app.post("/api/v1/chat/stream")
+async def chat_stream(request: ChatRequest, http_request: Request) -> StreamingResponse:
+    """
+    Chat-style interaction streamed as Server-Sent-Events.
+    
+    Emits `token` events while the answer is generated, then one `done`
+    event with the same fields as ChatResponse. If the client disconnects,
+    the server cancels event_stream() and with it the goal.
+    """
+    if not _orchestrator:
+        raise HTTPException(status_code=503, detail="Orchestrator not initialized")
+    
+    deadline = _deadline(http_request)
+    
+    async def event_stream():
+        async for event in _orchestrator.stream(request.message, deadline=deadline, output_mode=request.output_mode):
+            if event["type"] == "token":
+                yield f"event: token\ndata: {json.dumps({'text': event['text']})}\n\n"
+            else:
+                done = {
+                    "response": event.get("result") or event.get("error") or "No response",
+                    "goal_id": event["goal_id"],
+                }
+                yield f"event: done\ndata: {json.dumps(done)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get("/api/v1/tools")
 async def list_tools() -> List[ToolInfo]:
     """List available tools."""
@@ -200,6 +367,23 @@ async def list_tools() -> List[ToolInfo]:
     ]
 
 
+@app.get("/api/v1/metrics")
+async def get_metrics() -> Dict[str, Any]:
+    """Runtime metrics: LLM cache counters, backend pool state and all registered metrics."""
+    llm = _config.get_llm()
+    
+    return {
+        "llm_cache": llm.cache.stats() if llm.cache else None,
+        "llm_backends": llm.pool.status(),
+        "llm_admission": {
+            "limit": llm.admission.limit,
+            "in_flight": llm.admission.in_flight,
+            "queue_depth": llm.admission.queue_depth,
+        },
+        "metrics": metrics.snapshot(),
+    }
+
+
 @app.get("/api/v1/events/{goal_id}")
 async def get_events(goal_id: str, limit: int = 50) -> List[Dict[str, Any]]:
     """Get events for a goal (fractal observability)."""
@@ -210,7 +394,7 @@ async def get_events(goal_id: str, limit: int = 50) -> List[Dict[str, Any]]:
         {
             "event_type": e.event_type.value,
             "neuron": e.neuron_type,
-            "timestamp": e.timestamp,
+            "timestamp": e.isotime,
             "data": e.metadata,
         }
         for e in events
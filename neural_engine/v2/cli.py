@@ -17,7 +17,7 @@ import sys
 from datetime import datetime
 from pathlib import Path
 
-from .core import Config, Orchestrator
+from .core import Config, Orchestrator, LLMClient, ThoughtCompactor
 from .scheduler import Scheduler, ScheduledGoal, ScheduleType, GoalCondition
 
 
@@ -55,9 +55,21 @@ def create_goal_from_config(goal_config: dict) -> ScheduledGoal:
         stype = ScheduleType.ON_DEMAND
         svalue = None
     
+    # Structured invocation: tool + params, goal text optional
+    tool = goal_config.get("tool")
+    params = goal_config.get("params") or {}
+    goal_text = goal_config.get("goal")
+    if not goal_text and tool:
+        args = " and ".join(f"{k}={v}" for k, v in params.items())
+        goal_text = f"Use {tool} with {args}" if args else f"Use {tool}"
+    
     return ScheduledGoal(
         id=goal_config["id"],
-        goal=goal_config["goal"],
+        goal=goal_text,
+        tool=tool,
+        params=params,
+        output_mode=goal_config.get("output_mode"),
+        timeout=goal_config.get("timeout"),
         schedule_type=stype,
         schedule_value=svalue,
         enabled=goal_config.get("enabled", True),
@@ -66,6 +78,20 @@ def create_goal_from_config(goal_config: dict) -> ScheduledGoal:
     )
 
 
+def start_compactor(config: Config, orchestrator: Orchestrator):
+    """
+    Archive completed thought trees while a long-running mode is up.
+    
+    Trees expire by goal_ttl; without a compactor they would be dropped
+    instead of archived. Returns the compactor (None if archiving is off).
+    """
+    if not config.thought_archive:
+        return None
+    compactor = ThoughtCompactor.from_config(config, orchestrator.thought_tree)
+    compactor.start()
+    return compactor
+
+
 async def process_goal(goal: str, enable_forge: bool = False) -> None:
     """Process a single goal."""
     config = Config.from_env()
@@ -94,6 +120,7 @@ async def interactive_mode() -> None:
     """Run in interactive mode."""
     config = Config.from_env()
     orchestrator = await Orchestrator.from_config(config)
+    compactor = start_compactor(config, orchestrator)
     
     print("🧠 Dendrite Neural Engine v2")
     print("   Type 'quit' or 'exit' to stop")
@@ -110,24 +137,38 @@ async def interactive_mode() -> None:
                 print("👋 Goodbye!")
                 break
             
-            result = await orchestrator.process(goal)
-            
-            if result["success"]:
-                print(f"\n{result['result']}")
-            else:
-                print(f"\n❌ {result['error']}")
+            # Stream tokens as they arrive; print the result only if
+            # nothing was streamed (e.g. raw tool output, memory lookups)
+            streamed = False
+            print()
+            async for event in orchestrator.stream(goal):
+                if event["type"] == "token":
+                    streamed = True
+                    print(event["text"], end="", flush=True)
+                    continue
                 
+                if not event["success"]:
+                    print(f"\n❌ {event['error']}")
+                elif not streamed:
+                    print(event["result"])
+                else:
+                    print()
+        
         except KeyboardInterrupt:
             print("\n👋 Goodbye!")
             break
         except EOFError:
             break
+    
+    if compactor:
+        await compactor.stop()
 
 
 async def scheduler_mode(goal: str, interval: int) -> None:
     """Run scheduler with a periodic goal."""
     config = Config.from_env()
     orchestrator = await Orchestrator.from_config(config)
+    compactor = start_compactor(config, orchestrator)
     
     # Create scheduler with orchestrator as executor
     scheduler = Scheduler(
@@ -176,6 +217,8 @@ async def scheduler_mode(goal: str, interval: int) -> None:
     except (KeyboardInterrupt, asyncio.CancelledError):
         pass
     finally:
+        if compactor:
+            await compactor.stop()
         print("\n\n👋 Scheduler stopped")
         state = await scheduler.get_state("demo_goal")
         print(f"   Total runs: {state.run_count}")
@@ -250,6 +293,7 @@ async def daemon_mode(config_path: str) -> None:
     
     config = Config.from_env()
     orchestrator = await Orchestrator.from_config(config)
+    compactor = start_compactor(config, orchestrator)
     
     check_interval = settings.get("check_interval", 30)
     scheduler = Scheduler(
@@ -303,10 +347,12 @@ async def daemon_mode(config_path: str) -> None:
             # Run in parallel with streaming output
             if due_goals:
                 await run_goals_with_streaming(scheduler, due_goals)
-                
+    
     except (KeyboardInterrupt, asyncio.CancelledError):
         pass
     finally:
+        if compactor:
+            await compactor.stop()
         print("\n\n👋 Daemon stopped")
         goals = await scheduler.list_goals()
         for goal in goals:
@@ -340,12 +386,26 @@ async def list_goals_cmd(config_path: str) -> None:
         
         print(f"{enabled} {g['id']}")
         print(f"   Schedule: {schedule_str}")
-        print(f"   Goal: {g['goal'][:60]}{'...' if len(g['goal']) > 60 else ''}")
+        if g.get("tool"):
+            print(f"   Tool: {g['tool']} {g.get('params') or {}}")
+        if g.get("goal"):
+            print(f"   Goal: {g['goal'][:60]}{'...' if len(g['goal']) > 60 else ''}")
         if g.get("tags"):
             print(f"   Tags: {', '.join(g['tags'])}")
         print()
 
 
+def _run(coro) -> None:
+    """Run a CLI coroutine, closing shared LLM connections on exit."""
+    async def runner():
+        try:
+            await coro
+        finally:
+            await LLMClient.close_all()
+    
+    asyncio.run(runner())
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Dendrite Neural Engine CLI",
@@ -422,16 +482,16 @@ Examples:
     args = parser.parse_args()
     
     if args.list_goals:
-        asyncio.run(list_goals_cmd(args.config))
+        _run(list_goals_cmd(args.config))
     elif args.daemon:
-        asyncio.run(daemon_mode(args.config))
+        _run(daemon_mode(args.config))
     elif args.scheduler:
         goal = args.goal or "Tell me a random fun fact about technology"
-        asyncio.run(scheduler_mode(goal, args.interval))
+        _run(scheduler_mode(goal, args.interval))
     elif args.interactive:
-        asyncio.run(interactive_mode())
+        _run(interactive_mode())
     elif args.goal:
-        asyncio.run(process_goal(args.goal, enable_forge=args.forge))
+        _run(process_goal(args.goal, enable_forge=args.forge))
     else:
         parser.print_help()
         sys.exit(1)
@@ -9,19 +9,37 @@ Core principles:
 """
 
 from .config import Config
-from .llm import LLMClient
+from .llm import LLMClient, LLMProfile
+from .cache import LLMCache
+from .backends import BackendPool, NoBackendAvailable
+from .admission import AdmissionController, llm_priority
+from .metrics import metrics, MetricsRegistry
+from .usage import LLMCall, collect_llm_calls, summarize_llm_calls
+from .cancel import CancelToken, cancel_scope, current_cancel_token
+from .output import OUTPUT_MODES, output_mode, current_output_mode
 from .base import Neuron
-from .events import EventBus, Event, EventType
+from .telemetry import TelemetryWriter
+from .events import EventBus, Event, EventType, Preview
 from .memory import ThoughtTree, GoalContext
+from .archive import ThoughtArchive, ThoughtCompactor
 from .orchestrator import Orchestrator
 from .recovery import RecoveryEngine, ExecutionHistory, RecoveryAction, FailureType
 
 __all__ = [
     'Config',
-    'LLMClient', 
+    'LLMClient', 'LLMProfile',
+    'LLMCache',
+    'BackendPool', 'NoBackendAvailable',
+    'AdmissionController', 'llm_priority',
+    'metrics', 'MetricsRegistry',
+    'LLMCall', 'collect_llm_calls', 'summarize_llm_calls',
+    'CancelToken', 'cancel_scope', 'current_cancel_token',
+    'OUTPUT_MODES', 'output_mode', 'current_output_mode',
     'Neuron',
-    'EventBus', 'Event', 'EventType',
+    'TelemetryWriter',
+    'EventBus', 'Event', 'EventType', 'Preview',
     'ThoughtTree', 'GoalContext',
+    'ThoughtArchive', 'ThoughtCompactor',
     'Orchestrator',
     'RecoveryEngine', 'ExecutionHistory', 'RecoveryAction', 'FailureType',
 ]
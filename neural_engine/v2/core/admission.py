@@ -0,0 +1,154 @@
+"""
+Admission - Priority queueing in front of llama.cpp slots.
+
+llama.cpp serves N requests at once (its slots); anything beyond that
+queues inside the server in arrival order. A burst of scheduled goals
+would then sit in front of interactive API requests.
+
+The AdmissionController keeps at most `limit` requests in flight (the
+slot count) and queues the rest by priority:
+
+    interactive  >  scheduled  >  forge
+
+Queued requests carry a deadline; a request whose caller has given up
+is dropped from the queue instead of taking a slot.
+"""
+
+import time
+import heapq
+import asyncio
+import itertools
+import contextvars
+from contextlib import contextmanager
+from typing import Optional, List, Tuple
+
+from .metrics import metrics
+
+
+# Lower = served first
+PRIORITIES = {"interactive": 0, "scheduled": 1, "forge": 2}
+
+# Priority of the work running in this context (set by the scheduler daemon)
+_current_priority = contextvars.ContextVar("llm_priority", default="interactive")
+
+
+@contextmanager
+def llm_priority(priority: str):
+    """
+    Run a block at a given LLM priority.
+    
+    Usage:
+        with llm_priority("scheduled"):
+            await orchestrator.process(goal)
+    """
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def effective_priority(requested: Optional[str] = None) -> str:
+    """The less urgent of the call site's priority and the context's."""
+    current = _current_priority.get()
+    if requested is None:
+        return current
+    return max(requested, current, key=lambda p: PRIORITIES.get(p, PRIORITIES["scheduled"]))
+
+
+class AdmissionController:
+    """
+    Cap in-flight LLM requests and admit waiters by priority.
+    
+    Usage:
+        admission = AdmissionController(limit=4)
+    
+        await admission.acquire("scheduled", deadline=time.monotonic() + 30)
+        try:
+            ...  # Call llama.cpp
+        finally:
+            admission.release()
+    """
+    
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self.in_flight = 0
+        
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()  # FIFO within a priority
+        self._queued = {name: 0 for name in PRIORITIES}
+    
+    def set_limit(self, limit: int) -> None:
+        """Change the cap (e.g. after /slots reports the server's slot count)."""
+        self.limit = max(1, limit)
+        self._wake()
+    
+    @property
+    def queue_depth(self) -> int:
+        return sum(self._queued.values())
+    
+    async def acquire(self, priority: str = "interactive", deadline: Optional[float] = None) -> None:
+        """
+        Wait for a slot.
+        
+        Args:
+            priority: interactive, scheduled or forge
+            deadline: time.monotonic() after which the caller no longer
+                wants the answer; raises asyncio.TimeoutError
+        """
+        rank = PRIORITIES.get(priority, PRIORITIES["scheduled"])
+        started = time.monotonic()
+        
+        if self.in_flight < self.limit and not self._waiters:
+            self._admit(priority, started)
+            return
+        
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (rank, next(self._sequence), future))
+        self._set_queued(priority, +1)
+        self._wake()  # Slots may be free behind dropped waiters
+        
+        try:
+            if deadline is None:
+                await future
+            else:
+                await asyncio.wait_for(future, max(0.0, deadline - time.monotonic()))
+        
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                self.release()  # Admitted just as the caller gave up
+            if isinstance(e, asyncio.TimeoutError):
+                metrics.counter("llm_admission_expired", priority=priority).inc()
+            raise
+        
+        finally:
+            self._set_queued(priority, -1)
+        
+        self._admit(priority, started, counted=True)
+    
+    def release(self) -> None:
+        """Give a slot back and admit the next waiter."""
+        self.in_flight -= 1
+        metrics.gauge("llm_in_flight").set(self.in_flight)
+        self._wake()
+    
+    def _admit(self, priority: str, started: float, counted: bool = False) -> None:
+        if not counted:
+            self.in_flight += 1
+        metrics.gauge("llm_in_flight").set(self.in_flight)
+        metrics.histogram("llm_queue_wait_ms", priority=priority).observe(
+            (time.monotonic() - started) * 1000
+        )
+    
+    def _wake(self) -> None:
+        """Hand free slots to the most urgent live waiters."""
+        while self._waiters and self.in_flight < self.limit:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue  # Caller timed out or was cancelled - drop it
+            self.in_flight += 1
+            future.set_result(None)
+    
+    def _set_queued(self, priority: str, delta: int) -> None:
+        self._queued[priority] = self._queued.get(priority, 0) + delta
+        metrics.gauge("llm_queue_depth", priority=priority).set(self._queued[priority])
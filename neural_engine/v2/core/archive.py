@@ -0,0 +1,171 @@
+"""
+Archive - Completed thought trees moved out of Redis.
+
+ThoughtTree keeps each goal's thoughts in a Redis hash until its TTL.
+ThoughtCompactor moves the trees of completed goals older than a few
+hours to ThoughtArchive - zlib-compressed, in Postgres (StorageClient,
+namespace "thoughts") - and deletes them from Redis. ThoughtTree reads
+fall back to the archive, so archived goals can still be queried.
+
+Failed trees are not archived; they stay in Redis for goal_failed_ttl.
+
+Usage:
+    archive = ThoughtArchive.from_config(config)
+    compactor = ThoughtCompactor(tree, archive, older_than_hours=24)
+    compactor.start()  # Background task; compactor.stop() to end it
+"""
+
+import json
+import time
+import zlib
+import base64
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from .memory import Thought, ThoughtTree
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class ThoughtArchive:
+    """
+    Compressed thought trees in Postgres, one entry per goal.
+    
+    storage is a StorageClient (or anything with its get/set), called
+    in a thread since it is synchronous.
+    """
+    
+    NAMESPACE = "thoughts"
+    
+    def __init__(self, storage, ttl_seconds: Optional[int] = None):
+        self._storage = storage
+        self.ttl_seconds = ttl_seconds
+    
+    @classmethod
+    def from_config(cls, config) -> 'ThoughtArchive':
+        from .storage import StorageClient
+        
+        storage = StorageClient(
+            host=config.postgres_host,
+            database=config.postgres_db,
+            user=config.postgres_user,
+            password=config.postgres_password,
+        )
+        return cls(storage, ttl_seconds=config.thought_archive_days * 24 * 3600)
+    
+    async def store(self, goal_id: str, thoughts: List[Thought]) -> bool:
+        """Archive a goal's tree (False if storage failed)."""
+        raw = json.dumps([t.to_dict() for t in thoughts]).encode()
+        data = zlib.compress(raw, 6)
+        value = {
+            "encoding": "zlib",
+            "data": base64.b64encode(data).decode(),
+            "archived_at": datetime.now(timezone.utc).isoformat(),
+        }
+        
+        stored = await asyncio.to_thread(self._storage.set, self.NAMESPACE, goal_id, value, self.ttl_seconds)
+        if stored:
+            metrics.counter("thoughts_archived_bytes").inc(len(data))
+            metrics.counter("thoughts_archived_raw_bytes").inc(len(raw))
+        return bool(stored)
+    
+    async def get_thoughts(self, goal_id: str) -> List[Thought]:
+        """Archived tree of a goal ([] if not archived)."""
+        value = await asyncio.to_thread(self._storage.get, self.NAMESPACE, goal_id)
+        if not value:
+            return []
+        
+        raw = zlib.decompress(base64.b64decode(value["data"]))
+        return [Thought.from_dict(d) for d in json.loads(raw)]
+
+
+class ThoughtCompactor:
+    """
+    Periodically archive completed trees older than older_than_hours.
+    
+    Walks the thought index oldest first. Completed trees are archived
+    and removed from Redis; index entries whose tree already expired are
+    dropped; failed and still-active trees are left to their TTL.
+    """
+    
+    def __init__(
+        self,
+        tree: ThoughtTree,
+        archive: ThoughtArchive,
+        older_than_hours: float = 24.0,
+        interval_seconds: float = 600.0,
+        batch_size: int = 100,
+    ):
+        self.tree = tree
+        self.archive = archive
+        self.older_than_hours = older_than_hours
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+    
+    @classmethod
+    def from_config(cls, config, tree: ThoughtTree) -> 'ThoughtCompactor':
+        return cls(
+            tree,
+            tree.archive or ThoughtArchive.from_config(config),
+            older_than_hours=config.thought_archive_after_hours,
+        )
+    
+    async def compact_once(self) -> int:
+        """Archive what is due now; returns the number of trees archived."""
+        r = await self.tree._get_redis()
+        cutoff = datetime.now(timezone.utc).timestamp() - self.older_than_hours * 3600
+        archived, offset = 0, 0
+        
+        while True:
+            goal_ids = await r.zrangebyscore(self.tree.INDEX_KEY, "-inf", cutoff, start=offset, num=self.batch_size)
+            if not goal_ids:
+                break
+            
+            done = []
+            for goal_id in goal_ids:
+                thoughts = await self.tree.load(goal_id)
+                root = next((t for t in thoughts if t.thought_id == f"root_{goal_id}"), None)
+                if not thoughts:
+                    done.append(goal_id)  # Expired
+                elif root is not None and root.status == "completed":
+                    if await self.archive.store(goal_id, thoughts):
+                        done.append(goal_id)
+                        archived += 1
+            
+            await self.tree.delete(done)
+            offset += len(goal_ids) - len(done)  # Entries left in place
+        
+        if archived:
+            metrics.counter("thoughts_archived").inc(archived)
+            logger.info(f"Archived {archived} thought trees")
+        return archived
+    
+    def start(self) -> asyncio.Task:
+        """Run compact_once every interval_seconds in the background."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return self._task
+    
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def _run(self) -> None:
+        while True:
+            started = time.monotonic()
+            try:
+                await self.compact_once()
+            except Exception as e:
+                logger.warning(f"Thought compaction failed: {e}")
+                metrics.counter("thought_compaction_errors").inc()
+            metrics.histogram("thought_compaction_seconds").observe(time.monotonic() - started)
+            await asyncio.sleep(self.interval_seconds)
@@ -0,0 +1,336 @@
+"""
+LLM Backends - Pool of llama.cpp servers with least-loaded routing.
+
+Spreads LLM calls over several llama.cpp containers (e.g. llama-cpu and
+llama-gpu, or several GPU boxes):
+
+1. Routing - each request goes to the healthy endpoint with the fewest
+   outstanding requests (ties broken by idle slots from /slots)
+2. Health  - a background poller reads /health and /slots
+3. Circuit breaker - consecutive failures eject an endpoint; after a
+   cool-down one trial request (half-open) decides whether it comes back
+4. Affinity - calls with the same key (a goal id) stick to one endpoint
+   and slot, so llama.cpp reuses the goal's cached prompt prefix. A slot
+   is held by one key until release_affinity() (the goal ended); with
+   every slot held, new keys get no slot
+"""
+
+import time
+import asyncio
+import logging
+import aiohttp
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class NoBackendAvailable(RuntimeError):
+    """Every endpoint in the pool is ejected by its circuit breaker."""
+
+
+@dataclass
+class Backend:
+    """One llama.cpp endpoint and its routing state."""
+    base_url: str                        # OpenAI-compatible base, e.g. http://llama-gpu:8080/v1
+    
+    outstanding: int = 0                 # Requests currently in flight from this process
+    healthy: bool = True                 # Last /health result
+    slots_total: Optional[int] = None    # From /slots (None = endpoint disabled)
+    slots_idle: Optional[int] = None
+    
+    # Circuit breaker
+    state: str = "closed"                # closed, open, half_open
+    failures: int = 0                    # Consecutive failures
+    opened_at: float = 0.0
+    
+    # slot -> (affinity key holding it, last used)
+    slot_holders: Dict[int, Tuple[str, float]] = field(default_factory=dict)
+    
+    @property
+    def root_url(self) -> str:
+        """Server root, where llama.cpp serves /health and /slots."""
+        url = self.base_url.rstrip("/")
+        return url[:-3] if url.endswith("/v1") else url
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "url": self.base_url,
+            "state": self.state,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "failures": self.failures,
+            "slots_total": self.slots_total,
+            "slots_idle": self.slots_idle,
+        }
+
+
+class BackendPool:
+    """
+    Route requests over several llama.cpp endpoints.
+    
+    Usage:
+        pool = BackendPool(["http://llama-gpu:8080/v1", "http://llama-cpu:8080/v1"])
+    
+        backend = pool.acquire()
+        try:
+            ...  # POST to backend.base_url
+            pool.release(backend, ok=True)
+        except Exception:
+            pool.release(backend, ok=False)
+            raise
+    
+        await pool.check(session)  # Poll /health and /slots once
+    """
+    
+    MAX_AFFINITY_KEYS = 4096
+    SLOT_HOLD_SECONDS = 300.0  # Unused this long, a slot is free again (goal never released)
+    
+    def __init__(
+        self,
+        urls: List[str],
+        failure_threshold: int = 3,
+        reset_timeout: float = 30.0,
+        health_interval: float = 10.0,
+    ):
+        if not urls:
+            raise ValueError("BackendPool needs at least one URL")
+        
+        self.backends = [Backend(base_url=url.rstrip("/")) for url in urls]
+        self.failure_threshold = failure_threshold  # Failures before ejecting
+        self.reset_timeout = reset_timeout          # Seconds ejected before a trial request
+        self.health_interval = health_interval      # Seconds between /health polls
+        
+        self._poller: Optional[asyncio.Task] = None
+        
+        # affinity key -> (backend, slot); bounded, oldest goals forgotten first
+        self._affinity: "OrderedDict[str, Tuple[Backend, Optional[int]]]" = OrderedDict()
+    
+    def __len__(self) -> int:
+        return len(self.backends)
+    
+    # =========================================================================
+    # Routing
+    # =========================================================================
+    
+    def _available(self, backend: Backend, now: float) -> bool:
+        """Circuit allows a request (health is only a preference, see acquire)."""
+        if backend.state == "closed":
+            return True
+        if backend.state == "open":
+            return now - backend.opened_at >= self.reset_timeout
+        return False  # half_open: trial request already in flight
+    
+    def acquire(self, exclude: Optional[List[Backend]] = None, affinity: Optional[str] = None) -> Backend:
+        """
+        Pick the least-loaded available endpoint and count a request on it.
+        
+        With an affinity key, the endpoint used for that key before is
+        kept while it stays available.
+        
+        Raises NoBackendAvailable if every endpoint is down or ejected.
+        """
+        now = time.monotonic()
+        candidates = [
+            b for b in self.backends
+            if self._available(b, now) and not (exclude and b in exclude)
+        ]
+        # Prefer endpoints whose /health is OK; if none are, try anyway
+        # rather than fail a request on a stale health check
+        candidates = [b for b in candidates if b.healthy] or candidates
+        if not candidates:
+            raise NoBackendAvailable(
+                f"No available LLM backend ({', '.join(b.base_url for b in self.backends)})"
+            )
+        
+        pinned = self._affinity.get(affinity) if affinity else None
+        if pinned and pinned[0] in candidates:
+            backend = pinned[0]
+            self._affinity.move_to_end(affinity)
+        else:
+            backend = min(candidates, key=lambda b: (b.outstanding, -(b.slots_idle or 0)))
+            if affinity:
+                self._pin(affinity, backend, None)
+        if backend.state == "open":
+            backend.state = "half_open"  # This request is the trial
+        
+        backend.outstanding += 1
+        metrics.gauge("llm_backend_outstanding", backend=backend.base_url).set(backend.outstanding)
+        return backend
+    
+    def slot_for(self, backend: Backend, affinity: str) -> Optional[int]:
+        """
+        Slot on backend held for an affinity key (None if slots unknown or all held).
+        
+        New keys get the lowest slot no other key holds; the slot stays
+        theirs until release_affinity(), or SLOT_HOLD_SECONDS unused.
+        """
+        if not backend.slots_total:
+            return None
+        
+        now = time.monotonic()
+        pinned = self._affinity.get(affinity)
+        if pinned and pinned[0] is backend and pinned[1] is not None and pinned[1] < backend.slots_total:
+            holder = backend.slot_holders.get(pinned[1])
+            if holder and holder[0] == affinity:
+                backend.slot_holders[pinned[1]] = (affinity, now)
+                return pinned[1]
+        
+        slot = next(
+            (
+                s for s in range(backend.slots_total)
+                if s not in backend.slot_holders or now - backend.slot_holders[s][1] >= self.SLOT_HOLD_SECONDS
+            ),
+            None,
+        )
+        if slot is None:
+            metrics.counter("llm_slots_exhausted", backend=backend.base_url).inc()
+        else:
+            backend.slot_holders[slot] = (affinity, now)
+        self._pin(affinity, backend, slot)
+        return slot
+    
+    def release_affinity(self, affinity: str) -> None:
+        """Forget an affinity key (its goal ended), freeing its slot."""
+        pinned = self._affinity.pop(affinity, None)
+        if pinned:
+            self._unhold(affinity, pinned)
+    
+    def _pin(self, affinity: str, backend: Backend, slot: Optional[int]) -> None:
+        old = self._affinity.get(affinity)
+        if old and (old[0] is not backend or old[1] != slot):
+            self._unhold(affinity, old)
+        self._affinity[affinity] = (backend, slot)
+        self._affinity.move_to_end(affinity)
+        while len(self._affinity) > self.MAX_AFFINITY_KEYS:
+            self._unhold(*self._affinity.popitem(last=False))
+    
+    @staticmethod
+    def _unhold(affinity: str, pinned: Tuple[Backend, Optional[int]]) -> None:
+        """Free the slot a key held, unless another key has taken it since."""
+        backend, slot = pinned
+        if slot is not None and backend.slot_holders.get(slot, (None,))[0] == affinity:
+            del backend.slot_holders[slot]
+    
+    def release(self, backend: Backend, ok: Optional[bool]) -> None:
+        """
+        Finish a request and feed the circuit breaker.
+        
+        ok=None means the outcome says nothing about the endpoint
+        (cancelled by the caller, 4xx for a bad request).
+        """
+        backend.outstanding -= 1
+        metrics.gauge("llm_backend_outstanding", backend=backend.base_url).set(backend.outstanding)
+        
+        if ok is None:
+            if backend.state == "half_open":
+                backend.state = "open"  # Trial inconclusive, allow another
+            return
+        
+        if ok:
+            if backend.state != "closed":
+                logger.info(f"LLM backend {backend.base_url} recovered")
+            backend.state = "closed"
+            backend.failures = 0
+            return
+        
+        backend.failures += 1
+        metrics.counter("llm_backend_failures", backend=backend.base_url).inc()
+        if backend.state == "half_open" or backend.failures >= self.failure_threshold:
+            self._eject(backend)
+    
+    def _eject(self, backend: Backend) -> None:
+        if backend.state != "open":
+            logger.warning(f"LLM backend {backend.base_url} ejected after {backend.failures} failures")
+            metrics.counter("llm_backend_ejections", backend=backend.base_url).inc()
+        backend.state = "open"
+        backend.opened_at = time.monotonic()
+    
+    # =========================================================================
+    # Health polling
+    # =========================================================================
+    
+    async def check(self, session: aiohttp.ClientSession, timeout: float = 5.0) -> None:
+        """Poll /health and /slots on every endpoint once."""
+        await asyncio.gather(*[self._check_one(session, b, timeout) for b in self.backends])
+    
+    async def _check_one(self, session: aiohttp.ClientSession, backend: Backend, timeout: float) -> None:
+        client_timeout = aiohttp.ClientTimeout(total=timeout)
+        
+        try:
+            # 200 = ready, 503 = loading model. Servers without /health (404)
+            # count as healthy; requests themselves feed the circuit breaker.
+            async with session.get(f"{backend.root_url}/health", timeout=client_timeout) as response:
+                backend.healthy = response.status < 500
+        except Exception as e:
+            logger.debug(f"Health check failed for {backend.base_url}: {e}")
+            backend.healthy = False
+        
+        if not backend.healthy:
+            backend.slots_idle = 0
+            return
+        
+        # A healthy endpoint that was ejected gets its trial request early
+        if backend.state == "open":
+            backend.opened_at -= self.reset_timeout
+        
+        try:
+            async with session.get(f"{backend.root_url}/slots", timeout=client_timeout) as response:
+                if response.status != 200:
+                    return  # Started without --slots, rely on outstanding counts
+                slots = await response.json(content_type=None)
+        except Exception as e:
+            logger.debug(f"Slots check failed for {backend.base_url}: {e}")
+            return
+        
+        backend.slots_total = len(slots)
+        backend.slots_idle = sum(1 for slot in slots if not _slot_busy(slot))
+    
+    def polling_loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        """Event loop the health poller runs on (None if not polling)."""
+        if self._poller is None or self._poller.done():
+            return None
+        return self._poller.get_loop()
+    
+    def start_polling(self) -> None:
+        """Start the background health poller on the running loop (once)."""
+        if self.polling_loop() is asyncio.get_running_loop():
+            return
+        self._poller = asyncio.create_task(self._poll_loop())
+    
+    async def _poll_loop(self) -> None:
+        # Own small session: health checks must not occupy (or reuse)
+        # the keep-alive connections serving completions
+        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=len(self.backends))) as session:
+            while True:
+                try:
+                    await self.check(session)
+                except Exception as e:
+                    logger.debug(f"Backend health poll failed: {e}")
+                await asyncio.sleep(self.health_interval)
+    
+    async def stop_polling(self) -> None:
+        if self._poller is not None:
+            self._poller.cancel()
+            try:
+                await self._poller
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._poller = None
+    
+    def slot_count(self) -> int:
+        """Total slots over healthy endpoints (0 = unknown)."""
+        return sum(b.slots_total or 0 for b in self.backends if b.healthy and b.state == "closed")
+    
+    def status(self) -> List[Dict[str, Any]]:
+        return [b.to_dict() for b in self.backends]
+
+
+def _slot_busy(slot: Dict[str, Any]) -> bool:
+    """Newer llama.cpp reports is_processing, older builds state (0 = idle)."""
+    if "is_processing" in slot:
+        return bool(slot["is_processing"])
+    return slot.get("state", 0) != 0
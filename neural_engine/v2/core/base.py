@@ -16,9 +16,10 @@ from functools import wraps
 import time
 
 from .config import Config
-from .llm import LLMClient
-from .events import EventBus, EventType
+from .events import EventBus, EventType, Preview
 from .memory import ThoughtTree, GoalContext
+from .prompts import build_goal_prefix
+from .usage import collect_llm_calls
 
 
 @dataclass
@@ -54,7 +55,7 @@ class Neuron(ABC):
     
     def __init__(self, config: Config):
         self.config = config
-        self.llm = LLMClient.from_config(config)
+        self.llm = config.get_llm()  # Shared client, pooled connections
         self._event_bus: Optional[EventBus] = None
         self._thought_tree: Optional[ThoughtTree] = None
     
@@ -63,6 +64,18 @@ class Neuron(ABC):
         """Create neuron from config."""
         return cls(config)
     
+    def goal_prefix(self, ctx: GoalContext, goal: str = None) -> str:
+        """
+        Shared system prompt for this goal's LLM calls.
+        
+        Every stage sends the same prefix so llama.cpp reuses its KV cache
+        (see prompts.py); only the stage instructions differ.
+        """
+        goal = goal or ctx.goal_text
+        if ctx.prompt_prefix and goal == ctx.goal_text:
+            return ctx.prompt_prefix
+        return build_goal_prefix(goal)
+    
     async def _get_event_bus(self) -> EventBus:
         """Lazy load event bus."""
         if self._event_bus is None:
@@ -73,7 +86,7 @@ class Neuron(ABC):
         """Lazy load thought tree."""
         if self._thought_tree is None:
             redis_client = await self.config.get_redis()
-            self._thought_tree = ThoughtTree(redis_client)
+            self._thought_tree = ThoughtTree.from_config(self.config, redis_client)
         return self._thought_tree
     
     async def run(self, ctx: GoalContext, input_data: Any = None) -> NeuronResult:
@@ -84,7 +97,7 @@ class Neuron(ABC):
         1. Start event
         2. Thought recording
         3. End event (success or failure)
-        4. Timing
+        4. Timing, and the LLM calls made (tokens, prefill/decode ms)
         """
         start_time = time.time()
         event_bus = await self._get_event_bus()
@@ -95,7 +108,7 @@ class Neuron(ABC):
             event_type=EventType.NEURON_START,
             source=self.name,
             goal_id=ctx.goal_id,
-            data={"input": str(input_data)[:200] if input_data else None},
+            data={"input": Preview(input_data) if input_data else None},
         )
         
         # Record thought
@@ -107,9 +120,12 @@ class Neuron(ABC):
             metadata={"neuron": self.name},
         )
         
+        llm_calls = []
+        
         try:
             # Call the actual process method
-            result = await self.process(ctx, input_data)
+            with collect_llm_calls(llm_calls):
+                result = await self.process(ctx, input_data)
             
             duration_ms = int((time.time() - start_time) * 1000)
             
@@ -118,7 +134,11 @@ class Neuron(ABC):
                 event_type=EventType.NEURON_COMPLETE,
                 source=self.name,
                 goal_id=ctx.goal_id,
-                data={"result": str(result)[:200] if result else None, "duration_ms": duration_ms},
+                data={
+                    "result": Preview(result) if result else None,
+                    "duration_ms": duration_ms,
+                    "llm_calls": [c.to_dict() for c in llm_calls],
+                },
             )
             
             # Add message to context
@@ -135,7 +155,11 @@ class Neuron(ABC):
                 event_type=EventType.NEURON_ERROR,
                 source=self.name,
                 goal_id=ctx.goal_id,
-                data={"error": error_msg, "duration_ms": duration_ms},
+                data={
+                    "error": error_msg,
+                    "duration_ms": duration_ms,
+                    "llm_calls": [c.to_dict() for c in llm_calls],
+                },
             )
             
             # Add error to context
@@ -0,0 +1,174 @@
+"""
+LLM Response Cache - Content-addressed, two-tier, single-flight.
+
+Deterministic (temperature=0) LLM calls repeat constantly: the same
+intent, capability, selection and parameter prompts for every run of a
+scheduled goal. This cache answers them without touching llama.cpp.
+
+Tiers:
+1. In-process LRU (fast, per process)
+2. Redis with TTL (shared between API server and scheduler daemon)
+
+Concurrent identical requests are coalesced: only the first reaches the
+LLM, the rest await its result.
+"""
+
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import redis.asyncio as redis
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class LLMCache:
+    """
+    Two-tier cache for LLM completions.
+    
+    Usage:
+        cache = LLMCache(redis_client, max_entries=1024, ttl_seconds=3600)
+    
+        key = LLMCache.make_key(payload)
+        text = await cache.get_or_compute(key, lambda: llm_call(payload))
+    
+        cache.stats()  # This instance: {"hits_memory": 3, "hits_redis": 1, "misses": 2, ...}
+    """
+    
+    KEY_PREFIX = "llm:cache:"
+    REDIS_RETRY_SECONDS = 30  # Skip the Redis tier this long after an error
+    
+    def __init__(
+        self,
+        redis_client: Optional[redis.Redis] = None,
+        max_entries: int = 1024,
+        ttl_seconds: int = 6 * 3600,
+    ):
+        self._redis = redis_client
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        
+        self._lru: "OrderedDict[str, str]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._redis_down_until = 0.0
+        
+        # Per-instance counts for stats(); also published to metrics
+        self._counts = dict.fromkeys(("hits_memory", "hits_redis", "misses", "coalesced", "errors"), 0)
+    
+    def _count(self, stat: str, metric: str, **labels) -> None:
+        self._counts[stat] += 1
+        metrics.counter(metric, **labels).inc()
+    
+    @staticmethod
+    def make_key(payload: Dict[str, Any]) -> str:
+        """
+        Content address for a request.
+        
+        Hashes the full request body: model, system prompt, prompt,
+        temperature, max_tokens and any other generation setting.
+        """
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode()).hexdigest()
+    
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[str]]) -> str:
+        """Return the cached value for key, computing it at most once."""
+        while True:
+            # Tier 1: in-process LRU
+            if key in self._lru:
+                self._lru.move_to_end(key)
+                self._count("hits_memory", "llm_cache_hits", tier="memory")
+                return self._lru[key]
+            
+            # Identical request already in flight - wait for it
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            
+            self._count("coalesced", "llm_cache_coalesced")
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise  # We were cancelled ourselves
+                # The leader was cancelled - retry, possibly as the new leader
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        
+        try:
+            # Tier 2: Redis
+            value = await self._redis_get(key)
+            if value is not None:
+                self._count("hits_redis", "llm_cache_hits", tier="redis")
+            else:
+                self._count("misses", "llm_cache_misses")
+                value = await compute()
+                await self._redis_set(key, value)
+            
+            self._remember(key, value)
+            future.set_result(value)
+            return value
+        
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved so a follower-less future doesn't warn
+            raise
+        
+        finally:
+            self._inflight.pop(key, None)
+    
+    def _remember(self, key: str, value: str) -> None:
+        """Store in the LRU tier, evicting the oldest entry if full."""
+        self._lru[key] = value
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+    
+    def _redis_available(self) -> bool:
+        return self._redis is not None and time.monotonic() >= self._redis_down_until
+    
+    def _redis_failed(self, e: Exception) -> None:
+        logger.debug(f"LLM cache Redis tier unavailable: {e}")
+        self._count("errors", "llm_cache_errors", tier="redis")
+        self._redis_down_until = time.monotonic() + self.REDIS_RETRY_SECONDS
+    
+    async def _redis_get(self, key: str) -> Optional[str]:
+        if not self._redis_available():
+            return None
+        try:
+            return await self._redis.get(f"{self.KEY_PREFIX}{key}")
+        except Exception as e:
+            self._redis_failed(e)
+            return None
+    
+    async def _redis_set(self, key: str, value: str) -> None:
+        if not self._redis_available():
+            return
+        try:
+            await self._redis.set(f"{self.KEY_PREFIX}{key}", value, ex=self.ttl_seconds)
+        except Exception as e:
+            self._redis_failed(e)
+    
+    def clear(self) -> None:
+        """Clear the in-process tier (Redis entries expire by TTL)."""
+        self._lru.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of this cache instance."""
+        hits = self._counts["hits_memory"] + self._counts["hits_redis"]
+        lookups = hits + self._counts["misses"]
+        return {
+            **self._counts,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "entries": len(self._lru),
+        }
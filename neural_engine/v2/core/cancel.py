@@ -0,0 +1,105 @@
+"""
+Cancellation - One token per goal, shared by its neurons, LLM calls and tools.
+
+The orchestrator runs each goal as a task tied to a CancelToken:
+
+- token.cancel() (client disconnected, user abort) or the token's
+  deadline passing cancels the goal task. The LLM request in flight is
+  aborted and its HTTP connection closed, so llama.cpp stops decoding
+  and frees the slot.
+- LLM calls never wait (queue included) past the token's deadline.
+- Tools run in a worker thread; long-running ones can poll
+  current_cancel_token() and stop early.
+
+Usage:
+    token = CancelToken(deadline=time.monotonic() + 30)
+    task = asyncio.create_task(orchestrator.process(goal, cancel=token))
+    ...
+    token.cancel("client disconnected")
+"""
+
+import time
+import asyncio
+import contextvars
+from contextlib import contextmanager
+from typing import Optional, Set
+
+
+# Token of the goal running in this context (None outside a goal)
+_current_token = contextvars.ContextVar("cancel_token", default=None)
+
+
+class CancelToken:
+    """
+    Cancellation signal with an optional deadline.
+    
+    Attached tasks are cancelled when the token is cancelled or the
+    deadline (time.monotonic()) passes.
+    """
+    
+    def __init__(self, deadline: Optional[float] = None):
+        self.deadline = deadline
+        self.reason: Optional[str] = None  # Set once cancelled
+        
+        self._tasks: Set[asyncio.Task] = set()
+        self._timer: Optional[asyncio.TimerHandle] = None
+    
+    @classmethod
+    def with_timeout(cls, timeout: Optional[float]) -> "CancelToken":
+        """Token expiring `timeout` seconds from now (None = no deadline)."""
+        return cls(deadline=time.monotonic() + timeout if timeout else None)
+    
+    @property
+    def cancelled(self) -> bool:
+        if self.reason is None and self.deadline is not None and time.monotonic() >= self.deadline:
+            self.reason = "deadline exceeded"
+        return self.reason is not None
+    
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline (None = no deadline)."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+    
+    def cancel(self, reason: str = "cancelled") -> None:
+        """Cancel every attached task (first reason wins)."""
+        if self.reason is None:
+            self.reason = reason
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        for task in list(self._tasks):
+            task.cancel()
+    
+    def attach(self, task: asyncio.Task) -> None:
+        """Cancel this task along with the token."""
+        if self.cancelled:
+            task.cancel()
+            return
+        
+        self._tasks.add(task)
+        task.add_done_callback(self._detach)
+        
+        if self.deadline is not None and self._timer is None:
+            self._timer = task.get_loop().call_later(self.remaining(), self.cancel, "deadline exceeded")
+    
+    def _detach(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not self._tasks and self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+
+@contextmanager
+def cancel_scope(token: CancelToken):
+    """Make `token` the current goal's token within this block (and its tasks)."""
+    reset = _current_token.set(token)
+    try:
+        yield token
+    finally:
+        _current_token.reset(reset)
+
+
+def current_cancel_token() -> Optional[CancelToken]:
+    """Token of the goal running in this context, if any."""
+    return _current_token.get()
@@ -6,8 +6,55 @@ No optional parameters. Everything is explicit.
 
 import os
 import redis.asyncio as redis
-from dataclasses import dataclass, field
-from typing import Optional
+from dataclasses import dataclass, field, fields, replace
+from typing import Optional, List, Dict
+
+from .llm import LLMClient, LLMProfile
+from .cache import LLMCache
+from .telemetry import TelemetryWriter
+
+
+# Per-call-site generation settings. Classification stages get tight
+# budgets so a runaway generation cannot hold a llama.cpp slot for minutes.
+DEFAULT_LLM_PROFILES = {
+    "intent": LLMProfile(name="intent", max_tokens=16, temperature=0.0, stop=["\n"], timeout=15),
+    "capability": LLMProfile(name="capability", max_tokens=256, temperature=0.0, timeout=30),
+    "selection": LLMProfile(name="selection", max_tokens=128, temperature=0.0, timeout=30),
+    "params": LLMProfile(name="params", max_tokens=256, temperature=0.0, timeout=30),
+    "route": LLMProfile(name="route", max_tokens=384, temperature=0.0, timeout=30),
+    "plan": LLMProfile(name="plan", max_tokens=512, temperature=0.0, timeout=30),
+    "interpret": LLMProfile(name="interpret", max_tokens=1500, temperature=0.7, timeout=90),
+    "generative": LLMProfile(name="generative", max_tokens=2048, temperature=0.7, timeout=120),
+    "forge": LLMProfile(name="forge", max_tokens=2048, temperature=0.7, timeout=300, priority="forge"),
+}
+
+
+def _profiles_from_env() -> Dict[str, LLMProfile]:
+    """
+    Default profiles with LLM_PROFILE_<NAME>_<FIELD> overrides.
+    
+    Example: LLM_PROFILE_FORGE_MODEL=qwen-coder, LLM_PROFILE_INTENT_STOP="\n,."
+    """
+    profiles = {}
+    for name, default in DEFAULT_LLM_PROFILES.items():
+        overrides = {}
+        for f in fields(LLMProfile):
+            if f.name == "name":
+                continue
+            value = os.environ.get(f"LLM_PROFILE_{name.upper()}_{f.name.upper()}")
+            if value is None:
+                continue
+            if f.name == "stop":
+                overrides["stop"] = [s for s in value.split(",") if s]
+            elif f.name == "max_tokens":
+                overrides[f.name] = int(value)
+            elif f.name in ("temperature", "timeout"):
+                overrides[f.name] = float(value)
+            else:
+                overrides[f.name] = value
+        overrides.setdefault("stop", list(default.stop))
+        profiles[name] = replace(default, **overrides)
+    return profiles
 
 
 @dataclass
@@ -23,6 +70,98 @@ class Config:
     # LLM settings (llama.cpp server)
     llm_base_url: str = "http://llama-gpu:8080/v1"
     llm_model: str = "local-model"
+    llm_api_key: Optional[str] = None
+    llm_timeout: float = 120.0            # Default per-call timeout (seconds)
+    llm_max_connections: int = 16         # Shared keep-alive pool size
+    llm_keepalive_timeout: float = 60.0   # Idle connection lifetime (seconds)
+    
+    # LLM backend pool (several llama.cpp servers, least-loaded routing)
+    llm_base_urls: List[str] = field(default_factory=list)  # Empty = just llm_base_url
+    llm_failure_threshold: int = 3        # Consecutive failures before ejecting an endpoint
+    llm_reset_timeout: float = 30.0       # Seconds ejected before a trial request
+    llm_health_interval: float = 10.0     # Seconds between /health and /slots polls
+    llm_max_in_flight: int = 0            # Admission cap (0 = servers' total slot count)
+    llm_prompt_cache: bool = True         # Send cache_prompt and pin each goal to one slot
+    
+    # Per-call-site LLM profiles (intent, capability, selection, params,
+    # route, plan, interpret, generative, forge)
+    llm_profiles: Dict[str, LLMProfile] = field(
+        default_factory=lambda: {name: replace(p, stop=list(p.stop)) for name, p in DEFAULT_LLM_PROFILES.items()}
+    )
+    
+    # How tool results are returned: raw, structured, rendered or llm
+    # (per request/goal overrides, see output.py)
+    output_mode: str = "llm"
+    
+    # Fast path: "use <tool> with key=value" goals skip the LLM routing
+    fast_path: bool = True
+    
+    # Fused routing: intent, tool and arguments in one call (staged
+    # pipeline as fallback when the answer is invalid or unsure)
+    fused_routing: bool = False
+    fused_routing_min_confidence: float = 0.7
+    
+    # Speculative routing: run the tool capability check alongside intent
+    # classification (needs spare llama.cpp slots to pay off)
+    speculative_routing: bool = False
+    
+    # Goal planning: compound tool goals ("... and ...") are split into a
+    # DAG of sub-goals, at most plan_concurrency running at once (costs a
+    # planning LLM call per compound goal, so off unless enabled)
+    goal_planning: bool = False
+    plan_concurrency: int = 4
+    
+    # Deadlines: optional stages (LLM interpretation, retry, refine, forge)
+    # are skipped when less than this many seconds are left
+    deadline_stage_reserve: float = 10.0
+    
+    # Goal coalescing: identical goals in flight share one run (tools with
+    # coalesce=False excepted); a finished result is shared for window seconds
+    goal_coalescing: bool = False
+    goal_coalescing_window: float = 0.0
+    
+    # Batches (process_many): goals run at once unless the caller says
+    batch_concurrency: int = 8
+    
+    # Pathway cache: replay routes learned from successful tool goals
+    # (exact, then similar goal text) without routing LLM calls. Similar
+    # means close hashed bag-of-words vectors, not embeddings - goals with
+    # mostly the same words match - so it is off unless enabled (an
+    # embedding function can be given to PathwayCache(embed=...) directly)
+    pathway_cache: bool = False
+    pathway_similarity_threshold: float = 0.9
+    pathway_min_confidence: float = 0.6   # Smoothed success rate to replay
+    pathway_max_entries: int = 500
+    
+    # LLM response cache (deterministic calls only)
+    llm_cache_enabled: bool = True
+    llm_cache_max_entries: int = 1024     # In-process LRU size
+    llm_cache_ttl: int = 6 * 3600         # Redis tier TTL (seconds)
+    
+    # Telemetry: event and thought writes are queued and sent to Redis in
+    # pipelined batches off the goal's path (see telemetry.py)
+    telemetry_buffer: bool = True
+    telemetry_queue_size: int = 10000     # Queued writes before dropping
+    telemetry_batch_size: int = 256       # Writes per pipeline
+    telemetry_overflow: str = "drop_oldest"  # or drop_newest
+    
+    # How long a goal's thought tree and event index are kept (seconds);
+    # failed goals' trees are kept longer, for debugging
+    goal_ttl: int = 7 * 24 * 3600
+    goal_failed_ttl: int = 30 * 24 * 3600
+    thought_index_max_goals: int = 100000  # Goals listed in the thought index
+    
+    # Thought archive: a background compactor (API server, and the CLI's
+    # interactive, scheduler and daemon modes) moves completed trees older
+    # than thought_archive_after_hours from Redis to Postgres (compressed)
+    thought_archive: bool = False
+    thought_archive_after_hours: float = 24.0
+    thought_archive_days: int = 90       # Archived trees kept this long
+    
+    # Event consumer groups: events per read, and how long an event may
+    # stay pending on a consumer before another one claims it
+    event_batch_size: int = 100
+    event_claim_idle_ms: int = 60000
     
     # Redis settings  
     redis_host: str = "redis"
@@ -40,6 +179,8 @@ class Config:
     
     # Runtime (set after initialization)
     _redis_client: Optional[redis.Redis] = field(default=None, repr=False)
+    _llm_client: Optional[LLMClient] = field(default=None, repr=False)
+    _telemetry: Optional[TelemetryWriter] = field(default=None, repr=False)
     
     @classmethod
     def from_env(cls) -> 'Config':
@@ -47,6 +188,47 @@ class Config:
         return cls(
             llm_base_url=os.environ.get("LLM_BASE_URL", "http://llama-gpu:8080/v1"),
             llm_model=os.environ.get("LLM_MODEL", "local-model"),
+            llm_api_key=os.environ.get("LLM_API_KEY"),
+            llm_timeout=float(os.environ.get("LLM_TIMEOUT", 120)),
+            llm_max_connections=int(os.environ.get("LLM_MAX_CONNECTIONS", 16)),
+            llm_keepalive_timeout=float(os.environ.get("LLM_KEEPALIVE_TIMEOUT", 60)),
+            llm_base_urls=[u.strip() for u in os.environ.get("LLM_BASE_URLS", "").split(",") if u.strip()],
+            llm_failure_threshold=int(os.environ.get("LLM_FAILURE_THRESHOLD", 3)),
+            llm_reset_timeout=float(os.environ.get("LLM_RESET_TIMEOUT", 30)),
+            llm_health_interval=float(os.environ.get("LLM_HEALTH_INTERVAL", 10)),
+            llm_max_in_flight=int(os.environ.get("LLM_MAX_IN_FLIGHT", 0)),
+            llm_prompt_cache=os.environ.get("LLM_PROMPT_CACHE", "true").lower() == "true",
+            llm_profiles=_profiles_from_env(),
+            output_mode=os.environ.get("OUTPUT_MODE", "llm"),
+            fast_path=os.environ.get("FAST_PATH", "true").lower() == "true",
+            fused_routing=os.environ.get("FUSED_ROUTING", "false").lower() == "true",
+            fused_routing_min_confidence=float(os.environ.get("FUSED_ROUTING_MIN_CONFIDENCE", 0.7)),
+            speculative_routing=os.environ.get("SPECULATIVE_ROUTING", "false").lower() == "true",
+            goal_planning=os.environ.get("GOAL_PLANNING", "false").lower() == "true",
+            plan_concurrency=int(os.environ.get("PLAN_CONCURRENCY", 4)),
+            deadline_stage_reserve=float(os.environ.get("DEADLINE_STAGE_RESERVE", 10)),
+            goal_coalescing=os.environ.get("GOAL_COALESCING", "false").lower() == "true",
+            goal_coalescing_window=float(os.environ.get("GOAL_COALESCING_WINDOW", 0)),
+            batch_concurrency=int(os.environ.get("BATCH_CONCURRENCY", 8)),
+            pathway_cache=os.environ.get("PATHWAY_CACHE", "false").lower() == "true",
+            pathway_similarity_threshold=float(os.environ.get("PATHWAY_SIMILARITY_THRESHOLD", 0.9)),
+            pathway_min_confidence=float(os.environ.get("PATHWAY_MIN_CONFIDENCE", 0.6)),
+            pathway_max_entries=int(os.environ.get("PATHWAY_MAX_ENTRIES", 500)),
+            llm_cache_enabled=os.environ.get("LLM_CACHE_ENABLED", "true").lower() == "true",
+            llm_cache_max_entries=int(os.environ.get("LLM_CACHE_MAX_ENTRIES", 1024)),
+            llm_cache_ttl=int(os.environ.get("LLM_CACHE_TTL", 6 * 3600)),
+            telemetry_buffer=os.environ.get("TELEMETRY_BUFFER", "true").lower() == "true",
+            telemetry_queue_size=int(os.environ.get("TELEMETRY_QUEUE_SIZE", 10000)),
+            telemetry_batch_size=int(os.environ.get("TELEMETRY_BATCH_SIZE", 256)),
+            telemetry_overflow=os.environ.get("TELEMETRY_OVERFLOW", "drop_oldest"),
+            goal_ttl=int(os.environ.get("GOAL_TTL", 7 * 24 * 3600)),
+            goal_failed_ttl=int(os.environ.get("GOAL_FAILED_TTL", 30 * 24 * 3600)),
+            thought_index_max_goals=int(os.environ.get("THOUGHT_INDEX_MAX_GOALS", 100000)),
+            thought_archive=os.environ.get("THOUGHT_ARCHIVE", "false").lower() == "true",
+            thought_archive_after_hours=float(os.environ.get("THOUGHT_ARCHIVE_AFTER_HOURS", 24)),
+            thought_archive_days=int(os.environ.get("THOUGHT_ARCHIVE_DAYS", 90)),
+            event_batch_size=int(os.environ.get("EVENT_BATCH_SIZE", 100)),
+            event_claim_idle_ms=int(os.environ.get("EVENT_CLAIM_IDLE_MS", 60000)),
             redis_host=os.environ.get("REDIS_HOST", "redis"),
             redis_port=int(os.environ.get("REDIS_PORT", 6379)),
             postgres_host=os.environ.get("POSTGRES_HOST", "postgres"),
@@ -62,10 +244,12 @@ class Config:
         """Create config for tests with optional injected Redis."""
         config = cls.from_env()
         config._redis_client = redis_client
+        # Tests should see real LLM behaviour, not cached answers
+        config.llm_cache_enabled = False
         return config
     
-    async def get_redis(self) -> redis.Redis:
-        """Get or create Redis connection."""
+    def _ensure_redis(self) -> redis.Redis:
+        """Create the Redis client if needed (connects lazily on first command)."""
         if self._redis_client is None:
             self._redis_client = redis.Redis(
                 host=self.redis_host,
@@ -73,3 +257,32 @@ class Config:
                 decode_responses=True
             )
         return self._redis_client
+    
+    async def get_redis(self) -> redis.Redis:
+        """Get or create Redis connection."""
+        return self._ensure_redis()
+    
+    def llm_profile(self, name: str) -> LLMProfile:
+        """Get the LLM profile for a call site (defaults if unknown)."""
+        return self.llm_profiles.get(name) or LLMProfile(name=name)
+    
+    def get_telemetry(self) -> Optional[TelemetryWriter]:
+        """Get the shared telemetry writer (None if telemetry_buffer is off)."""
+        if not self.telemetry_buffer:
+            return None
+        if self._telemetry is None:
+            self._telemetry = TelemetryWriter.from_config(self)
+        return self._telemetry
+    
+    def get_llm(self) -> LLMClient:
+        """Get the shared LLM client (one per config, pooled connections)."""
+        if self._llm_client is None:
+            cache = None
+            if self.llm_cache_enabled:
+                cache = LLMCache(
+                    self._ensure_redis(),
+                    max_entries=self.llm_cache_max_entries,
+                    ttl_seconds=self.llm_cache_ttl,
+                )
+            self._llm_client = LLMClient.from_config(self, cache=cache)
+        return self._llm_client
@@ -3,17 +3,29 @@ Events - Fractal event system for neuron observation.
 
 Every neuron emits events. Events flow to EventBus.
 Simple, observable, debuggable.
+
+Events are stored as a fixed schema of short stream fields (EVENT_FIELDS)
+with a numeric timestamp; entries in the older long-field format are
+still read.
 """
 
 import json
+import time
 import uuid
 import asyncio
+import logging
+import reprlib
 from enum import Enum
 from datetime import datetime, timezone
-from dataclasses import dataclass, field, asdict
-from typing import Optional, Dict, Any, List, Callable
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, List, Callable, Awaitable, AsyncIterator
 import redis.asyncio as redis
 
+from .telemetry import TelemetryWriter
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
 
 class EventType(Enum):
     """Types of events neurons can emit."""
@@ -29,6 +41,68 @@ class EventType(Enum):
     NEURON_ERROR = "neuron_error"
 
 
+PREVIEW_CHARS = 200
+
+_preview_repr = reprlib.Repr()
+_preview_repr.maxstring = PREVIEW_CHARS
+_preview_repr.maxother = PREVIEW_CHARS
+_preview_repr.maxlevel = 3
+
+
+class Preview:
+    """
+    Bounded text of a value for an event, computed when the event is stored.
+    
+    Unlike str(value)[:200], containers are rendered only as far as the
+    limit needs (reprlib), so a large tool output is never stringified
+    whole. The value is released once the text is computed.
+    """
+    
+    __slots__ = ("_value", "_limit", "_text")
+    
+    def __init__(self, value: Any, limit: int = PREVIEW_CHARS):
+        self._value = value
+        self._limit = limit
+        self._text: Optional[str] = None
+    
+    def __str__(self) -> str:
+        if self._text is None:
+            value = self._value
+            text = value if isinstance(value, str) else _preview_repr.repr(value)
+            self._text = text[:self._limit]
+            self._value = None
+        return self._text
+    
+    __repr__ = __str__
+
+
+def _encode(value: Any) -> str:
+    """Compact JSON; Previews and unserializable values become bounded text."""
+    return json.dumps(value, separators=(",", ":"), default=lambda v: str(v if isinstance(v, Preview) else Preview(v)))
+
+
+def _timestamp(value: Any) -> float:
+    """Epoch seconds from a stored timestamp (numeric, or ISO in older entries)."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+# Stream field -> Event attribute
+EVENT_FIELDS = {
+    "t": "event_type",
+    "n": "neuron_type",
+    "g": "goal_id",
+    "ts": "timestamp",
+    "d": "duration_ms",
+    "i": "input_data",
+    "o": "output_data",
+    "e": "error",
+    "m": "metadata",
+}
+
+
 @dataclass
 class Event:
     """
@@ -40,8 +114,8 @@ class Event:
     neuron_type: str
     goal_id: str
     
-    # Timing
-    timestamp: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    # Timing (epoch seconds)
+    timestamp: float = field(default_factory=time.time)
     duration_ms: Optional[int] = None
     
     # Context
@@ -50,21 +124,71 @@ class Event:
     error: Optional[str] = None
     metadata: Dict[str, Any] = field(default_factory=dict)
     
-    # Unique ID
+    # Unique ID (the stream ID once stored, not saved in the entry)
     event_id: str = field(default_factory=lambda: str(uuid.uuid4()))
     
+    @property
+    def isotime(self) -> str:
+        return datetime.fromtimestamp(self.timestamp, timezone.utc).isoformat()
+    
+    def to_fields(self) -> Dict[str, str]:
+        """Stream entry fields (EVENT_FIELDS); None and empty values are left out."""
+        fields = {
+            "t": self.event_type.value,
+            "n": self.neuron_type,
+            "g": self.goal_id,
+            "ts": f"{self.timestamp:.3f}",
+        }
+        if self.duration_ms is not None:
+            fields["d"] = str(self.duration_ms)
+        for key, value in (("i", self.input_data), ("o", self.output_data), ("e", self.error)):
+            if value is not None:
+                fields[key] = value if isinstance(value, str) else _encode(value)
+        if self.metadata:
+            fields["m"] = _encode(self.metadata)
+        return fields
+    
+    @classmethod
+    def from_fields(cls, fields: Dict[str, str], event_id: Optional[str] = None) -> 'Event':
+        """Reconstruct from stream entry fields (either format)."""
+        if "event_type" in fields:
+            return cls.from_dict(fields)
+        
+        data = {EVENT_FIELDS[k]: v for k, v in fields.items() if k in EVENT_FIELDS}
+        data["event_type"] = EventType(data["event_type"])
+        data["timestamp"] = _timestamp(data["timestamp"])
+        if "duration_ms" in data:
+            data["duration_ms"] = int(data["duration_ms"])
+        data["metadata"] = json.loads(data["metadata"]) if data.get("metadata") else {}
+        if event_id is not None:
+            data["event_id"] = event_id
+        return cls(**data)
+    
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dict for Redis storage."""
-        d = asdict(self)
-        d['event_type'] = self.event_type.value
-        # Remove None values
+        """Convert to dict (None values left out)."""
+        d = {
+            "event_type": self.event_type.value,
+            "neuron_type": self.neuron_type,
+            "goal_id": self.goal_id,
+            "timestamp": self.timestamp,
+            "duration_ms": self.duration_ms,
+            "input_data": self.input_data,
+            "output_data": self.output_data,
+            "error": self.error,
+            "metadata": self.metadata,
+            "event_id": self.event_id,
+        }
         return {k: v for k, v in d.items() if v is not None}
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Event':
-        """Reconstruct from dict."""
+        """Reconstruct from dict (also the older stream entry format)."""
         data = data.copy()
         data['event_type'] = EventType(data['event_type'])
+        if 'timestamp' in data:
+            data['timestamp'] = _timestamp(data['timestamp'])
+        if isinstance(data.get('metadata'), str):
+            data['metadata'] = json.loads(data['metadata']) if data['metadata'] else {}
         return cls(**data)
 
 
@@ -74,26 +198,62 @@ class EventBus:
     
     Neurons emit events → EventBus stores them → Observers can subscribe.
     
+    Each goal's events are also added to its own stream (GOAL_STREAM_PREFIX,
+    expiring goal_ttl seconds after the last event), so get_events for a
+    goal reads only that goal's events.
+    
+    With a TelemetryWriter, emit() queues the XADDs instead of awaiting
+    them (the event keeps its uuid event_id); reads flush the queue first.
+    The entry is encoded when it is written, so Preview values in the
+    metadata are only rendered then, off the goal's path.
+    
+    subscribe() shows every event to every subscriber. Consumer groups
+    share the stream instead: each event goes to one consumer of the
+    group, and stays pending until acknowledged. Events a crashed
+    consumer left pending for claim_idle_ms are claimed by the others.
+    
     Usage:
         bus = EventBus(config)
         await bus.emit(Event(...))
         
         async for event in bus.subscribe():
             print(event)
+        
+        # One of several workers sharing the "archive" group
+        await bus.process_group("archive", "worker-1", handle_batch)
     """
     
     STREAM_KEY = "neural:events"
     MAX_LEN = 10000  # Keep last 10k events
+    GOAL_STREAM_PREFIX = "neural:events:goal:"
+    GOAL_MAX_LEN = 1000  # Events kept per goal
     
-    def __init__(self, redis_client: redis.Redis = None):
+    def __init__(
+        self,
+        redis_client: redis.Redis = None,
+        writer: Optional[TelemetryWriter] = None,
+        goal_ttl: Optional[int] = None,
+        batch_size: int = 100,
+        claim_idle_ms: int = 60000,
+    ):
         self._redis = redis_client
+        self._writer = writer
+        self.goal_ttl = goal_ttl
+        self.batch_size = batch_size  # Events per consumer group read
+        self.claim_idle_ms = claim_idle_ms  # Pending this long = consumer gone
     
     @classmethod
     def from_config(cls, config) -> 'EventBus':
         """Create EventBus from config."""
-        # Config has get_redis() async method, but we can create without it
-        # and lazily connect
-        return cls(redis_client=None)
+        # Same client (REDIS_HOST/REDIS_PORT) as the writer, so reads see the
+        # writes; it connects lazily
+        return cls(
+            redis_client=config._ensure_redis(),
+            writer=config.get_telemetry(),
+            goal_ttl=config.goal_ttl,
+            batch_size=config.event_batch_size,
+            claim_idle_ms=config.event_claim_idle_ms,
+        )
     
     async def _get_redis(self) -> redis.Redis:
         """Get Redis connection."""
@@ -119,8 +279,6 @@ class EventBus:
         
         Returns the Event (with event_id set).
         """
-        r = await self._get_redis()
-        
         # Build event from kwargs if not provided
         if event is None:
             if event_type is None or source is None or goal_id is None:
@@ -133,22 +291,25 @@ class EventBus:
                 metadata=data or {},
             )
         
-        event_data = event.to_dict()
+        def store(pipe):
+            event_data = event.to_fields()
+            pipe.xadd(self.STREAM_KEY, event_data, maxlen=self.MAX_LEN)
+            goal_key = f"{self.GOAL_STREAM_PREFIX}{event.goal_id}"
+            pipe.xadd(goal_key, event_data, maxlen=self.GOAL_MAX_LEN)
+            if self.goal_ttl:
+                pipe.expire(goal_key, self.goal_ttl)
         
-        # Serialize complex fields
-        for key in ['metadata', 'input_data', 'output_data']:
-            if key in event_data and event_data[key]:
-                if isinstance(event_data[key], (dict, list)):
-                    event_data[key] = json.dumps(event_data[key])
+        if self._writer is not None:
+            self._writer.write(store)
+            return event
         
-        event_id = await r.xadd(
-            self.STREAM_KEY,
-            event_data,
-            maxlen=self.MAX_LEN,
-        )
+        r = await self._get_redis()
+        pipe = r.pipeline(transaction=False)
+        store(pipe)
+        results = await pipe.execute()
         
         # Store the Redis event ID
-        event.event_id = event_id
+        event.event_id = results[0]
         
         return event
     
@@ -159,42 +320,54 @@ class EventBus:
         limit: int = 100,
     ) -> List[Event]:
         """
-        Get events, optionally filtered.
+        Get events, newest first, optionally filtered.
+        
+        For a goal, reads its own stream (O(its events)); goals from before
+        the per-goal streams fall back to recent events in the shared one.
         """
+        if self._writer is not None:
+            await self._writer.flush()
         r = await self._get_redis()
         
-        # Get all recent events
-        raw_events = await r.xrevrange(self.STREAM_KEY, count=limit * 2)
+        raw_events = []
+        if goal_id:
+            # A neuron filter may skip some of the goal's events; read them all
+            count = self.GOAL_MAX_LEN if neuron_type else limit
+            raw_events = await r.xrevrange(f"{self.GOAL_STREAM_PREFIX}{goal_id}", count=count)
+        if not raw_events:
+            # Get all recent events
+            raw_events = await r.xrevrange(self.STREAM_KEY, count=limit * 2)
         
         events = []
         for event_id, data in raw_events:
-            # Parse JSON fields
-            for key in ['metadata']:
-                if key in data and data[key]:
-                    try:
-                        data[key] = json.loads(data[key])
-                    except json.JSONDecodeError:
-                        pass
+            event = self._parse(data, event_id)
+            if event is None:
+                continue
             
-            try:
-                event = Event.from_dict(data)
-                
-                # Apply filters
-                if goal_id and event.goal_id != goal_id:
-                    continue
-                if neuron_type and event.neuron_type != neuron_type:
-                    continue
-                
-                events.append(event)
-                
-                if len(events) >= limit:
-                    break
-                    
-            except (KeyError, ValueError):
+            # Apply filters
+            if goal_id and event.goal_id != goal_id:
+                continue
+            if neuron_type and event.neuron_type != neuron_type:
                 continue
+            
+            events.append(event)
+            
+            if len(events) >= limit:
+                break
         
         return events
     
+    @staticmethod
+    def _parse(data: Optional[Dict[str, str]], event_id: Optional[str] = None) -> Optional[Event]:
+        """Event from stream entry fields (None if missing or malformed)."""
+        if not data:
+            return None
+        
+        try:
+            return Event.from_fields(data, event_id)
+        except (KeyError, ValueError, TypeError, AttributeError):
+            return None
+    
     async def subscribe(self, last_id: str = "$"):
         """
         Subscribe to new events.
@@ -221,18 +394,135 @@ class EventBus:
                 for msg_id, data in messages:
                     last_id = msg_id
                     
-                    # Parse JSON fields
-                    for key in ['metadata']:
-                        if key in data and data[key]:
-                            try:
-                                data[key] = json.loads(data[key])
-                            except json.JSONDecodeError:
-                                pass
-                    
-                    try:
-                        yield Event.from_dict(data)
-                    except (KeyError, ValueError):
-                        continue
+                    event = self._parse(data, msg_id)
+                    if event is not None:
+                        yield event
+    
+    async def ensure_group(self, group: str, start_id: str = "$") -> None:
+        """
+        Create a consumer group if it does not exist.
+        
+        start_id "$" delivers only events emitted from now on, "0" the
+        whole stream.
+        """
+        r = await self._get_redis()
+        try:
+            await r.xgroup_create(self.STREAM_KEY, group, id=start_id, mkstream=True)
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+    
+    async def consume(
+        self,
+        group: str,
+        consumer: str,
+        batch_size: Optional[int] = None,
+        block_ms: int = 5000,
+    ) -> AsyncIterator[List[Event]]:
+        """
+        Read batches of events as one consumer of a group.
+        
+        Yields this consumer's own pending events first (it restarted
+        after a crash), then new ones; every claim_idle_ms it also claims
+        events other consumers left pending that long. Each event's
+        event_id is its stream ID - pass them to ack() once handled, or
+        they are delivered again.
+        
+        Usage:
+            async for events in bus.consume("metrics", "worker-1"):
+                handle(events)
+                await bus.ack("metrics", *[e.event_id for e in events])
+        """
+        r = await self._get_redis()
+        count = batch_size or self.batch_size
+        await self.ensure_group(group)
+        
+        read_from = "0"  # Our pending entries; ">" once they are done
+        next_claim = time.monotonic() + self.claim_idle_ms / 1000
+        
+        while True:
+            if time.monotonic() >= next_claim:
+                next_claim = time.monotonic() + self.claim_idle_ms / 1000
+                claimed = await self._claim(group, consumer, count)
+                if claimed:
+                    yield claimed
+            
+            results = await r.xreadgroup(
+                group,
+                consumer,
+                {self.STREAM_KEY: read_from},
+                count=count,
+                block=None if read_from != ">" else block_ms,
+            )
+            messages = results[0][1] if results else []
+            if read_from != ">":
+                if not messages:
+                    read_from = ">"
+                    continue
+                read_from = messages[-1][0]
+            
+            events = await self._events(group, messages)
+            if events:
+                metrics.counter("events_consumed", group=group).inc(len(events))
+                yield events
+    
+    async def ack(self, group: str, *event_ids: str) -> None:
+        """Acknowledge handled events (stream IDs) for a group."""
+        if event_ids:
+            r = await self._get_redis()
+            await r.xack(self.STREAM_KEY, group, *event_ids)
+    
+    async def process_group(
+        self,
+        group: str,
+        consumer: str,
+        handler: Callable[[List[Event]], Awaitable[None]],
+        batch_size: Optional[int] = None,
+    ) -> None:
+        """
+        Run handler on every batch this consumer gets, until cancelled.
+        
+        A batch is acknowledged once handler returns. If it raises, the
+        batch stays pending and is retried by whichever consumer claims
+        it after claim_idle_ms.
+        """
+        async for events in self.consume(group, consumer, batch_size=batch_size):
+            try:
+                await handler(events)
+            except Exception as e:
+                logger.warning(f"Event handler for group {group} failed: {e}")
+                metrics.counter("event_handler_errors", group=group).inc()
+                continue
+            await self.ack(group, *[e.event_id for e in events])
+    
+    async def _claim(self, group: str, consumer: str, count: int) -> List[Event]:
+        """Take over events pending on other consumers for claim_idle_ms."""
+        r = await self._get_redis()
+        claimed, start = [], "0-0"
+        while len(claimed) < count:
+            result = await r.xautoclaim(
+                self.STREAM_KEY, group, consumer,
+                min_idle_time=self.claim_idle_ms, start_id=start, count=count - len(claimed),
+            )
+            start, messages = result[0], result[1]
+            claimed.extend(await self._events(group, messages))
+            if start in ("0-0", b"0-0"):
+                break
+        if claimed:
+            metrics.counter("events_claimed", group=group).inc(len(claimed))
+        return claimed
+    
+    async def _events(self, group: str, messages) -> List[Event]:
+        """Events from group read entries; unreadable ones are acknowledged."""
+        events, unreadable = [], []
+        for msg_id, data in messages:
+            event = self._parse(data, msg_id)
+            if event is None:
+                unreadable.append(msg_id)
+                continue
+            events.append(event)
+        await self.ack(group, *unreadable)
+        return events
     
     async def clear(self):
         """Clear all events (for testing)."""
@@ -1,43 +1,174 @@
 """
 LLM Client - Single interface to language models.
 
-Uses raw HTTP requests to llama.cpp server (no external dependencies).
+Talks to the llama.cpp server's OpenAI-compatible API with aiohttp.
+All clients in a process share one keep-alive connection pool per event
+loop, so neurons reuse TCP connections instead of opening one per call.
+
+Several llama.cpp servers can be configured (LLM_BASE_URLS); requests are
+routed to the least-loaded healthy one, see backends.py.
+
+In-flight requests are capped at the servers' slot count and queued by
+priority (interactive > scheduled > forge), see admission.py.
+
+Every call records its tokens and prefill/decode timings, see usage.py.
+
+Calls are cancellable: cancelling the calling task closes the HTTP
+connection, which makes llama.cpp stop decoding and free the slot. Inside
+a goal, calls also stop at the goal's deadline (see cancel.py).
 """
 
 import os
+import time
 import asyncio
 import json
-import requests
-from concurrent.futures import ThreadPoolExecutor
-from typing import Optional, Dict, Any
+import weakref
+import aiohttp
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, AsyncIterator, List
+
+from .cache import LLMCache
+from .backends import Backend, BackendPool, NoBackendAvailable
+from .admission import AdmissionController, effective_priority
+from .usage import LLMCall, record_llm_call
+from .cancel import current_cancel_token
+from .metrics import metrics
+
+
+# Shared connection pools: event loop -> {(limit, keepalive): session}.
+# aiohttp sessions are bound to the loop that created them, so each loop
+# gets its own pool. Weak keys let pools disappear with their loop.
+_sessions = weakref.WeakKeyDictionary()
+
+# Backend pools with a health poller, stopped by close_all()
+_polled_pools = weakref.WeakSet()
+
+
+def _remaining(deadline: float) -> aiohttp.ClientTimeout:
+    """HTTP timeout for what is left of a deadline."""
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise asyncio.TimeoutError("LLM deadline passed")
+    return aiohttp.ClientTimeout(total=remaining)
+
+
+def _retryable(error: Exception) -> bool:
+    """Connection failures and 5xx answers are worth another endpoint."""
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status >= 500
+    return isinstance(error, aiohttp.ClientConnectionError)
 
 
-# Thread pool for running sync requests in async context
-_executor = ThreadPoolExecutor(max_workers=4)
+@dataclass
+class LLMProfile:
+    """
+    Generation settings for one call site.
+    
+    Neurons look up their profile by name (Config.llm_profile("intent"))
+    and pass it to generate(); explicit arguments still win.
+    """
+    name: str = "default"               # Call site, labels usage metrics
+    max_tokens: int = 2048
+    temperature: float = 0.7
+    stop: List[str] = field(default_factory=list)  # Stop sequences
+    timeout: Optional[float] = None     # Seconds (None = client default)
+    priority: str = "interactive"       # interactive, scheduled, forge
+    model: Optional[str] = None         # None = client default model
 
 
 class LLMClient:
     """
-    Simple LLM client using raw HTTP to llama.cpp server.
+    Async LLM client for the llama.cpp server.
     
     Usage:
-        llm = LLMClient(config)
+        llm = config.get_llm()
         response = await llm.generate("What is 2+2?")
+    
+    Concurrency is bounded only by the shared pool size
+    (max_connections), not by a thread pool.
+    
+    With several endpoints (base_urls), each request goes to the one with
+    the fewest outstanding requests; failing endpoints are ejected.
+    
+    At most max_in_flight requests run at once (default: the slot count
+    reported by /slots); the rest wait by priority until their deadline.
     """
     
-    def __init__(self, base_url: str = None, api_key: str = None, model: str = None):
-        self.base_url = (base_url or os.environ.get("LLM_BASE_URL", "http://llama-gpu:8080/v1")).rstrip("/")
+    def __init__(
+        self,
+        base_url: str = None,
+        api_key: str = None,
+        model: str = None,
+        timeout: float = 120.0,
+        max_connections: int = 16,
+        keepalive_timeout: float = 60.0,
+        cache: Optional[LLMCache] = None,
+        base_urls: List[str] = None,
+        failure_threshold: int = 3,
+        reset_timeout: float = 30.0,
+        health_interval: float = 10.0,
+        max_in_flight: Optional[int] = None,
+        prompt_cache: bool = True,
+    ):
+        if not base_urls:
+            base_url = base_url or os.environ.get("LLM_BASE_URL", "http://llama-gpu:8080/v1")
+            base_urls = [url.strip() for url in base_url.split(",") if url.strip()]
+        
+        self.pool = BackendPool(
+            base_urls,
+            failure_threshold=failure_threshold,
+            reset_timeout=reset_timeout,
+            health_interval=health_interval,
+        )
+        self.base_url = self.pool.backends[0].base_url  # Primary endpoint (for display)
+        
+        # None = follow the servers' slot count once /slots has answered
+        self._auto_in_flight = max_in_flight is None
+        self.admission = AdmissionController(max_in_flight or max_connections)
+        self.api_key = api_key or os.environ.get("LLM_API_KEY")
         self.model = model or os.environ.get("LLM_MODEL", "local-model")
-        self.timeout = 120  # 2 minutes for generation
+        self.timeout = timeout  # Default per-call timeout (seconds)
+        self.max_connections = max_connections
+        self.keepalive_timeout = keepalive_timeout
+        self.cache = cache  # Serves deterministic (temperature=0) calls
+        self.prompt_cache = prompt_cache  # llama.cpp cache_prompt + per-goal id_slot
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Get the shared session for the running event loop."""
+        loop = asyncio.get_running_loop()
+        pools = _sessions.setdefault(loop, {})
+        key = (self.max_connections, self.keepalive_timeout)
+        
+        session = pools.get(key)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            session = aiohttp.ClientSession(connector=connector)
+            pools[key] = session
+        return session
     
-    def _generate_sync(
+    def _headers(self) -> Dict[str, str]:
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
+    
+    def _build_payload(
         self,
         prompt: str,
         system: str = None,
-        temperature: float = 0.7,
-        max_tokens: int = 2048,
-    ) -> str:
-        """Synchronous generation (internal)."""
+        temperature: float = None,
+        max_tokens: int = None,
+        profile: LLMProfile = None,
+    ) -> Dict[str, Any]:
+        """
+        Build an OpenAI-compatible chat completion request body.
+        
+        Explicit temperature/max_tokens override the profile's.
+        """
+        profile = profile or LLMProfile()
         messages = []
         
         if system:
@@ -45,28 +176,168 @@ class LLMClient:
         
         messages.append({"role": "user", "content": prompt})
         
-        # Call llama.cpp OpenAI-compatible endpoint
-        response = requests.post(
-            f"{self.base_url}/chat/completions",
-            json={
-                "model": self.model,
-                "messages": messages,
-                "temperature": temperature,
-                "max_tokens": max_tokens,
-            },
-            timeout=self.timeout,
-        )
-        response.raise_for_status()
+        payload = {
+            "model": profile.model or self.model,
+            "messages": messages,
+            "temperature": profile.temperature if temperature is None else temperature,
+            "max_tokens": profile.max_tokens if max_tokens is None else max_tokens,
+        }
+        if profile.stop:
+            payload["stop"] = list(profile.stop)
+        if self.prompt_cache:
+            payload["cache_prompt"] = True  # Reuse the slot's KV cache for the common prefix
+        return payload
+    
+    def _deadline(
+        self,
+        timeout: Optional[float],
+        profile: Optional[LLMProfile],
+        deadline: Optional[float] = None,
+    ) -> float:
+        """
+        Absolute time.monotonic() deadline for a call, queueing included.
+        
+        Timeout: explicit, then profile, then client default. A caller's
+        deadline, or the running goal's (cancel token), can only shorten it.
+        """
+        if timeout is None and profile is not None:
+            timeout = profile.timeout
+        limit = time.monotonic() + (timeout or self.timeout)
+        
+        token = current_cancel_token()
+        for bound in (deadline, token.deadline if token else None):
+            if bound:
+                limit = min(limit, bound)
+        return limit
+    
+    @staticmethod
+    def _priority(priority: Optional[str], profile: Optional[LLMProfile]) -> str:
+        return effective_priority(priority or (profile.priority if profile else None))
+    
+    async def _admit(self, priority: str, deadline: float) -> None:
+        """Wait for an in-flight slot (raises asyncio.TimeoutError at the deadline)."""
+        if self._auto_in_flight:
+            slots = self.pool.slot_count()
+            if slots:
+                self.admission.set_limit(slots)
+        await self.admission.acquire(priority, deadline)
+    
+    def _acquire_backend(self, exclude: List[Backend] = None, affinity: str = None) -> Backend:
+        """Pick an endpoint, starting the health/slots poller on first use."""
+        if self.pool.polling_loop() is not asyncio.get_running_loop():
+            self.pool.start_polling()
+            _polled_pools.add(self.pool)
+        return self.pool.acquire(exclude, affinity=affinity)
+    
+    def _route(self, payload: Dict[str, Any], backend: Backend, affinity: Optional[str]) -> Dict[str, Any]:
+        """
+        Pin a goal's calls to one llama.cpp slot (id_slot).
+        
+        The slot still holds the goal's prompt prefix in its KV cache from
+        the previous stage, so only the new suffix is prefilled.
+        """
+        if not (self.prompt_cache and affinity):
+            return payload
+        slot = self.pool.slot_for(backend, affinity)
+        if slot is None:
+            return payload  # Slot count unknown - llama.cpp picks by prompt similarity
+        return {**payload, "id_slot": slot}
+    
+    def release_affinity(self, affinity: str) -> None:
+        """A goal's calls are done: free the llama.cpp slot pinned to it."""
+        self.pool.release_affinity(affinity)
+    
+    async def _post_completion(
+        self,
+        payload: Dict[str, Any],
+        priority: str = "interactive",
+        deadline: float = None,
+        affinity: str = None,
+        call: LLMCall = None,
+    ) -> str:
+        """
+        POST a chat completion and return the message content (internal).
+        
+        Waits for an admission slot first. Connection errors and 5xx
+        answers are retried once on every other available endpoint.
+        Timeouts are not retried: the budget is spent.
+        
+        Queue wait, tokens and timings are filled into `call`.
+        """
+        deadline = deadline or self._deadline(None, None)
+        call = call or LLMCall(profile="default", model=payload["model"])
+        
+        queued = time.monotonic()
+        await self._admit(priority, deadline)
+        call.queue_ms = (time.monotonic() - queued) * 1000
+        try:
+            return await self._post_admitted(payload, deadline, affinity, call)
+        finally:
+            self.admission.release()
+    
+    async def _post_admitted(
+        self,
+        payload: Dict[str, Any],
+        deadline: float,
+        affinity: str,
+        call: LLMCall,
+    ) -> str:
+        session = await self._get_session()
+        tried = []
         
-        data = response.json()
-        return data["choices"][0]["message"]["content"].strip()
+        while True:
+            client_timeout = _remaining(deadline)
+            try:
+                backend = self._acquire_backend(exclude=tried, affinity=affinity)
+            except NoBackendAvailable:
+                if tried:
+                    raise last_error
+                raise
+            
+            try:
+                async with session.post(
+                    f"{backend.base_url}/chat/completions",
+                    json=self._route(payload, backend, affinity),
+                    headers=self._headers(),
+                    timeout=client_timeout,
+                ) as response:
+                    try:
+                        response.raise_for_status()
+                        data = await response.json(content_type=None)
+                    except asyncio.CancelledError:
+                        response.close()  # Drop the connection so llama.cpp stops decoding
+                        raise
+            
+            except asyncio.CancelledError:
+                self.pool.release(backend, ok=None)
+                metrics.counter("llm_cancelled", profile=call.profile).inc()
+                raise
+            
+            except Exception as e:
+                failed = _retryable(e) or isinstance(e, asyncio.TimeoutError)
+                self.pool.release(backend, ok=False if failed else None)
+                if not _retryable(e):
+                    raise
+                tried.append(backend)
+                last_error = e
+                continue
+            
+            self.pool.release(backend, ok=True)
+            call.backend = backend.base_url
+            call.add_response(data)
+            return data["choices"][0]["message"]["content"].strip()
     
     async def generate(
         self,
         prompt: str,
         system: str = None,
-        temperature: float = 0.7,
-        max_tokens: int = 2048,
+        temperature: float = None,
+        max_tokens: int = None,
+        timeout: float = None,
+        profile: LLMProfile = None,
+        priority: str = None,
+        deadline: float = None,
+        affinity: str = None,
     ) -> str:
         """
         Generate a response from the LLM.
@@ -74,53 +345,246 @@ class LLMClient:
         Args:
             prompt: User message
             system: Optional system prompt
-            temperature: Creativity (0=deterministic, 1=creative)
-            max_tokens: Maximum response length
-            
+            temperature: Creativity (0=deterministic, 1=creative; default 0.7)
+            max_tokens: Maximum response length (default 2048)
+            timeout: Per-call timeout in seconds, queueing included
+                (default: profile, then client timeout)
+            profile: Call-site settings; explicit arguments override it
+            priority: interactive, scheduled or forge (default: profile's,
+                demoted by llm_priority() context)
+            deadline: time.monotonic() deadline of the caller
+            affinity: Key (usually the goal id) whose calls share a
+                backend and slot, so the prompt prefix stays cached
+        
         Returns:
             Generated text response
+        
+        Deterministic calls (temperature=0) go through the response cache
+        when one is configured.
         """
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            _executor,
-            lambda: self._generate_sync(prompt, system, temperature, max_tokens)
+        payload = self._build_payload(prompt, system, temperature, max_tokens, profile)
+        return await self._complete(
+            payload,
+            priority=self._priority(priority, profile),
+            deadline=self._deadline(timeout, profile, deadline),
+            affinity=affinity,
+            site=profile.name if profile else "default",
         )
     
+    async def _complete(
+        self,
+        payload: Dict[str, Any],
+        priority: str,
+        deadline: float,
+        affinity: str = None,
+        site: str = "default",
+    ) -> str:
+        """
+        Run a completion, through the cache when it is deterministic.
+        
+        Records the call's usage under `site` (the profile name).
+        """
+        started = time.monotonic()
+        call = LLMCall(profile=site, model=payload["model"], cache_hit=True)
+        
+        async def post():
+            call.cache_hit = False
+            return await self._post_completion(
+                payload, priority=priority, deadline=deadline, affinity=affinity, call=call
+            )
+        
+        if self.cache is not None and payload["temperature"] == 0:
+            content = await self.cache.get_or_compute(LLMCache.make_key(payload), post)
+        else:
+            content = await post()
+        
+        call.total_ms = (time.monotonic() - started) * 1000
+        record_llm_call(call)
+        return content
+    
+    async def stream(
+        self,
+        prompt: str,
+        system: str = None,
+        temperature: float = None,
+        max_tokens: int = None,
+        timeout: float = None,
+        profile: LLMProfile = None,
+        priority: str = None,
+        deadline: float = None,
+        affinity: str = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream a response from the LLM token by token.
+        
+        Uses llama.cpp's `stream: true` Server-Sent-Events output.
+        
+        Usage:
+            async for token in llm.stream("Tell me a story"):
+                print(token, end="")
+        """
+        payload = self._build_payload(prompt, system, temperature, max_tokens, profile)
+        payload["stream"] = True
+        deadline = self._deadline(timeout, profile, deadline)
+        session = await self._get_session()
+        
+        started = time.monotonic()
+        call = LLMCall(profile=profile.name if profile else "default", model=payload["model"])
+        
+        await self._admit(self._priority(priority, profile), deadline)
+        call.queue_ms = (time.monotonic() - started) * 1000
+        try:
+            client_timeout = _remaining(deadline)
+            backend = self._acquire_backend(affinity=affinity)
+        except Exception:
+            self.admission.release()
+            raise
+        ok = None
+        
+        try:
+            async with session.post(
+                f"{backend.base_url}/chat/completions",
+                json=self._route(payload, backend, affinity),
+                headers=self._headers(),
+                timeout=client_timeout,
+            ) as response:
+                response.raise_for_status()
+                
+                try:
+                    async for raw_line in response.content:
+                        line = raw_line.decode("utf-8").strip()
+                        if not line.startswith("data:"):
+                            continue
+                        
+                        data = line[len("data:"):].strip()
+                        if data == "[DONE]":
+                            break
+                        
+                        chunk = json.loads(data)
+                        if "timings" in chunk or "usage" in chunk:
+                            call.add_response(chunk)  # Final chunk
+                        choices = chunk.get("choices") or [{}]
+                        token = (choices[0].get("delta") or {}).get("content")
+                        if token:
+                            yield token
+                
+                except (asyncio.CancelledError, GeneratorExit):
+                    # Consumer went away (task cancelled, generator closed):
+                    # dropping the connection makes llama.cpp stop decoding
+                    response.close()
+                    metrics.counter("llm_cancelled", profile=call.profile).inc()
+                    raise
+            ok = True
+        
+        except Exception as e:
+            if _retryable(e) or isinstance(e, asyncio.TimeoutError):
+                ok = False
+            raise
+        
+        finally:
+            self.pool.release(backend, ok=ok)
+            self.admission.release()
+        
+        call.backend = backend.base_url
+        call.total_ms = (time.monotonic() - started) * 1000
+        record_llm_call(call)
+    
     async def generate_json(
         self,
         prompt: str,
         system: str = None,
         temperature: float = 0.0,  # Deterministic for structured output
+        timeout: float = None,
+        schema: Dict[str, Any] = None,
+        max_tokens: int = None,
+        profile: LLMProfile = None,
+        priority: str = None,
+        deadline: float = None,
+        affinity: str = None,
     ) -> Dict[str, Any]:
         """
         Generate JSON response from the LLM.
         
         Uses temperature=0 for consistency.
         Parses and returns dict.
+        
+        With a JSON schema, llama.cpp constrains decoding to it (compiled
+        to a grammar server-side), so the output always parses and needs
+        no markdown scraping.
+        
+        Usage:
+            schema = {"type": "object", "properties": {"tool": {"type": "string"}}}
+            response = await llm.generate_json(prompt, schema=schema)
         """
-        response = await self.generate(
-            prompt=prompt,
-            system=system,
-            temperature=temperature,
+        payload = self._build_payload(prompt, system, temperature, max_tokens, profile)
+        if schema is not None:
+            payload["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {"name": "response", "schema": schema, "strict": True},
+            }
+        
+        response = await self._complete(
+            payload,
+            priority=self._priority(priority, profile),
+            deadline=self._deadline(timeout, profile, deadline),
+            affinity=affinity,
+            site=profile.name if profile else "default",
         )
         
+        if schema is not None:
+            try:
+                parsed = json.loads(response)
+                if isinstance(parsed, dict):
+                    return parsed
+            except json.JSONDecodeError:
+                pass
+            # Server ignored the schema (not JSON, or not an object) - fall back to scraping
+        
         # Try to extract JSON from response
+        text = response
         try:
             # Handle markdown code blocks
-            if "```json" in response:
-                response = response.split("```json")[1].split("```")[0]
-            elif "```" in response:
-                response = response.split("```")[1].split("```")[0]
+            if "```json" in text:
+                text = text.split("```json")[1].split("```")[0]
+            elif "```" in text:
+                text = text.split("```")[1].split("```")[0]
             
-            return json.loads(response.strip())
+            parsed = json.loads(text.strip())
+            if isinstance(parsed, dict):
+                return parsed
         except json.JSONDecodeError:
-            # Return raw response wrapped in dict
-            return {"raw": response, "error": "Failed to parse JSON"}
+            pass
+        
+        # Return raw response wrapped in dict
+        return {"raw": text, "error": "Failed to parse JSON"}
+    
+    @staticmethod
+    async def close_all() -> None:
+        """Close the shared connection pools and health pollers of the running event loop."""
+        for pool in list(_polled_pools):
+            if pool.polling_loop() is asyncio.get_running_loop():
+                await pool.stop_polling()
+                _polled_pools.discard(pool)
+        
+        loop = asyncio.get_running_loop()
+        for session in _sessions.pop(loop, {}).values():
+            await session.close()
     
     @classmethod
-    def from_config(cls, config: 'Config') -> 'LLMClient':
+    def from_config(cls, config: 'Config', cache: Optional[LLMCache] = None) -> 'LLMClient':
         """Create from Config object."""
         return cls(
             base_url=config.llm_base_url,
+            base_urls=config.llm_base_urls,
+            api_key=config.llm_api_key,
             model=config.llm_model,
+            timeout=config.llm_timeout,
+            max_connections=config.llm_max_connections,
+            keepalive_timeout=config.llm_keepalive_timeout,
+            cache=cache,
+            failure_threshold=config.llm_failure_threshold,
+            reset_timeout=config.llm_reset_timeout,
+            health_interval=config.llm_health_interval,
+            max_in_flight=config.llm_max_in_flight or None,
+            prompt_cache=config.llm_prompt_cache,
         )
@@ -7,12 +7,16 @@ Two simple concepts:
 """
 
 import json
+import time
 import uuid
+from collections import OrderedDict
 from datetime import datetime, timezone
 from dataclasses import dataclass, field, asdict
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Callable
 import redis.asyncio as redis
 
+from .telemetry import TelemetryWriter
+
 
 @dataclass
 class Thought:
@@ -20,6 +24,9 @@ class Thought:
     A single thought in the thinking process.
     
     Thoughts form a tree: goal → sub-thoughts → results
+    
+    Stored as a fixed-schema record (to_record): a JSON array in the
+    goal's hash under thought_id, so neither id is repeated in the value.
     """
     thought_id: str
     goal_id: str
@@ -27,7 +34,7 @@ class Thought:
     thought_type: str  # "goal", "reasoning", "action", "result"
     
     parent_id: Optional[str] = None
-    timestamp: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    timestamp: float = field(default_factory=time.time)  # Epoch seconds
     metadata: Dict[str, Any] = field(default_factory=dict)
     
     # Status
@@ -38,7 +45,36 @@ class Thought:
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Thought':
+        data = data.copy()
+        if isinstance(data.get("timestamp"), str):  # ISO, before numeric timestamps
+            data["timestamp"] = datetime.fromisoformat(data["timestamp"].replace("Z", "+00:00")).timestamp()
         return cls(**data)
+    
+    def to_record(self) -> str:
+        """Hash value: [thought_type, content, parent_id, timestamp, status, metadata]."""
+        return json.dumps(
+            [self.thought_type, self.content, self.parent_id, round(self.timestamp, 3), self.status, self.metadata],
+            separators=(",", ":"),
+        )
+    
+    @classmethod
+    def from_record(cls, thought_id: str, goal_id: str, record: str) -> 'Thought':
+        """Reconstruct from a hash value (a record, or an older JSON object)."""
+        data = json.loads(record)
+        if isinstance(data, dict):
+            return cls.from_dict(data)
+        
+        thought_type, content, parent_id, timestamp, status, metadata = data
+        return cls(
+            thought_id=thought_id,
+            goal_id=goal_id,
+            content=content,
+            thought_type=thought_type,
+            parent_id=parent_id,
+            timestamp=timestamp,
+            metadata=metadata,
+            status=status,
+        )
 
 
 class ThoughtTree:
@@ -50,6 +86,21 @@ class ThoughtTree:
     - Neurons add child thoughts as they process
     - Final result completes the tree
     
+    With ttl_seconds, a goal's thoughts expire that long after its last
+    write (failed_ttl_seconds once the goal failed). The index is trimmed
+    to index_max_goals goals, none older than the longest TTL. With an
+    archive (see archive.py), reads fall back to it for trees compacted
+    out of Redis.
+    
+    With a TelemetryWriter, writes are queued instead of awaited and reads
+    flush the queue first. Roots created here are kept in memory until
+    completed, so complete() and fail() need no Redis read.
+    
+    Each goal also has a children index (CHILDREN_SUFFIX), a sorted set of
+    "parent_id|thought_id" members: get_children() and get_thoughts() with
+    a parent_id read a thought's children by lexical range, without
+    loading the rest of the tree.
+    
     Usage:
         tree = ThoughtTree(config)
         root = await tree.create_root("goal_123", "What is 2+2?")
@@ -59,19 +110,78 @@ class ThoughtTree:
     
     KEY_PREFIX = "neural:thoughts:"
     INDEX_KEY = "neural:thoughts:index"
+    CHILDREN_SUFFIX = ":children"
+    MAX_OPEN_ROOTS = 10000  # Roots kept for goals not yet completed
     
-    def __init__(self, redis_client: redis.Redis = None):
+    def __init__(
+        self,
+        redis_client: redis.Redis = None,
+        writer: Optional[TelemetryWriter] = None,
+        ttl_seconds: Optional[int] = None,
+        failed_ttl_seconds: Optional[int] = None,
+        index_max_goals: Optional[int] = None,
+        archive=None,
+    ):
         self._redis = redis_client
+        self._writer = writer
+        self.ttl_seconds = ttl_seconds
+        self.failed_ttl_seconds = failed_ttl_seconds or ttl_seconds
+        self.index_max_goals = index_max_goals
+        self.archive = archive  # ThoughtArchive of compacted trees
+        self._roots: "OrderedDict[str, Thought]" = OrderedDict()
+    
+    @classmethod
+    def from_config(cls, config, redis_client: redis.Redis = None) -> 'ThoughtTree':
+        """Create ThoughtTree with the config's retention and archive."""
+        archive = None
+        if config.thought_archive:
+            from .archive import ThoughtArchive
+            archive = ThoughtArchive.from_config(config)
+        
+        return cls(
+            redis_client or config._ensure_redis(),
+            writer=config.get_telemetry(),
+            ttl_seconds=config.goal_ttl,
+            failed_ttl_seconds=config.goal_failed_ttl,
+            index_max_goals=config.thought_index_max_goals,
+            archive=archive,
+        )
     
     async def _get_redis(self) -> redis.Redis:
         if self._redis is None:
             self._redis = redis.Redis(host='redis', port=6379, decode_responses=True)
         return self._redis
     
+    async def _write(self, command: Callable) -> None:
+        """Run a write (commands added to a pipeline), queued on the writer if set."""
+        if self._writer is not None:
+            self._writer.write(command)
+        else:
+            pipe = (await self._get_redis()).pipeline(transaction=False)
+            command(pipe)
+            await pipe.execute()
+    
+    def _keys(self, goal_id: str) -> List[str]:
+        """A goal's thought hash and children index."""
+        key = f"{self.KEY_PREFIX}{goal_id}"
+        return [key, f"{key}{self.CHILDREN_SUFFIX}"]
+    
+    def _store(self, pipe, thought: Thought) -> None:
+        """Add the commands saving a thought (and refreshing its goal's TTL)."""
+        key, children_key = self._keys(thought.goal_id)
+        pipe.hset(key, thought.thought_id, thought.to_record())
+        if thought.parent_id:
+            pipe.zadd(children_key, {f"{thought.parent_id}|{thought.thought_id}": 0})
+        if self.ttl_seconds:
+            pipe.expire(key, self.ttl_seconds)
+            pipe.expire(children_key, self.ttl_seconds)
+    
+    async def _flush(self) -> None:
+        if self._writer is not None:
+            await self._writer.flush()
+    
     async def create_root(self, goal_id: str, goal_text: str) -> Thought:
         """Create root thought for a goal."""
-        r = await self._get_redis()
-        
         thought = Thought(
             thought_id=f"root_{goal_id}",
             goal_id=goal_id,
@@ -79,12 +189,24 @@ class ThoughtTree:
             thought_type="goal",
         )
         
-        # Store thought
-        key = f"{self.KEY_PREFIX}{goal_id}"
-        await r.hset(key, thought.thought_id, json.dumps(thought.to_dict()))
+        self._roots[goal_id] = thought
+        if len(self._roots) > self.MAX_OPEN_ROOTS:
+            self._roots.popitem(last=False)
+        
+        # Store thought and add to index
+        score = datetime.now(timezone.utc).timestamp()
         
-        # Add to index
-        await r.zadd(self.INDEX_KEY, {goal_id: datetime.now(timezone.utc).timestamp()})
+        def store(pipe):
+            self._store(pipe, thought)
+            pipe.zadd(self.INDEX_KEY, {goal_id: score})
+            
+            # Trim the index: no goal outlives its tree, and at most index_max_goals
+            if self.failed_ttl_seconds:
+                pipe.zremrangebyscore(self.INDEX_KEY, "-inf", score - self.failed_ttl_seconds)
+            if self.index_max_goals:
+                pipe.zremrangebyrank(self.INDEX_KEY, 0, -self.index_max_goals - 1)
+        
+        await self._write(store)
         
         return thought
     
@@ -97,8 +219,6 @@ class ThoughtTree:
         metadata: Dict[str, Any] = None,
     ) -> Thought:
         """Add a child thought."""
-        r = await self._get_redis()
-        
         # Extract goal_id from parent if not provided
         if goal_id is None:
             goal_id = parent_id.split("_", 1)[1] if "_" in parent_id else parent_id
@@ -112,58 +232,144 @@ class ThoughtTree:
             metadata=metadata or {},
         )
         
-        key = f"{self.KEY_PREFIX}{goal_id}"
-        await r.hset(key, thought.thought_id, json.dumps(thought.to_dict()))
+        await self._write(lambda pipe: self._store(pipe, thought))
         
         return thought
     
+    async def _open_root(self, goal_id: str) -> Optional[Thought]:
+        """Root thought of a goal being finished (from memory, else Redis)."""
+        root = self._roots.pop(goal_id, None)
+        if root is None:
+            root = await self.get_root(goal_id)
+        return root
+    
     async def complete(self, goal_id: str, result: str = None):
         """Mark goal as completed."""
-        r = await self._get_redis()
-        key = f"{self.KEY_PREFIX}{goal_id}"
-        
         # Get root thought
-        root_data = await r.hget(key, f"root_{goal_id}")
-        if root_data:
-            root = Thought.from_dict(json.loads(root_data))
+        root = await self._open_root(goal_id)
+        if root:
             root.status = "completed"
             if result:
                 root.metadata["result"] = result
-            await r.hset(key, root.thought_id, json.dumps(root.to_dict()))
+            await self._write(lambda pipe: self._store(pipe, root))
     
     async def fail(self, goal_id: str, error: str):
         """Mark goal as failed."""
-        r = await self._get_redis()
-        key = f"{self.KEY_PREFIX}{goal_id}"
-        
-        root_data = await r.hget(key, f"root_{goal_id}")
-        if root_data:
-            root = Thought.from_dict(json.loads(root_data))
+        root = await self._open_root(goal_id)
+        if root:
             root.status = "failed"
             root.metadata["error"] = error
-            await r.hset(key, root.thought_id, json.dumps(root.to_dict()))
+            
+            def store(pipe):
+                self._store(pipe, root)
+                if self.failed_ttl_seconds:
+                    for key in self._keys(goal_id):
+                        pipe.expire(key, self.failed_ttl_seconds)
+            
+            await self._write(store)
+    
+    async def get_thoughts(self, goal_id: str, parent_id: str = None) -> List[Thought]:
+        """
+        Get all thoughts for a goal (from the archive if compacted).
+        
+        With parent_id, only that thought's descendants, walked one level
+        at a time through the children index.
+        """
+        if parent_id is not None:
+            return await self._descendants(goal_id, parent_id)
+        
+        thoughts = await self.load(goal_id)
+        if not thoughts and self.archive is not None:
+            thoughts = await self.archive.get_thoughts(goal_id)
+        return thoughts
+    
+    async def get_children(self, goal_id: str, parent_id: str) -> List[Thought]:
+        """Direct children of a thought, oldest first."""
+        children = await self._children(goal_id, [parent_id])
+        if children is None:
+            return [t for t in await self.get_thoughts(goal_id) if t.parent_id == parent_id]
+        return sorted(children, key=lambda t: t.timestamp)
+    
+    async def _children(self, goal_id: str, parent_ids: List[str]) -> Optional[List[Thought]]:
+        """Children of the given thoughts (None if the goal has no children index)."""
+        await self._flush()
+        r = await self._get_redis()
+        key, children_key = self._keys(goal_id)
+        
+        pipe = r.pipeline(transaction=False)
+        for parent_id in parent_ids:
+            # Members "parent_id|child_id"; "}" sorts right after "|"
+            pipe.zrangebylex(children_key, f"[{parent_id}|", f"({parent_id}}}")
+        child_ids = [m.split("|", 1)[1] for members in await pipe.execute() for m in members]
+        
+        if not child_ids:
+            return [] if await r.exists(children_key) else None
+        records = await r.hmget(key, child_ids)
+        return [
+            Thought.from_record(thought_id, goal_id, record)
+            for thought_id, record in zip(child_ids, records)
+            if record
+        ]
+    
+    async def _descendants(self, goal_id: str, parent_id: str) -> List[Thought]:
+        found, level = [], [parent_id]
+        while level:
+            children = await self._children(goal_id, level)
+            if children is None:
+                # No index (archived, or stored before it): walk the whole tree
+                return _descendants(await self.get_thoughts(goal_id), parent_id)
+            found.extend(children)
+            level = [t.thought_id for t in children]
+        return sorted(found, key=lambda t: t.timestamp)
     
-    async def get_thoughts(self, goal_id: str) -> List[Thought]:
-        """Get all thoughts for a goal."""
+    async def load(self, goal_id: str) -> List[Thought]:
+        """Thoughts of a goal still in Redis."""
+        await self._flush()
         r = await self._get_redis()
         key = f"{self.KEY_PREFIX}{goal_id}"
         
         data = await r.hgetall(key)
-        thoughts = []
-        for thought_data in data.values():
-            thoughts.append(Thought.from_dict(json.loads(thought_data)))
+        thoughts = [Thought.from_record(thought_id, goal_id, record) for thought_id, record in data.items()]
         
         return sorted(thoughts, key=lambda t: t.timestamp)
     
     async def get_root(self, goal_id: str) -> Optional[Thought]:
         """Get root thought for a goal."""
+        await self._flush()
         r = await self._get_redis()
         key = f"{self.KEY_PREFIX}{goal_id}"
         
         root_data = await r.hget(key, f"root_{goal_id}")
         if root_data:
-            return Thought.from_dict(json.loads(root_data))
+            return Thought.from_record(f"root_{goal_id}", goal_id, root_data)
+        if self.archive is not None:
+            thoughts = await self.archive.get_thoughts(goal_id)
+            return next((t for t in thoughts if t.thought_id == f"root_{goal_id}"), None)
         return None
+    
+    async def delete(self, goal_ids: List[str]) -> None:
+        """Remove goals' trees and index entries from Redis."""
+        if not goal_ids:
+            return
+        await self._flush()
+        pipe = (await self._get_redis()).pipeline(transaction=False)
+        pipe.delete(*[key for goal_id in goal_ids for key in self._keys(goal_id)])
+        pipe.zrem(self.INDEX_KEY, *goal_ids)
+        await pipe.execute()
+
+
+def _descendants(thoughts: List[Thought], parent_id: str) -> List[Thought]:
+    """Descendants of parent_id among a loaded tree, oldest first."""
+    children: Dict[str, List[Thought]] = {}
+    for thought in thoughts:
+        children.setdefault(thought.parent_id, []).append(thought)
+    
+    found, level = [], [parent_id]
+    while level:
+        level = [t for p in level for t in children.get(p, [])]
+        found.extend(level)
+        level = [t.thought_id for t in level]
+    return sorted(found, key=lambda t: t.timestamp)
 
 
 @dataclass
@@ -176,11 +382,21 @@ class GoalContext:
     """
     goal_id: str
     goal_text: str
+    parent_id: Optional[str] = None  # Goal this is a planned step of
     
     # Processing state
     intent: Optional[str] = None
     tool_name: Optional[str] = None
     parameters: Dict[str, Any] = field(default_factory=dict)
+    tool_result: Any = field(default=None, repr=False)  # Tool's own result object
+    route: Any = field(default=None, repr=False)  # neurons.Route, None = staged pipeline
+    stages: Dict[str, Any] = field(default_factory=dict, repr=False)  # Stage results reused within the goal
+    
+    # How a tool result is returned (output.OUTPUT_MODES, None = default)
+    output_mode: Optional[str] = None
+    
+    # Optional stages skipped to meet the deadline (interpret, retry, ...)
+    dropped_stages: List[str] = field(default_factory=list)
     
     # Results
     result: Optional[str] = None
@@ -190,10 +406,29 @@ class GoalContext:
     # Messages (for debugging)
     messages: List[Dict[str, Any]] = field(default_factory=list)
     
+    # Stable system prompt shared by this goal's LLM calls (KV cache reuse)
+    prompt_prefix: Optional[str] = field(default=None, repr=False)
+    
+    # LLM calls made for this goal (usage.LLMCall: tokens, timings)
+    llm_calls: List[Any] = field(default_factory=list, repr=False)
+    
+    # Cancellation token / deadline of this goal (cancel.CancelToken)
+    cancel: Optional[Any] = field(default=None, repr=False)
+    
+    # Streaming: called with each generated token of the user-facing answer
+    on_token: Optional[Callable[[str], None]] = field(default=None, repr=False)
+    
+    # Called with the tool name just before a tool runs
+    on_tool: Optional[Callable[[str], None]] = field(default=None, repr=False)
+    
     # Timing
     started_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
     completed_at: Optional[str] = None
     
+    def time_left(self) -> Optional[float]:
+        """Seconds before the goal's deadline (None = no deadline)."""
+        return self.cancel.remaining() if self.cancel is not None else None
+    
     def add_message(self, neuron: str, message_type: str, data: Any):
         """Add a message from a neuron."""
         self.messages.append({
@@ -0,0 +1,151 @@
+"""
+Metrics - In-process counters, gauges and histograms.
+
+One registry per process. Components record into it, the API exposes
+a JSON snapshot at /api/v1/metrics.
+
+Usage:
+    from .metrics import metrics
+
+    metrics.counter("llm_cache_hits", tier="memory").inc()
+    metrics.histogram("llm_queue_wait_ms").observe(12.5)
+
+    snapshot = metrics.snapshot()
+"""
+
+import bisect
+import threading
+from typing import Dict, Any, List, Tuple
+
+
+# Default histogram buckets (milliseconds / counts), roughly log-spaced
+DEFAULT_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 120000)
+
+
+def _metric_key(name: str, labels: Dict[str, Any]) -> str:
+    """Build a Prometheus-style key: name{a=1,b=2}."""
+    if not labels:
+        return name
+    label_text = ",".join(f"{k}={labels[k]}" for k in sorted(labels))
+    return f"{name}{{{label_text}}}"
+
+
+class Counter:
+    """Monotonically increasing count."""
+    
+    def __init__(self):
+        self.value = 0
+    
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+    
+    def snapshot(self) -> float:
+        return self.value
+
+
+class Gauge:
+    """Value that goes up and down (queue depth, in-flight requests)."""
+    
+    def __init__(self):
+        self.value = 0
+    
+    def set(self, value: float) -> None:
+        self.value = value
+    
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+    
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+    
+    def snapshot(self) -> float:
+        return self.value
+
+
+class Histogram:
+    """Bucketed distribution with count, sum and approximate percentiles."""
+    
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)  # Last = +Inf
+        self.count = 0
+        self.sum = 0.0
+    
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+    
+    def percentile(self, p: float) -> float:
+        """Upper bucket bound containing the p-th percentile (0-100)."""
+        if self.count == 0:
+            return 0.0
+        
+        target = self.count * p / 100
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return float("inf")
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 3),
+            "avg": round(self.sum / self.count, 3) if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "buckets": {
+                str(bound): count
+                for bound, count in zip(list(self.buckets) + ["+Inf"], self.counts)
+            },
+        }
+
+
+class MetricsRegistry:
+    """
+    Registry of named metrics.
+    
+    Metrics are created on first use, so callers never need to declare
+    them up front.
+    """
+    
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+    
+    def _get(self, cls, name: str, labels: Dict[str, Any], **kwargs):
+        key = _metric_key(name, labels)
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.setdefault(key, cls(**kwargs))
+        return metric
+    
+    def counter(self, name: str, **labels) -> Counter:
+        return self._get(Counter, name, labels)
+    
+    def gauge(self, name: str, **labels) -> Gauge:
+        return self._get(Gauge, name, labels)
+    
+    def histogram(self, name: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, **labels) -> Histogram:
+        return self._get(Histogram, name, labels, buckets=buckets)
+    
+    def snapshot(self, prefix: str = "") -> Dict[str, Any]:
+        """Current value of every metric (optionally filtered by name prefix)."""
+        return {
+            key: metric.snapshot()
+            for key, metric in sorted(self._metrics.items())
+            if key.startswith(prefix)
+        }
+    
+    def reset(self) -> None:
+        """Drop all metrics (for testing)."""
+        with self._lock:
+            self._metrics.clear()
+
+
+# Process-wide registry
+metrics = MetricsRegistry()
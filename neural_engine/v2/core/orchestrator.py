@@ -11,14 +11,27 @@ That's it. No complex state machines.
 """
 
 import uuid
+import json
+import time
+import asyncio
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Callable, AsyncIterator
 from datetime import datetime, timezone
 
 from .config import Config
 from .events import EventBus, EventType
 from .memory import ThoughtTree, GoalContext
-from ..neurons import IntentNeuron, GenerativeNeuron, ToolNeuron, MemoryNeuron
+from .usage import collect_llm_calls, summarize_llm_calls
+from .cancel import CancelToken, cancel_scope
+from .metrics import metrics
+from .admission import llm_priority
+from .output import check_output_mode, current_output_mode
+from ..neurons import (
+    IntentNeuron, GenerativeNeuron, ToolNeuron, MemoryNeuron, RouterNeuron, Route,
+    PathwayCache, PlannerNeuron, Plan, PlanCache, parse_tool_invocation, explicit_route,
+)
+from ..neurons.pathways import normalize_goal
+from ..neurons.planner import looks_compound
 
 logger = logging.getLogger(__name__)
 
@@ -30,9 +43,34 @@ class Orchestrator:
     Flow:
         goal → intent → [generative|tool|memory] → result
     
+    Explicit invocations ("use <tool> with k=v", or process(tool=...))
+    go straight to the tool without LLM routing (config.fast_path).
+    
+    Goals matching an earlier goal whose tool succeeded replay its route
+    from the pathway cache (config.pathway_cache), also without LLM routing.
+    
+    With fused routing (config.fused_routing), one RouterNeuron call
+    replaces intent classification and the tool selection stages; an
+    invalid or unsure answer falls back to the staged flow.
+    
+    With speculative routing (config.speculative_routing), the tool
+    capability check starts alongside intent classification; it is kept
+    if the intent is "tool" and cancelled otherwise.
+    
+    Compound tool goals ("... and ...") are split by the PlannerNeuron
+    into sub-goals that run concurrently as their dependencies allow
+    (config.goal_planning), and their results are merged.
+    
+    With goal coalescing (config.goal_coalescing), a goal identical to
+    one in flight waits for that run's result instead of running again,
+    unless the run reaches a tool marked coalesce=False.
+    
     Usage:
         orchestrator = Orchestrator.from_config(config)
         result = await orchestrator.process("What is 2+2?")
+        
+        async for result in orchestrator.process_many(goals, concurrency=8):
+            print(result["index"], result["result"])
     
     The orchestrator is thin - neurons do the work.
     """
@@ -47,6 +85,9 @@ class Orchestrator:
         event_bus: EventBus,
         thought_tree: ThoughtTree,
         tool_forge=None,  # Optional ToolForge for dynamic tool creation
+        router_neuron: Optional[RouterNeuron] = None,  # Fused routing if set
+        pathway_cache: Optional[PathwayCache] = None,  # Learned routes if set
+        planner_neuron: Optional[PlannerNeuron] = None,  # Compound goals if set
     ):
         self.config = config
         self.intent_neuron = intent_neuron
@@ -56,6 +97,12 @@ class Orchestrator:
         self.event_bus = event_bus
         self.thought_tree = thought_tree
         self.tool_forge = tool_forge
+        self.router_neuron = router_neuron
+        self.pathway_cache = pathway_cache
+        self.planner_neuron = planner_neuron
+        
+        # Goals in flight (coalescing): key -> future of the shared result
+        self._flights: Dict[tuple, asyncio.Future] = {}
     
     @classmethod
     async def from_config(cls, config: Config, enable_forge: bool = False) -> 'Orchestrator':
@@ -82,24 +129,214 @@ class Orchestrator:
             tool_neuron=tool_neuron,
             memory_neuron=MemoryNeuron(config),
             event_bus=EventBus.from_config(config),
-            thought_tree=ThoughtTree(redis_client),
+            thought_tree=ThoughtTree.from_config(config, redis_client),
             tool_forge=tool_forge,
+            router_neuron=RouterNeuron(config) if config.fused_routing else None,
+            pathway_cache=PathwayCache.from_config(config, tool_neuron.registry) if config.pathway_cache else None,
+            planner_neuron=PlannerNeuron(config, cache=PlanCache(redis_client)) if config.goal_planning else None,
         )
     
-    async def process(self, goal: str) -> Dict[str, Any]:
+    async def process(
+        self,
+        goal: str,
+        on_token: Optional[Callable[[str], None]] = None,
+        deadline: Optional[float] = None,
+        cancel: Optional[CancelToken] = None,
+        tool: Optional[str] = None,
+        params: Optional[Dict[str, Any]] = None,
+        output_mode: Optional[str] = None,
+    ) -> Dict[str, Any]:
         """
         Process a goal end-to-end.
         
         Args:
             goal: Natural language goal/query
+            on_token: Optional callback for each streamed answer token
+            deadline: time.monotonic() by which the goal must be done.
+                Optional stages (interpretation, retry, forge) are
+                skipped when it is near; see "dropped_stages".
+            cancel: Token to abort the goal (e.g. client disconnected)
+            tool: Run this tool directly (no LLM routing)
+            params: Arguments for `tool`, coerced to its parameter types
+            output_mode: raw, structured, rendered or llm - how a tool
+                result is returned (see output.py)
         
         Returns:
-            Dict with result, success, and metadata
+            Dict with result, success, and metadata. A cancelled or
+            expired goal returns success=False and cancelled=True; a
+            goal that shared another's run has coalesced=True.
         """
+        output_mode = check_output_mode(output_mode) or current_output_mode()
+        
+        # Streamed goals always run on their own (their tokens go to one caller)
+        if self.config.goal_coalescing and on_token is None:
+            return await self._process_coalesced(goal, deadline, cancel, tool, params, output_mode)
+        
+        return await self._process(goal, on_token, deadline, cancel, tool, params, output_mode)
+    
+    async def _process(
+        self,
+        goal: str,
+        on_token: Optional[Callable[[str], None]] = None,
+        deadline: Optional[float] = None,
+        cancel: Optional[CancelToken] = None,
+        tool: Optional[str] = None,
+        params: Optional[Dict[str, Any]] = None,
+        output_mode: Optional[str] = None,
+        on_tool: Optional[Callable[[str], None]] = None,
+        parent_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Run one goal (process() without coalescing)."""
         goal_id = str(uuid.uuid4())
+        token = self._token(cancel, deadline)
         
         # Create context
-        ctx = GoalContext(goal_id=goal_id, goal_text=goal)
+        ctx = GoalContext(
+            goal_id=goal_id,
+            goal_text=goal,
+            parent_id=parent_id,
+            on_token=on_token,
+            on_tool=on_tool,
+            cancel=token,
+            output_mode=output_mode,
+        )
+        
+        # One prompt prefix (tool catalog + goal) for every stage's LLM call
+        self.tool_neuron.prepare_prefix(ctx)
+        
+        # Every LLM call of this goal, neurons included (tokens, timings).
+        # The goal runs as its own task so the token can abort it.
+        with collect_llm_calls(ctx.llm_calls), cancel_scope(token):
+            task = asyncio.create_task(self._run_goal(ctx, tool, params))
+            token.attach(task)
+            
+            try:
+                response = await task
+            except asyncio.CancelledError:
+                if not token.cancelled:
+                    token.cancel("caller cancelled")  # Stops tools polling the token
+                    raise
+                response = self._cancelled_response(ctx, token)
+            finally:
+                # The goal's llama.cpp slots are free for other goals
+                llm = self.config.get_llm()
+                llm.release_affinity(goal_id)
+                llm.release_affinity(f"{goal_id}/speculative")
+        
+        # Failed trees are kept longer (config.goal_failed_ttl)
+        if not response["success"]:
+            await self.thought_tree.fail(goal_id, response["error"])
+        return response
+    
+    async def _process_coalesced(
+        self,
+        goal: str,
+        deadline: Optional[float],
+        cancel: Optional[CancelToken],
+        tool: Optional[str],
+        params: Optional[Dict[str, Any]],
+        output_mode: Optional[str],
+        flights: Optional[Dict[tuple, asyncio.Future]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Run a goal, or share the run of an identical goal in flight.
+        
+        The first caller (leader) runs the goal. Callers with the same
+        normalized goal, tool, params and output mode wait for its result.
+        They run the goal themselves if the leader reaches a tool marked
+        coalesce=False, or is cancelled.
+        
+        flights is where runs in flight are found; by default the
+        orchestrator's (goal coalescing, goal_coalescing_window applies).
+        """
+        shared_flights = flights is None
+        flights = self._flights if shared_flights else flights
+        key = (
+            normalize_goal(goal),
+            tool,
+            json.dumps(params or {}, sort_keys=True, default=str),
+            output_mode,
+        )
+        
+        flight = flights.get(key)
+        if flight is not None:
+            shared = await self._follow(flight, goal, deadline, cancel)
+            if shared is None:
+                return await self._process(goal, None, deadline, cancel, tool, params, output_mode)
+            if not shared.get("cancelled"):  # Else our own wait was cancelled
+                metrics.counter("goals_coalesced").inc()
+                shared = {**shared, "coalesced": True}
+            return shared
+        
+        flight = asyncio.get_running_loop().create_future()
+        flights[key] = flight
+        
+        def release(result: Optional[Dict[str, Any]] = None) -> None:
+            """Settle the followers (None = run yourselves) and stop taking new ones."""
+            if flights.get(key) is flight:
+                del flights[key]
+            if not flight.done():
+                flight.set_result(result)
+        
+        def on_tool(tool_name: str) -> None:
+            definition = self.tool_neuron.registry.get_definition(tool_name)
+            if definition is not None and not definition.coalesce:
+                release()
+        
+        result = None
+        try:
+            result = await self._process(goal, None, deadline, cancel, tool, params, output_mode, on_tool=on_tool)
+        finally:
+            shareable = result is not None and not result.get("cancelled")
+            window = self.config.goal_coalescing_window if shared_flights else 0
+            if not flight.done() and shareable:
+                flight.set_result(result)
+            if flight.done() and shareable and result["success"] and window > 0:
+                # Keep serving the finished result to identical goals for a while
+                asyncio.get_running_loop().call_later(window, release)
+            else:
+                release()
+        return result
+    
+    async def _follow(
+        self,
+        flight: asyncio.Future,
+        goal: str,
+        deadline: Optional[float],
+        cancel: Optional[CancelToken],
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Wait for a leader's result (None = run the goal yourself).
+        
+        Our own cancel token or deadline stops the wait, not the leader.
+        """
+        token = self._token(cancel, deadline)
+        waiter = asyncio.ensure_future(asyncio.shield(flight))
+        token.attach(waiter)
+        
+        try:
+            return await waiter
+        except asyncio.CancelledError:
+            if not token.cancelled:
+                raise
+            return self._cancelled_response(GoalContext(goal_id=str(uuid.uuid4()), goal_text=goal), token)
+    
+    @staticmethod
+    def _token(cancel: Optional[CancelToken], deadline: Optional[float]) -> CancelToken:
+        """The caller's token (or a new one), expiring by `deadline`."""
+        token = cancel or CancelToken()
+        if deadline is not None:
+            token.deadline = min(deadline, token.deadline or deadline)
+        return token
+    
+    async def _run_goal(
+        self,
+        ctx: GoalContext,
+        tool: Optional[str] = None,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Run the pipeline for a prepared context."""
+        goal_id, goal = ctx.goal_id, ctx.goal_text
         
         # Create root thought
         await self.thought_tree.create_root(goal_id, goal)
@@ -113,20 +350,44 @@ class Orchestrator:
         )
         
         try:
-            # Step 1: Classify intent
-            intent_result = await self.intent_neuron.run(ctx, goal)
-            
-            if not intent_result.success:
-                return self._error_response(ctx, f"Intent classification failed: {intent_result.error}")
+            # Step 1: Classify intent. Explicit invocations and learned
+            # pathways are already routed; fused routing also picks the tool.
+            if tool:
+                try:
+                    route = explicit_route(self.tool_neuron.registry, tool, params)
+                except ValueError as e:
+                    return self._error_response(ctx, f"Invalid tool invocation: {e}")
+            else:
+                route = self._fast_route(ctx) or await self._replay_pathway(ctx) or await self._route(ctx)
+            ctx.route = route
             
-            intent = intent_result.data
+            if route:
+                intent = route.intent
+            else:
+                if self.config.speculative_routing:
+                    intent_result = await self._classify_speculatively(ctx)
+                else:
+                    intent_result = await self.intent_neuron.run(ctx, goal)
+                
+                if not intent_result.success:
+                    return self._error_response(ctx, f"Intent classification failed: {intent_result.error}")
+                
+                intent = intent_result.data
             ctx.intent = intent
             
-            # Step 2: Route based on intent
-            if intent == "generative":
+            # Explicit invocations skip the LLM for their output too
+            if ctx.output_mode is None:
+                ctx.output_mode = "rendered" if route and route.explicit else self.config.output_mode
+            
+            # Step 2: Route based on intent (compound tool goals: a plan)
+            plan = await self._plan(ctx, route) if intent == "tool" else None
+            
+            if plan:
+                result = await self._handle_plan(ctx, plan)
+            elif intent == "generative":
                 result = await self._handle_generative(ctx)
             elif intent == "tool":
-                result = await self._handle_tool(ctx)
+                result = await self._handle_tool(ctx, route.tool_spec() if route else None)
             elif intent == "memory_read":
                 result = await self._handle_memory_read(ctx)
             elif intent == "memory_write":
@@ -143,22 +404,319 @@ class Orchestrator:
                 event_type=EventType.GOAL_COMPLETE,
                 source="orchestrator",
                 goal_id=goal_id,
-                data={"result": result[:200] if result else None, "duration_ms": ctx.duration_ms},
+                data={
+                    "result": result[:200] if result else None,
+                    "duration_ms": ctx.duration_ms,
+                    "llm": summarize_llm_calls(ctx.llm_calls),
+                },
             )
             
-            return {
+            response = {
                 "success": True,
                 "goal_id": goal_id,
                 "goal": goal,
                 "intent": intent,
                 "result": result,
+                "output_mode": ctx.output_mode,
+                "dropped_stages": ctx.dropped_stages,
                 "duration_ms": ctx.duration_ms,
                 "messages": ctx.messages,
+                "llm": summarize_llm_calls(ctx.llm_calls),
             }
-            
+            if ctx.output_mode == "structured" and ctx.tool_result is not None:
+                response["data"] = ctx.tool_result
+            if "plan" in ctx.stages:
+                response["steps"] = ctx.stages["plan"]
+            return response
+        
         except Exception as e:
             return self._error_response(ctx, str(e))
     
+    async def stream(
+        self,
+        goal: str,
+        deadline: Optional[float] = None,
+        cancel: Optional[CancelToken] = None,
+        output_mode: Optional[str] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process a goal, yielding answer tokens as they are generated.
+        
+        Closing the iterator early (client gone) cancels the goal.
+        
+        Yields:
+            {"type": "token", "text": "..."} for each token, then
+            {"type": "result", ...} with the same dict process() returns.
+        
+        Usage:
+            async for event in orchestrator.stream("Explain Python"):
+                if event["type"] == "token":
+                    print(event["text"], end="")
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        
+        task = asyncio.create_task(
+            self.process(
+                goal,
+                on_token=lambda text: queue.put_nowait(text),
+                deadline=deadline,
+                cancel=cancel,
+                output_mode=output_mode,
+            )
+        )
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+        
+        try:
+            while True:
+                text = await queue.get()
+                if text is None:
+                    break
+                yield {"type": "token", "text": text}
+            
+            yield {"type": "result", **task.result()}
+        finally:
+            if not task.done():
+                task.cancel()
+    
+    async def process_many(
+        self,
+        goals: List[str],
+        concurrency: Optional[int] = None,
+        deadline: Optional[float] = None,
+        cancel: Optional[CancelToken] = None,
+        output_mode: Optional[str] = None,
+        priority: str = "scheduled",
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process a batch of goals, yielding each result as it completes.
+        
+        At most `concurrency` (default config.batch_concurrency) distinct
+        goals run at once, at the given LLM priority (by default behind
+        interactive requests). Identical goals (same normalized text) run
+        once and share the result (coalesced=True), unless they reach a
+        tool marked coalesce=False - as with goal coalescing, but only
+        within the batch: other callers' goals are never shared with it.
+        
+        Closing the iterator early cancels the goals still running.
+        
+        Yields:
+            The dict process() returns, plus "index" (position in goals)
+        """
+        output_mode = check_output_mode(output_mode) or current_output_mode()
+        
+        groups: Dict[str, List[int]] = {}
+        for index, goal in enumerate(goals):
+            groups.setdefault(normalize_goal(goal), []).append(index)
+        
+        semaphore = asyncio.Semaphore(concurrency or self.config.batch_concurrency)
+        results: asyncio.Queue = asyncio.Queue()
+        flights: Dict[tuple, asyncio.Future] = {}  # This batch's shared runs
+        
+        async def run_goal(index: int, shared: bool) -> None:
+            # Exactly one result per index, even if processing raises
+            try:
+                if shared:
+                    result = await self._process_coalesced(
+                        goals[index], deadline, cancel, None, None, output_mode, flights=flights
+                    )
+                else:
+                    result = await self._process(goals[index], None, deadline, cancel, None, None, output_mode)
+            except Exception as e:
+                logger.warning(f"Batch goal {index} failed: {e}")
+                metrics.counter("batch_goal_errors").inc()
+                ctx = GoalContext(goal_id=str(uuid.uuid4()), goal_text=goals[index])
+                result = self._error_response(ctx, f"Goal failed: {e}")
+            results.put_nowait({**result, "goal": goals[index], "index": index})
+        
+        async def run_group(indexes: List[int]) -> None:
+            async with semaphore:
+                with llm_priority(priority):
+                    await asyncio.gather(*(run_goal(i, len(indexes) > 1) for i in indexes))
+        
+        metrics.counter("batch_goals").inc(len(goals))
+        tasks = [asyncio.create_task(run_group(indexes)) for indexes in groups.values()]
+        
+        try:
+            for _ in range(len(goals)):
+                yield await results.get()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    def _fast_route(self, ctx: GoalContext) -> Optional[Route]:
+        """Route for an explicit "use <tool> with k=v" goal (no LLM)."""
+        if not self.config.fast_path:
+            return None
+        
+        route = parse_tool_invocation(ctx.goal_text, self.tool_neuron.registry)
+        if route:
+            metrics.counter("fast_path_routed").inc()
+            ctx.add_message("orchestrator", "routed", f"Fast path: {route.tool_name} {route.parameters}")
+        return route
+    
+    async def _replay_pathway(self, ctx: GoalContext) -> Optional[Route]:
+        """Route learned from an earlier, similar goal (no LLM)."""
+        if self.pathway_cache is None:
+            return None
+        
+        route = await self.pathway_cache.lookup(ctx.goal_text)
+        if route:
+            ctx.add_message("orchestrator", "routed", f"Pathway cache: {route.tool_name} {route.parameters}")
+        return route
+    
+    async def _learn_pathway(self, ctx: GoalContext, succeeded: bool) -> None:
+        """Teach the pathway cache how a routed tool ran (explicit invocations excluded)."""
+        route = ctx.route
+        if self.pathway_cache is None or not ctx.tool_name or (route and route.explicit):
+            return
+        
+        await self.pathway_cache.record(
+            ctx.goal_text,
+            ctx.tool_name,
+            ctx.parameters,
+            succeeded,
+            pathway=route.pathway if route else None,
+        )
+    
+    async def _classify_speculatively(self, ctx: GoalContext):
+        """
+        Intent classification with the tool capability check run alongside.
+        
+        Both depend only on the goal text. If the intent is "tool", the
+        check's answer (in ctx.stages) saves ToolNeuron a sequential call;
+        otherwise it is cancelled, or its tokens are counted as wasted.
+        The check uses its own affinity key, so it runs on another
+        llama.cpp slot instead of queueing behind the intent call.
+        """
+        speculative_calls = []
+        timing = {}
+        
+        async def check():
+            started = time.monotonic()
+            await self.tool_neuron.check_capability(ctx, affinity=f"{ctx.goal_id}/speculative")
+            timing["check_ms"] = (time.monotonic() - started) * 1000
+        
+        with collect_llm_calls(speculative_calls):
+            speculation = asyncio.create_task(check())
+        
+        started = time.monotonic()
+        try:
+            intent_result = await self.intent_neuron.run(ctx, ctx.goal_text)
+        except BaseException:
+            speculation.cancel()
+            raise
+        intent_ms = (time.monotonic() - started) * 1000
+        
+        if intent_result.success and intent_result.data == "tool":
+            await speculation
+            metrics.counter("speculative_routing", outcome="committed").inc()
+            # Critical-path time saved: the part of the check that overlapped intent
+            metrics.histogram("speculative_saved_ms").observe(min(intent_ms, timing["check_ms"]))
+            return intent_result
+        
+        if speculation.done():
+            outcome = "wasted"
+        else:
+            outcome = "cancelled"
+            speculation.cancel()
+            await asyncio.gather(speculation, return_exceptions=True)
+        
+        ctx.stages.pop("capability", None)
+        metrics.counter("speculative_routing", outcome=outcome).inc()
+        metrics.counter("speculative_wasted_tokens").inc(
+            sum(c.prompt_tokens + c.completion_tokens for c in speculative_calls)
+        )
+        return intent_result
+    
+    async def _route(self, ctx: GoalContext) -> Optional[Route]:
+        """Fused routing decision, or None to run the staged pipeline."""
+        if self.router_neuron is None:
+            return None
+        
+        result = await self.router_neuron.run(ctx, self.tool_neuron.candidates(ctx.goal_text))
+        route = result.data if result.success else None
+        
+        metrics.counter("fused_routing", outcome="routed" if route else "fallback").inc()
+        if route:
+            ctx.add_message("orchestrator", "routed", f"Fused routing: {route.intent} {route.tool_name or ''}".strip())
+        return route
+    
+    async def _plan(self, ctx: GoalContext, route: Optional[Route]) -> Optional[Plan]:
+        """Plan for a compound tool goal, or None to run it as one goal."""
+        if self.planner_neuron is None or ctx.parent_id or not looks_compound(ctx.goal_text):
+            return None
+        if route and (route.explicit or route.pathway):
+            return None  # Already known to be a single tool call
+        
+        result = await self.planner_neuron.run(ctx)
+        return result.data if result.success else None
+    
+    async def _handle_plan(self, ctx: GoalContext, plan: Plan) -> str:
+        """
+        Run a plan's steps as sub-goals and merge their results.
+        
+        Each step starts once the steps it depends on are done (and gets
+        their results in its goal text, unless it is an explicit tool
+        invocation), at most config.plan_concurrency
+        at a time - so the wall time is the plan's critical path. Steps
+        share the goal's cancel token and deadline.
+        """
+        semaphore = asyncio.Semaphore(self.config.plan_concurrency)
+        tasks: Dict[str, asyncio.Task] = {}
+        step_mode = ctx.output_mode if ctx.output_mode in ("raw", "structured") else "rendered"
+        
+        async def run_step(step) -> Dict[str, Any]:
+            dependencies = [await tasks[d] for d in step.depends_on]
+            failed = [d["goal"] for d in dependencies if not d["success"]]
+            if failed:
+                return {"success": False, "goal": step.goal, "error": f"Skipped: {', '.join(failed)} failed"}
+            
+            goal = step.goal
+            if dependencies and not parse_tool_invocation(step.goal, self.tool_neuron.registry):
+                earlier = "\n".join(f"- {d['goal']}: {d['result']}" for d in dependencies)
+                goal = f"{step.goal}\n\nResults of earlier steps:\n{earlier}"
+            
+            async with semaphore:
+                result = await self._process(goal, cancel=ctx.cancel, output_mode=step_mode, parent_id=ctx.goal_id)
+            return {**result, "goal": step.goal}
+        
+        # Steps are in dependency order, so every task awaited already exists
+        for step in plan.steps:
+            tasks[step.id] = asyncio.create_task(run_step(step))
+        results = await asyncio.gather(*tasks.values())
+        
+        ctx.stages["plan"] = [
+            {
+                "id": step.id,
+                "goal": step.goal,
+                "goal_id": result.get("goal_id"),
+                "success": result["success"],
+                "result": result.get("result"),
+                "error": result.get("error"),
+            }
+            for step, result in zip(plan.steps, results)
+        ]
+        
+        if not any(r["success"] for r in results):
+            raise Exception("Every step of the plan failed: " + "; ".join(r["error"] for r in results))
+        
+        if all(r["success"] for r in results) and self.planner_neuron.cache is not None:
+            await self.planner_neuron.cache.store(ctx.goal_text, plan)
+        
+        ctx.tool_result = [{"goal": r["goal"], "result": r.get("data", r.get("result"))} for r in results]
+        merged = "\n\n".join(
+            f"**{r['goal']}**\n{r['result'] if r['success'] else 'Failed: ' + r['error']}"
+            for r in results
+        )
+        
+        # Merge step: one answer from all results (LLM mode only)
+        if ctx.output_mode == "llm" and self._fits_deadline(ctx, "merge"):
+            answer = await self._interpret_tool_result(ctx, merged)
+            if answer:
+                return answer
+        return merged
+    
     async def _handle_generative(self, ctx: GoalContext) -> str:
         """Handle generative/chat queries."""
         result = await self.generative_neuron.run(ctx, ctx.goal_text)
@@ -168,9 +726,18 @@ class Orchestrator:
         
         return result.data
     
-    async def _handle_tool(self, ctx: GoalContext) -> str:
-        """Handle tool execution with error recovery."""
-        result = await self.tool_neuron.run(ctx, ctx.goal_text)
+    async def _handle_tool(self, ctx: GoalContext, spec: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Handle tool execution with error recovery.
+        
+        spec: tool and parameters already routed (fast path, pathway
+        cache, fused routing); retries go through the staged pipeline.
+        """
+        result = await self.tool_neuron.run(ctx, spec or ctx.goal_text)
+        
+        # Learn the route from the first attempt (retries are not replayed)
+        succeeded = result.success and bool(result.data) and not result.data.startswith(("NO_", "TOOL_"))
+        await self._learn_pathway(ctx, succeeded)
         
         if not result.success:
             raise Exception(f"Tool execution failed: {result.error}")
@@ -178,11 +745,11 @@ class Orchestrator:
         # Check for recovery signals
         result_data = result.data
         
-        # If tool succeeded with data, interpret the result for the user
+        # If tool succeeded with data, present it in the goal's output mode
         if result_data and not result_data.startswith(("NO_", "TOOL_")):
-            interpreted = await self._interpret_tool_result(ctx, result_data)
-            if interpreted:
-                return interpreted
+            output = await self._tool_output(ctx, result_data)
+            if output:
+                return output
         
         if result_data.startswith("NO_MATCHING_TOOL:") or result_data.startswith("NO_TOOLS_AVAILABLE"):
             # No tool can handle this - fall back to generative
@@ -191,7 +758,7 @@ class Orchestrator:
         
         if result_data.startswith("TOOL_NOT_FOUND:"):
             # Tool suggested but doesn't exist - try to forge it
-            if self.tool_forge:
+            if self.tool_forge and self._fits_deadline(ctx, "forge"):
                 tool_name = result_data.split(":", 1)[1] if ":" in result_data else "unknown"
                 ctx.add_message("orchestrator", "forge", f"Attempting to create tool: {tool_name}")
                 
@@ -212,9 +779,12 @@ class Orchestrator:
                         
                         ctx.add_message("orchestrator", "forge_success", f"Created new tool, retrying")
                         
+                        # The new tool changes the candidates - route from scratch
+                        ctx.stages.clear()
                         retry_result = await self.tool_neuron.run(ctx, ctx.goal_text)
                         if retry_result.success and not retry_result.data.startswith("TOOL_"):
-                            return retry_result.data
+                            output = await self._tool_output(ctx, retry_result.data)
+                            return output or retry_result.data
                 except Exception as e:
                     logger.warning(f"Tool forge failed: {e}")
             
@@ -244,7 +814,7 @@ class Orchestrator:
                     f"Once you've updated the token, try your request again!"
                 )
             
-            if recovery_action == "retry" and not getattr(ctx, '_retried', False):
+            if recovery_action == "retry" and not getattr(ctx, '_retried', False) and self._fits_deadline(ctx, "retry"):
                 # Retry once with error context
                 ctx._retried = True
                 ctx.retry_error = result_data.split(":", 1)[1] if ":" in result_data else result_data
@@ -252,9 +822,14 @@ class Orchestrator:
                 
                 retry_result = await self.tool_neuron.run(ctx, ctx.goal_text)
                 if retry_result.success and not retry_result.data.startswith("TOOL_"):
-                    return retry_result.data
+                    output = await self._tool_output(ctx, retry_result.data)
+                    return output or retry_result.data
             
-            if recovery_action == "refine_params" and not getattr(ctx, '_params_refined', False):
+            if (
+                recovery_action == "refine_params"
+                and not getattr(ctx, '_params_refined', False)
+                and self._fits_deadline(ctx, "refine")
+            ):
                 # Try to refine parameters
                 ctx._params_refined = True
                 ctx.retry_error = result_data.split(":", 1)[1] if ":" in result_data else result_data
@@ -262,7 +837,8 @@ class Orchestrator:
                 
                 retry_result = await self.tool_neuron.run(ctx, ctx.goal_text)
                 if retry_result.success and not retry_result.data.startswith("TOOL_"):
-                    return retry_result.data
+                    output = await self._tool_output(ctx, retry_result.data)
+                    return output or retry_result.data
             
             # Fall back to generative
             ctx.add_message("orchestrator", "fallback", f"Tool failed after recovery attempts, using generative response")
@@ -280,6 +856,47 @@ class Orchestrator:
         
         return result_data
     
+    async def _tool_output(self, ctx: GoalContext, tool_output: str) -> Optional[str]:
+        """Tool result in the goal's output mode (None = the raw tool output)."""
+        mode = ctx.output_mode or self.config.output_mode
+        
+        if mode == "llm":
+            if not self._fits_deadline(ctx, "interpret"):
+                return None
+            return await self._interpret_tool_result(ctx, tool_output)
+        
+        if mode == "structured":
+            return json.dumps(ctx.tool_result, indent=2, default=str)
+        
+        if mode == "rendered":
+            definition = self.tool_neuron.registry.get_definition(ctx.tool_name)
+            try:
+                rendered = definition.render(ctx.tool_result) if definition else None
+            except Exception as e:
+                logger.debug(f"Rendering {ctx.tool_name} output failed: {e}")
+                rendered = None
+            if rendered:
+                ctx.add_message("orchestrator", "rendered", "Tool result rendered by template")
+            return rendered
+        
+        return None
+    
+    def _fits_deadline(self, ctx: GoalContext, stage: str) -> bool:
+        """
+        Whether an optional stage may still start.
+        
+        With less than config.deadline_stage_reserve seconds left, the
+        stage is recorded in ctx.dropped_stages and skipped.
+        """
+        left = ctx.time_left()
+        if left is None or left >= self.config.deadline_stage_reserve:
+            return True
+        
+        ctx.dropped_stages.append(stage)
+        ctx.add_message("orchestrator", "dropped", f"Skipped {stage}: {left:.1f}s left before the deadline")
+        metrics.counter("goal_stages_dropped", stage=stage).inc()
+        return False
+    
     async def _interpret_tool_result(self, ctx: GoalContext, tool_output: str) -> Optional[str]:
         """
         Interpret tool output into a human-friendly response.
@@ -288,17 +905,9 @@ class Orchestrator:
         that directly answers the user's original question.
         """
         try:
-            from .llm import LLMClient
+            llm = self.config.get_llm()
             
-            llm = LLMClient(
-                base_url=self.config.llm_base_url,
-                api_key=self.config.llm_api_key,
-                model=self.config.llm_model,
-            )
-            
-            prompt = f"""You are a helpful assistant. The user asked: "{ctx.goal_text}"
-
-A tool returned this data:
+            prompt = f"""A tool returned this data for the user request:
 {tool_output[:8000]}
 
 Format this data as a human-friendly answer.
@@ -308,12 +917,25 @@ RULES:
 - If the data is a list, you MUST show EVERY SINGLE ITEM - never skip or summarize
 - Use bullet points for lists"""
             
-            response = await llm.generate(prompt, max_tokens=1500)
+            options = dict(
+                system=self.tool_neuron.goal_prefix(ctx),
+                profile=self.config.llm_profile("interpret"),
+                affinity=ctx.goal_id,
+            )
+            
+            if ctx.on_token:
+                tokens = []
+                async for token in llm.stream(prompt, **options):
+                    tokens.append(token)
+                    ctx.on_token(token)
+                response = "".join(tokens).strip()
+            else:
+                response = await llm.generate(prompt, **options)
             
             if response and len(response) > 10:
                 ctx.add_message("orchestrator", "interpreted", "Tool result interpreted for user")
                 return response
-            
+        
         except Exception as e:
             logger.debug(f"Tool interpretation failed: {e}")
         
@@ -338,6 +960,12 @@ RULES:
         
         return result.data
     
+    def _cancelled_response(self, ctx: GoalContext, token: CancelToken) -> Dict[str, Any]:
+        """Error response for a cancelled or expired goal."""
+        response = self._error_response(ctx, f"Goal cancelled: {token.reason}")
+        response["cancelled"] = True
+        return response
+    
     def _error_response(self, ctx: GoalContext, error: str) -> Dict[str, Any]:
         """Build error response."""
         ctx.fail(error)
@@ -347,6 +975,8 @@ RULES:
             "goal": ctx.goal_text,
             "intent": ctx.intent,
             "error": error,
+            "dropped_stages": ctx.dropped_stages,
             "duration_ms": ctx.duration_ms,
             "messages": ctx.messages,
+            "llm": summarize_llm_calls(ctx.llm_calls),
         }
@@ -0,0 +1,53 @@
+"""
+Output - How a tool goal's result is returned.
+
+A successful tool result can be returned four ways:
+
+    raw         The tool output as text (no LLM)
+    structured  The tool's result object as JSON, also under "data" (no LLM)
+    rendered    The tool's own renderer (ToolDefinition.renderer), else raw (no LLM)
+    llm         Rewritten as a natural answer by the LLM (interpret profile)
+
+The mode comes from process(output_mode=...), then the surrounding
+output_mode() block (the scheduler runs goals in "rendered" unless the
+goal sets one), then the route (explicit invocations: "rendered"), then
+Config.output_mode.
+"""
+
+import contextvars
+from contextlib import contextmanager
+from typing import Optional
+
+
+OUTPUT_MODES = ("raw", "structured", "rendered", "llm")
+
+# Output mode of the goals running in this context (None = not set)
+_current_output_mode = contextvars.ContextVar("output_mode", default=None)
+
+
+def check_output_mode(mode: Optional[str]) -> Optional[str]:
+    """Return the mode, or raise ValueError if it is not a known one."""
+    if mode is not None and mode not in OUTPUT_MODES:
+        raise ValueError(f"Unknown output mode: {mode!r} (expected one of {', '.join(OUTPUT_MODES)})")
+    return mode
+
+
+@contextmanager
+def output_mode(mode: Optional[str]):
+    """
+    Run a block with a default output mode for its goals.
+    
+    Usage:
+        with output_mode("rendered"):
+            await orchestrator.process(goal)
+    """
+    token = _current_output_mode.set(check_output_mode(mode))
+    try:
+        yield
+    finally:
+        _current_output_mode.reset(token)
+
+
+def current_output_mode() -> Optional[str]:
+    """Output mode set by the surrounding output_mode() block, if any."""
+    return _current_output_mode.get()
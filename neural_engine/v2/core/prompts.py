@@ -0,0 +1,39 @@
+"""
+Prompts - Shared goal prefix for llama.cpp KV cache reuse.
+
+One goal sends several prompts (intent, capability, selection, params,
+interpretation). llama.cpp only reuses its KV cache for the longest
+common token prefix with what the slot processed last, so every stage
+prompt is laid out as:
+
+    system: GOAL_SYSTEM_PROMPT + tool catalog + user request   (stable)
+    user:   stage-specific instructions                         (varies)
+
+Prefill for the stable part is paid once per goal; later stages only
+process their own suffix.
+
+Only stages that choose among tools (intent, routing, tool selection,
+parameters, interpretation) carry the catalog. Plain answers and memory
+extraction send the prefix without it (build_goal_prefix(goal)).
+"""
+
+GOAL_SYSTEM_PROMPT = """You are Dendrite, an assistant that answers user requests directly or by running tools.
+Follow the instructions in each message exactly and answer only in the format asked for."""
+
+
+def build_goal_prefix(goal: str, tools_text: str = "") -> str:
+    """
+    Build the stable system prompt shared by every stage of a goal.
+    
+    Args:
+        goal: The user request
+        tools_text: Tool catalog (one ToolDefinition.to_prompt_text() per line)
+    """
+    sections = [GOAL_SYSTEM_PROMPT]
+    
+    if tools_text:
+        sections.append(f"Available tools:\n{tools_text}")
+    
+    sections.append(f"User request: {goal}")
+    
+    return "\n\n".join(sections)
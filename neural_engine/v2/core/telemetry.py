@@ -0,0 +1,157 @@
+"""
+Telemetry - Buffered, pipelined Redis writes for events and thoughts.
+
+Every neuron emits events and records a thought around its work, and
+awaiting each write puts Redis round trips on the goal's critical path.
+TelemetryWriter queues the writes instead; a background task sends them
+in batches, one pipeline (no MULTI) per batch.
+
+The queue is bounded. When it is full (Redis slow or down) writes are
+dropped by the overflow policy and counted in telemetry_dropped, so a
+goal never waits on observability:
+    drop_oldest  - make room by discarding the oldest queued write
+    drop_newest  - discard the write being queued
+
+Writes are sent in the order they were queued. Readers (EventBus,
+ThoughtTree) flush the queue first, so they see this process's writes.
+
+Usage:
+    writer = TelemetryWriter(redis_client)
+    writer.write(lambda pipe: pipe.xadd("neural:events", fields))
+    await writer.flush()
+"""
+
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Callable, Deque, Optional
+
+import redis.asyncio as redis
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+# Adds one write's commands to a pipeline
+Write = Callable[[redis.client.Pipeline], None]
+
+OVERFLOW_POLICIES = ("drop_oldest", "drop_newest")
+
+
+class TelemetryWriter:
+    """
+    Bounded queue of Redis writes, flushed in pipelines in the background.
+    """
+    
+    RETRY_SECONDS = 1.0  # Pause after a failed batch (Redis down)
+    
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        max_queue: int = 10000,
+        batch_size: int = 256,
+        overflow: str = "drop_oldest",
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow} (expected one of {OVERFLOW_POLICIES})")
+        
+        self._redis = redis_client
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.overflow = overflow
+        self._queue: Deque[Write] = deque()
+        
+        # Bound to the running event loop (created on first write)
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._lock: Optional[asyncio.Lock] = None
+    
+    @classmethod
+    def from_config(cls, config) -> 'TelemetryWriter':
+        return cls(
+            config._ensure_redis(),
+            max_queue=config.telemetry_queue_size,
+            batch_size=config.telemetry_batch_size,
+            overflow=config.telemetry_overflow,
+        )
+    
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+    
+    def write(self, command: Write) -> None:
+        """Queue a write (never blocks; may drop per the overflow policy)."""
+        if len(self._queue) >= self.max_queue:
+            metrics.counter("telemetry_dropped", reason="overflow").inc()
+            if self.overflow == "drop_newest":
+                return
+            self._queue.popleft()
+        
+        self._queue.append(command)
+        metrics.gauge("telemetry_queue_depth").set(len(self._queue))
+        self._ensure_running()
+        self._wakeup.set()
+    
+    async def flush(self) -> None:
+        """Send everything queued so far."""
+        if not self._queue:
+            return
+        self._ensure_running()
+        while self._queue:
+            await self._send_batch()
+    
+    async def close(self) -> None:
+        """Flush and stop the background task."""
+        if self._task is not None and not self._task.done():
+            await self.flush()
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+    
+    def _ensure_running(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._wakeup = asyncio.Event()
+            self._lock = asyncio.Lock()
+            self._task = loop.create_task(self._run())
+    
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._queue:
+                if not await self._send_batch():
+                    await asyncio.sleep(self.RETRY_SECONDS)
+    
+    async def _send_batch(self) -> bool:
+        """Send up to batch_size queued writes in one pipeline (False if Redis failed)."""
+        async with self._lock:
+            batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+            metrics.gauge("telemetry_queue_depth").set(len(self._queue))
+            if not batch:
+                return True
+            
+            pipe = self._redis.pipeline(transaction=False)
+            for command in batch:
+                try:
+                    command(pipe)
+                except Exception as e:
+                    logger.debug(f"Telemetry write skipped: {e}")
+                    metrics.counter("telemetry_dropped", reason="invalid").inc()
+            
+            started = time.monotonic()
+            try:
+                await pipe.execute()
+            except Exception as e:
+                logger.debug(f"Telemetry Redis unavailable: {e}")
+                metrics.counter("telemetry_dropped", reason="redis_error").inc(len(batch))
+                return False
+            
+            metrics.counter("telemetry_writes").inc(len(batch))
+            metrics.histogram("telemetry_flush_seconds").observe(time.monotonic() - started)
+            return True
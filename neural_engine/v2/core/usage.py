@@ -0,0 +1,142 @@
+"""
+LLM Usage - Per-call tokens and timings from llama.cpp.
+
+Every llama.cpp response carries `usage` (prompt/completion tokens) and
+`timings` (prompt_ms = prefill, predicted_ms = decode). LLMClient turns
+each call into an LLMCall and:
+
+1. Observes it into histograms, labelled by profile (the call site)
+2. Appends it to every active collector, so a neuron or a whole goal
+   can report what its LLM calls cost
+
+Usage:
+    with collect_llm_calls() as calls:
+        await neuron.process(ctx)
+
+    summary = summarize_llm_calls(calls)
+    # {"calls": 3, "prompt_tokens": 812, "prefill_ms": 950.2, ...}
+"""
+
+import contextvars
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, List, Optional, Tuple
+
+from .metrics import metrics
+
+
+# Token-count buckets for the prompt/completion histograms
+TOKEN_BUCKETS = (8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+
+# Lists collecting calls in this context (innermost last)
+_collectors: contextvars.ContextVar[Tuple[List["LLMCall"], ...]] = contextvars.ContextVar(
+    "llm_collectors", default=()
+)
+
+
+@dataclass
+class LLMCall:
+    """Cost of one LLM call."""
+    profile: str                        # Call site (LLMProfile.name)
+    model: str
+    backend: Optional[str] = None       # Endpoint that answered (None = cache)
+    
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0              # Prompt tokens served from the KV cache
+    
+    queue_ms: float = 0.0               # Waiting for admission
+    prefill_ms: float = 0.0             # llama.cpp prompt processing
+    decode_ms: float = 0.0              # llama.cpp token generation
+    total_ms: float = 0.0               # Wall clock, queue included
+    
+    cache_hit: bool = False             # Served by the response cache
+    
+    @property
+    def decode_tps(self) -> float:
+        """Generated tokens per second."""
+        return self.completion_tokens * 1000 / self.decode_ms if self.decode_ms else 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        d = asdict(self)
+        d["decode_tps"] = round(self.decode_tps, 2)
+        return d
+    
+    def add_response(self, data: Dict[str, Any]) -> None:
+        """
+        Fill tokens and timings from a llama.cpp response (or final stream chunk).
+        
+        Token counts come from `usage`, falling back to `timings`
+        (prompt_n, predicted_n) on servers that only report those.
+        """
+        usage = data.get("usage") or {}
+        timings = data.get("timings") or {}
+        
+        self.model = data.get("model") or self.model
+        self.prompt_tokens = usage.get("prompt_tokens", timings.get("prompt_n", 0))
+        self.completion_tokens = usage.get("completion_tokens", timings.get("predicted_n", 0))
+        self.cached_tokens = timings.get("cache_n", 0)
+        self.prefill_ms = timings.get("prompt_ms", 0.0)
+        self.decode_ms = timings.get("predicted_ms", 0.0)
+
+
+@contextmanager
+def collect_llm_calls(calls: Optional[List[LLMCall]] = None):
+    """
+    Collect the LLM calls made in this block (tasks started in it included).
+    
+    Collectors nest: a call inside a neuron run inside a goal is seen by
+    both the neuron's and the goal's collector.
+    
+    Args:
+        calls: List to append to (default: a new one)
+    """
+    calls = calls if calls is not None else []
+    token = _collectors.set(_collectors.get() + (calls,))
+    try:
+        yield calls
+    finally:
+        _collectors.reset(token)
+
+
+def record_llm_call(call: LLMCall) -> None:
+    """Observe a finished call into the histograms and active collectors."""
+    for calls in _collectors.get():
+        calls.append(call)
+    
+    labels = {"profile": call.profile}
+    metrics.counter("llm_calls", cache_hit=call.cache_hit, **labels).inc()
+    if call.cache_hit:
+        return
+    
+    metrics.counter("llm_prompt_tokens_total", **labels).inc(call.prompt_tokens)
+    metrics.counter("llm_completion_tokens_total", **labels).inc(call.completion_tokens)
+    metrics.histogram("llm_prompt_tokens", buckets=TOKEN_BUCKETS, **labels).observe(call.prompt_tokens)
+    metrics.histogram("llm_completion_tokens", buckets=TOKEN_BUCKETS, **labels).observe(call.completion_tokens)
+    metrics.histogram("llm_prefill_ms", **labels).observe(call.prefill_ms)
+    metrics.histogram("llm_decode_ms", **labels).observe(call.decode_ms)
+    metrics.histogram("llm_call_ms", **labels).observe(call.total_ms)
+    if call.decode_tps:
+        metrics.histogram("llm_decode_tps", buckets=TOKEN_BUCKETS, **labels).observe(call.decode_tps)
+
+
+def summarize_llm_calls(calls: List[LLMCall]) -> Dict[str, Any]:
+    """Totals for a group of calls, overall and per profile."""
+    def totals(group: List[LLMCall]) -> Dict[str, Any]:
+        return {
+            "calls": len(group),
+            "cache_hits": sum(1 for c in group if c.cache_hit),
+            "prompt_tokens": sum(c.prompt_tokens for c in group),
+            "completion_tokens": sum(c.completion_tokens for c in group),
+            "cached_tokens": sum(c.cached_tokens for c in group),
+            "queue_ms": round(sum(c.queue_ms for c in group), 1),
+            "prefill_ms": round(sum(c.prefill_ms for c in group), 1),
+            "decode_ms": round(sum(c.decode_ms for c in group), 1),
+        }
+    
+    summary = totals(calls)
+    summary["by_profile"] = {
+        profile: totals([c for c in calls if c.profile == profile])
+        for profile in sorted({c.profile for c in calls})
+    }
+    return summary
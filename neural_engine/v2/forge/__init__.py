@@ -22,7 +22,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Dict, Any, List, Optional, Callable
 
-from ..core import LLMClient, Config
+from ..core import Config
 from ..tools import Tool, ToolDefinition, ToolRegistry
 
 logger = logging.getLogger(__name__)
@@ -235,11 +235,7 @@ class ToolForge:
     def __init__(self, config: Config, registry: ToolRegistry):
         self.config = config
         self.registry = registry
-        self.llm = LLMClient(
-            base_url=config.llm_base_url,
-            api_key=config.llm_api_key,
-            model=config.llm_model,
-        )
+        self.llm = config.get_llm()
         
         # Track performance for all tools
         self._performance: Dict[str, ToolPerformance] = {}
@@ -282,7 +278,7 @@ class ToolForge:
         )
         
         try:
-            code = await self.llm.generate(prompt)
+            code = await self.llm.generate(prompt, profile=self.config.llm_profile("forge"))
             code = self._extract_code(code)
             
             if not code:
@@ -409,7 +405,7 @@ class ToolForge:
         prompt = TOOL_DEFINITION_PROMPT.format(code=code)
         
         try:
-            definition = await self.llm.generate_json(prompt)
+            definition = await self.llm.generate_json(prompt, profile=self.config.llm_profile("forge"))
             return definition
         except Exception as e:
             logger.error(f"Failed to extract definition: {e}")
@@ -473,11 +469,13 @@ class ToolForge:
             if perf.status == ToolStatus.DEGRADED
         ]
     
-    def retire_tool(self, tool_name: str) -> bool:
+    def retire_tool(self, tool_name: str, remove: bool = False) -> bool:
         """Retire a tool (mark as inactive, optionally remove from registry)."""
         if tool_name in self._performance:
             self._performance[tool_name].status = ToolStatus.RETIRED
             logger.info(f"Retired tool: {tool_name}")
+            if not (remove and self.registry.unregister(tool_name)):
+                self.registry.notify_changed(tool_name, "retired")
             return True
         return False
     
@@ -6,16 +6,35 @@ Each neuron has a single responsibility:
 - GenerativeNeuron: Generate text responses
 - ToolNeuron: Execute tools
 - MemoryNeuron: Read/write memories
+- RouterNeuron: Intent, tool and arguments in one call (fused routing)
+- PlannerNeuron: Split a compound goal into a DAG of sub-goals
+
+fastpath.parse_tool_invocation() routes explicit "use <tool> with k=v"
+goals without any LLM call; pathways.PathwayCache replays routes learned
+from earlier goals.
 """
 
 from .intent import IntentNeuron
 from .generative import GenerativeNeuron
 from .tools import ToolNeuron
 from .memory import MemoryNeuron
+from .router import RouterNeuron, Route
+from .fastpath import parse_tool_invocation, explicit_route
+from .pathways import PathwayCache
+from .planner import PlannerNeuron, Plan, PlanStep, PlanCache
 
 __all__ = [
     "IntentNeuron",
     "GenerativeNeuron",
     "ToolNeuron",
     "MemoryNeuron",
+    "RouterNeuron",
+    "Route",
+    "parse_tool_invocation",
+    "explicit_route",
+    "PathwayCache",
+    "PlannerNeuron",
+    "Plan",
+    "PlanStep",
+    "PlanCache",
 ]
@@ -0,0 +1,173 @@
+"""
+Fast Path - Route explicit tool invocations without the LLM.
+
+Scheduled goals are usually written as commands:
+
+    "Use strava_reciprocate_kudos with count=30 and max_age_hours=24"
+
+When the goal names a registered tool and gives its arguments as
+key=value pairs, the route is already known. The arguments are coerced to
+the tool's parameter types, and the goal skips intent classification and
+the tool selection stages. The output defaults to the "rendered" mode
+(core/output.py), so the goal makes no LLM call unless the tool fails
+and recovery takes over.
+
+Anything that does not parse cleanly returns None and takes the normal
+(LLM) route: unknown tools or arguments, missing required arguments,
+values of the wrong type, or extra words around the command.
+"""
+
+import re
+import json
+from typing import Any, Dict, Optional
+
+from ..tools import ToolRegistry, ToolDefinition, JSON_SCHEMA_TYPES
+from .router import Route
+
+
+# "use <tool>", optionally followed by "with <arguments>"
+INVOCATION_PATTERN = re.compile(
+    r"^\s*(?:please\s+)?(?:use|run|call|execute)\s+(?:the\s+)?(?:tool\s+)?"
+    r"(?P<tool>[A-Za-z_][\w.-]*)(?:\s+tool)?(?:\s+with\s+(?P<args>.*?))?\s*[.!]?\s*$",
+    re.IGNORECASE | re.DOTALL,
+)
+
+# key=value, value quoted or up to the next separator
+ARGUMENT_PATTERN = re.compile(
+    r"""(?P<key>[A-Za-z_]\w*)\s*=\s*(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<bare>[^\s,]+))"""
+)
+
+# What may sit between arguments
+SEPARATOR_PATTERN = re.compile(r"^(?:\s|,|\band\b)*$", re.IGNORECASE)
+
+_TRUE = {"true", "yes", "on", "1"}
+_FALSE = {"false", "no", "off", "0"}
+
+
+def coerce_value(value: Any, param_type: str) -> Any:
+    """
+    Convert a value to a parameter's declared type.
+    
+    Raises ValueError when it does not fit. Untyped parameters keep the value.
+    """
+    json_type = JSON_SCHEMA_TYPES.get(str(param_type or "").lower())
+    
+    if json_type == "boolean":
+        if isinstance(value, bool):
+            return value
+        text = str(value).strip().lower()
+        if text in _TRUE:
+            return True
+        if text in _FALSE:
+            return False
+        raise ValueError(f"not a boolean: {value!r}")
+    
+    if isinstance(value, bool) and json_type in ("integer", "number"):
+        raise ValueError(f"not a {json_type}: {value!r}")
+    
+    if json_type == "integer":
+        if isinstance(value, float) and not value.is_integer():
+            raise ValueError(f"not an integer: {value!r}")
+        return int(value)
+    
+    if json_type == "number":
+        return float(value) if isinstance(value, str) else value + 0
+    
+    if json_type in ("array", "object"):
+        if isinstance(value, str):
+            value = json.loads(value)
+        expected = list if json_type == "array" else dict
+        if not isinstance(value, expected):
+            raise ValueError(f"not an {json_type}: {value!r}")
+        return value
+    
+    if json_type == "string":
+        return value if isinstance(value, str) else str(value)
+    
+    return value
+
+
+def coerce_arguments(definition: ToolDefinition, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Arguments converted to the tool's parameter types.
+    
+    Raises ValueError for unknown, missing or mistyped arguments.
+    """
+    params = {p["name"]: p for p in definition.parameters}
+    
+    unknown = set(arguments) - set(params)
+    if unknown:
+        raise ValueError(f"unknown arguments: {sorted(unknown)}")
+    
+    missing = [name for name in definition.required_params if name in params and name not in arguments]
+    if missing:
+        raise ValueError(f"missing arguments: {missing}")
+    
+    coerced = {}
+    for name, value in arguments.items():
+        try:
+            coerced[name] = coerce_value(value, params[name].get("type"))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"{name}: {e}") from None
+    return coerced
+
+
+def explicit_route(registry: ToolRegistry, tool_name: str, arguments: Dict[str, Any] = None) -> Route:
+    """
+    Route for a named tool with given arguments (e.g. goals.yaml fields).
+    
+    Raises ValueError if the tool is unknown or the arguments do not fit.
+    """
+    definition = registry.get_definition(tool_name)
+    if definition is None:
+        raise ValueError(f"unknown tool: {tool_name}")
+    
+    parameters = coerce_arguments(definition, dict(arguments or {}))
+    return Route(intent="tool", tool_name=tool_name, parameters=parameters, confidence=1.0, explicit=True)
+
+
+def parse_arguments(text: str) -> Optional[Dict[str, str]]:
+    """key=value pairs from text, or None if anything else is in there."""
+    arguments = {}
+    position = 0
+    
+    for match in ARGUMENT_PATTERN.finditer(text):
+        if not SEPARATOR_PATTERN.match(text[position:match.start()]):
+            return None
+        key = match.group("key")
+        if key in arguments:
+            return None
+        value = match.group("bare")
+        if value is None:
+            value = match.group("dq") if match.group("dq") is not None else match.group("sq")
+        arguments[key] = value
+        position = match.end()
+    
+    if not SEPARATOR_PATTERN.match(text[position:]):
+        return None
+    return arguments
+
+
+def parse_tool_invocation(goal: str, registry: ToolRegistry) -> Optional[Route]:
+    """
+    Route for an explicit "use <tool> with key=value ..." goal.
+    
+    Returns None unless the goal is exactly such a command for a
+    registered tool with valid arguments.
+    """
+    match = INVOCATION_PATTERN.match(goal)
+    if not match:
+        return None
+    
+    tool_name = match.group("tool")
+    if registry.get_definition(tool_name) is None:
+        return None
+    
+    arguments = parse_arguments(match.group("args") or "")
+    if arguments is None:
+        return None
+    
+    try:
+        return explicit_route(registry, tool_name, arguments)
+    except ValueError:
+        return None
@@ -12,10 +12,11 @@ from typing import Any
 
 from ..core.base import Neuron
 from ..core.memory import GoalContext
+from ..core.prompts import build_goal_prefix
 
 
-# System prompt for generative responses
-SYSTEM_PROMPT = """You are a helpful AI assistant. Provide clear, accurate, and helpful responses.
+# Generative response instructions (follow the request, without the tool catalog)
+GENERATIVE_PROMPT = """Answer the user request directly. Provide a clear, accurate, and helpful response.
 
 Guidelines:
 - Be direct and concise
@@ -28,7 +29,8 @@ class GenerativeNeuron(Neuron):
     """
     Generate text responses to user queries.
     
-    Uses LLM directly with a helpful system prompt.
+    Uses the LLM directly: a short system prompt with the request, not
+    the goal's shared prefix - an answer needs no tool catalog.
     No complex logic - just good prompting.
     """
     
@@ -47,9 +49,20 @@ class GenerativeNeuron(Neuron):
         """
         query = input_data or ctx.goal_text
         
-        # Build prompt with system context
-        prompt = f"{SYSTEM_PROMPT}\n\nUser: {query}\n\nAssistant:"
+        options = dict(
+            system=build_goal_prefix(query),
+            profile=self.config.llm_profile("generative"),
+            affinity=ctx.goal_id,
+        )
         
-        response = await self.llm.generate(prompt)
+        # Stream tokens to the caller as they arrive, if anyone is listening
+        if ctx.on_token:
+            tokens = []
+            async for token in self.llm.stream(GENERATIVE_PROMPT, **options):
+                tokens.append(token)
+                ctx.on_token(token)
+            return "".join(tokens).strip()
+        
+        response = await self.llm.generate(GENERATIVE_PROMPT, **options)
         
         return response.strip()
\ No newline at end of file
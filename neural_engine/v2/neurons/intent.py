@@ -14,8 +14,12 @@ from ..core.base import Neuron
 from ..core.memory import GoalContext
 
 
-# Intent classification prompt
-INTENT_PROMPT = """Classify this user request into ONE category:
+# Intent categories, in the order they are matched in a loose answer
+INTENTS = ["generative", "tool", "memory_read", "memory_write"]
+
+
+# Intent classification prompt (follows the goal prefix)
+INTENT_PROMPT = """Classify the user request into ONE category:
 
 Categories:
 - generative: Questions, explanations, conversation, creative writing
@@ -23,8 +27,6 @@ Categories:
 - memory_read: Asking about previously stored information ("what did I tell you about...", "do you remember...")
 - memory_write: Storing new information for later ("remember that...", "my name is...", "save this...")
 
-Request: {goal}
-
 Respond with ONLY the category name, nothing else."""
 
 
@@ -51,19 +53,21 @@ class IntentNeuron(Neuron):
         """
         goal = input_data or ctx.goal_text
         
-        prompt = INTENT_PROMPT.format(goal=goal)
-        
-        response = await self.llm.generate(prompt)
+        # Deterministic one-word answer (temperature 0, cacheable)
+        response = await self.llm.generate(
+            INTENT_PROMPT,
+            system=self.goal_prefix(ctx, goal),
+            profile=self.config.llm_profile("intent"),
+            affinity=ctx.goal_id,
+        )
         
         # Parse response - just get the category
         intent = response.strip().lower()
         
         # Validate - default to generative if unknown
-        valid_intents = {"generative", "tool", "memory_read", "memory_write"}
-        
-        if intent not in valid_intents:
+        if intent not in INTENTS:
             # Try to extract from response
-            for valid in valid_intents:
+            for valid in INTENTS:
                 if valid in intent:
                     return valid
             # Default
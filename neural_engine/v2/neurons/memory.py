@@ -13,12 +13,12 @@ from typing import Any, Dict
 
 from ..core.base import Neuron
 from ..core.memory import GoalContext
+from ..core.prompts import build_goal_prefix
 
 
-# Memory extraction prompt
-MEMORY_EXTRACT_PROMPT = """Extract memory information from this request.
+# Memory extraction prompt (follows the goal prefix)
+MEMORY_EXTRACT_PROMPT = """Extract memory information from the user request.
 
-Request: {goal}
 Action: {action}
 
 For READ requests, extract:
@@ -32,6 +32,18 @@ Respond with JSON:
 {{"key": "the_key", "value": "the_value_if_writing"}}"""
 
 
+# Constrained decoding schema for MEMORY_EXTRACT_PROMPT
+MEMORY_EXTRACT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "key": {"type": "string"},
+        "value": {"type": "string"},
+    },
+    "required": ["key"],
+    "additionalProperties": False,
+}
+
+
 class MemoryNeuron(Neuron):
     """
     Read and write memories using Redis.
@@ -63,7 +75,7 @@ class MemoryNeuron(Neuron):
             goal = input_data or ctx.goal_text
         
         # Extract key/value using LLM
-        extracted = await self._extract_memory_info(goal, action)
+        extracted = await self._extract_memory_info(ctx, goal, action)
         
         key = extracted.get("key", "").strip()
         if not key:
@@ -77,12 +89,18 @@ class MemoryNeuron(Neuron):
                 return "Could not determine what value to store"
             return await self._write(key, value)
     
-    async def _extract_memory_info(self, goal: str, action: str) -> Dict[str, str]:
+    async def _extract_memory_info(self, ctx: GoalContext, goal: str, action: str) -> Dict[str, str]:
         """Use LLM to extract key/value from natural language."""
-        prompt = MEMORY_EXTRACT_PROMPT.format(goal=goal, action=action.upper())
+        prompt = MEMORY_EXTRACT_PROMPT.format(action=action.upper())
         
         try:
-            return await self.llm.generate_json(prompt)
+            return await self.llm.generate_json(
+                prompt,
+                system=build_goal_prefix(goal),  # No tool catalog needed
+                schema=MEMORY_EXTRACT_SCHEMA,
+                profile=self.config.llm_profile("params"),
+                affinity=ctx.goal_id,
+            )
         except Exception:
             return {}
     
@@ -0,0 +1,395 @@
+"""
+Pathway Cache - Replay known goal → tool → parameters routes (System 1).
+
+Most tool goals repeat: the same scheduled goal every morning, the same
+question with a different number in it. Once a goal has been routed by
+the LLM and its tool succeeded, the route is remembered in Redis and the
+next identical or similar goal replays it without any routing LLM call.
+
+Lookup:
+1. Exact match on the normalized goal text
+2. Similarity: among pathways of goals with as many words (the shape
+   index), those whose vectors are close enough (numbers count as one
+   token, so "last 5 runs" and "last 10 runs" are the same shape).
+   Parameters whose value was a word of the original goal are slots and
+   are filled from the new goal's words at the same position; if they
+   cannot be, or the pathway has no slots, it is a miss - stored
+   parameters are never replayed for a different goal as they are.
+
+Each pathway keeps success and failure counts. Its confidence
+(successes + 1) / (runs + 2) must reach min_confidence to be replayed;
+repeated failures delete it.
+
+Pathways for a tool are dropped when the tool is re-registered,
+unregistered or retired (ToolRegistry listeners), and ignored when the
+tool's definition no longer matches the one they were learned with.
+
+Vectors are hashed bags of words unless an `embed` function is given
+(e.g. an embedding model); both are compared by cosine similarity.
+"""
+
+import re
+import json
+import math
+import time
+import hashlib
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+import redis.asyncio as redis
+
+from ..core.metrics import metrics
+from ..tools import ToolRegistry, ToolDefinition
+from .fastpath import coerce_value
+from .router import Route
+
+logger = logging.getLogger(__name__)
+
+
+# Words of a goal (punctuation other than inside values is dropped)
+TOKEN_PATTERN = re.compile(r"[\w'.:/@+-]+")
+
+# Dimensions of the hashed bag-of-words vectors
+VECTOR_SIZE = 256
+
+
+def goal_tokens(goal: str) -> List[str]:
+    """Lowercase words of a goal, trailing sentence punctuation removed."""
+    tokens = (t.rstrip(".:") for t in TOKEN_PATTERN.findall(goal.lower()))
+    return [t for t in tokens if t]
+
+
+def normalize_goal(goal: str) -> str:
+    """Goal text as compared for exact matches."""
+    return " ".join(goal_tokens(goal))
+
+
+def hashed_vector(text: str) -> List[float]:
+    """Unit-length hashed bag of words, numbers folded into one token."""
+    vector = [0.0] * VECTOR_SIZE
+    for token in goal_tokens(text):
+        if re.fullmatch(r"[\d.:+-]+", token):
+            token = "#"
+        digest = hashlib.md5(token.encode()).digest()
+        vector[int.from_bytes(digest[:4], "little") % VECTOR_SIZE] += 1.0
+    
+    norm = math.sqrt(sum(v * v for v in vector))
+    return [v / norm for v in vector] if norm else vector
+
+
+def cosine(a: List[float], b: List[float]) -> float:
+    """Cosine similarity of two vectors (0.0 if either is empty)."""
+    if not a or not b or len(a) != len(b):
+        return 0.0
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def definition_fingerprint(definition: ToolDefinition) -> str:
+    """Hash of what a pathway's parameters depend on (name, parameters, source)."""
+    canonical = json.dumps(
+        [definition.name, definition.parameters, definition.module_name, definition.class_name],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+
+class PathwayCache:
+    """
+    Learned goal → tool routes, shared through Redis.
+    
+    Usage:
+        pathways = PathwayCache(redis_client, registry)
+        
+        route = await pathways.lookup(goal)        # Route or None
+        ...
+        await pathways.record(goal, "tool_name", params, success=True)
+    
+    Redis keys:
+        pathway:<hash>          Pathway JSON (TTL refreshed when used)
+        pathway:index           Sorted set of hashes by last use (LRU trim)
+        pathway:tool:<name>     Hashes of a tool's pathways (invalidation)
+        pathway:shape:<words>   Hashes of pathways whose goal has that many words
+    """
+    
+    KEY_PREFIX = "pathway:"
+    INDEX_KEY = "pathway:index"
+    TOOL_KEY_PREFIX = "pathway:tool:"
+    SHAPE_KEY_PREFIX = "pathway:shape:"
+    REDIS_RETRY_SECONDS = 30  # Skip Redis this long after an error
+    MAX_FAILURES = 3          # Failures (below min_confidence) before a pathway is deleted
+    
+    def __init__(
+        self,
+        redis_client: Optional[redis.Redis],
+        registry: ToolRegistry,
+        similarity_threshold: float = 0.9,
+        min_confidence: float = 0.6,
+        max_entries: int = 500,
+        ttl_seconds: int = 30 * 24 * 3600,
+        embed: Optional[Callable[[str], List[float]]] = None,
+    ):
+        self._redis = redis_client
+        self.registry = registry
+        self.similarity_threshold = similarity_threshold
+        self.min_confidence = min_confidence
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.embed = embed or hashed_vector
+        
+        self._stale_tools: set = set()  # Changed tools not yet invalidated in Redis
+        self._redis_down_until = 0.0
+        registry.add_listener(self.tool_changed)
+    
+    @classmethod
+    def from_config(cls, config, registry: ToolRegistry) -> 'PathwayCache':
+        """Create from config (shared Redis client)."""
+        return cls(
+            config._ensure_redis(),
+            registry,
+            similarity_threshold=config.pathway_similarity_threshold,
+            min_confidence=config.pathway_min_confidence,
+            max_entries=config.pathway_max_entries,
+        )
+    
+    @staticmethod
+    def make_key(goal: str) -> str:
+        """Hash of the normalized goal text."""
+        return hashlib.sha256(normalize_goal(goal).encode()).hexdigest()[:32]
+    
+    @staticmethod
+    def confidence(entry: Dict[str, Any]) -> float:
+        """Smoothed success rate of a pathway."""
+        return (entry["successes"] + 1) / (entry["successes"] + entry["failures"] + 2)
+    
+    def tool_changed(self, tool_name: str, event: str) -> None:
+        """ToolRegistry listener: forget a tool's pathways when it changes."""
+        if event != "registered":
+            self._stale_tools.add(tool_name)
+    
+    async def lookup(self, goal: str) -> Optional[Route]:
+        """Learned route for a goal, or None (ask the LLM)."""
+        if not self._redis_available():
+            return None
+        await self._flush_stale()
+        
+        try:
+            key = self.make_key(goal)
+            entry = await self._load(key)
+            route = self._replay(key, entry, goal_tokens(goal), exact=True) if entry else None
+            
+            if route is None:
+                key, route = await self._similar(goal)
+            
+            if route is None:
+                metrics.counter("pathway_cache", outcome="miss").inc()
+                return None
+            
+            await self._redis.zadd(self.INDEX_KEY, {key: time.time()})
+            await self._redis.expire(f"{self.KEY_PREFIX}{key}", self.ttl_seconds)
+        except Exception as e:
+            self._redis_failed(e)
+            return None
+        
+        metrics.counter("pathway_cache", outcome="hit").inc()
+        return route
+    
+    async def record(
+        self,
+        goal: str,
+        tool_name: str,
+        parameters: Dict[str, Any],
+        success: bool,
+        pathway: Optional[str] = None,
+    ) -> None:
+        """
+        Learn from a routed tool run.
+        
+        A success stores or reinforces the goal's pathway. A failure
+        lowers the confidence of the pathway that was replayed (`pathway`,
+        Route.pathway) or else the goal's own, and deletes it after
+        repeated failures.
+        """
+        definition = self.registry.get_definition(tool_name)
+        if definition is None or not self._redis_available():
+            return
+        await self._flush_stale()
+        
+        key = self.make_key(goal) if success or pathway is None else pathway
+        try:
+            entry = await self._load(key)
+            
+            if success:
+                if entry is None or entry["tool"] != tool_name or entry["parameters"] != parameters:
+                    entry = self._new_entry(goal, definition, parameters)
+                entry["successes"] += 1
+            else:
+                if entry is None or entry["tool"] != tool_name:
+                    return
+                entry["failures"] += 1
+                if entry["failures"] >= self.MAX_FAILURES and self.confidence(entry) < self.min_confidence:
+                    await self._delete(key, tool_name)
+                    return
+            
+            await self._redis.set(f"{self.KEY_PREFIX}{key}", json.dumps(entry), ex=self.ttl_seconds)
+            await self._redis.zadd(self.INDEX_KEY, {key: time.time()})
+            await self._redis.sadd(f"{self.TOOL_KEY_PREFIX}{tool_name}", key)
+            shape_key = self._shape_key(len(entry["template"]))
+            await self._redis.sadd(shape_key, key)
+            await self._redis.expire(shape_key, self.ttl_seconds)
+            await self._trim()
+        except Exception as e:
+            self._redis_failed(e)
+    
+    async def invalidate_tool(self, tool_name: str) -> int:
+        """Delete every pathway of a tool. Returns how many were deleted."""
+        tool_key = f"{self.TOOL_KEY_PREFIX}{tool_name}"
+        keys = list(await self._redis.smembers(tool_key))
+        
+        if keys:
+            await self._redis.delete(*[f"{self.KEY_PREFIX}{k}" for k in keys])
+            await self._redis.zrem(self.INDEX_KEY, *keys)
+        await self._redis.delete(tool_key)
+        
+        metrics.counter("pathway_cache_invalidated").inc(len(keys))
+        logger.info(f"Invalidated {len(keys)} pathways for tool: {tool_name}")
+        return len(keys)
+    
+    def _new_entry(self, goal: str, definition: ToolDefinition, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """Pathway for a goal, with the parameters found in its words as slots."""
+        tokens = goal_tokens(goal)
+        template = list(tokens)
+        slots = {}
+        
+        for name, value in parameters.items():
+            if isinstance(value, (dict, list)):
+                continue
+            word = str(value).lower()
+            if template.count(word) == 1:
+                template[template.index(word)] = None
+                slots[name] = tokens.index(word)
+        
+        return {
+            "goal": normalize_goal(goal),
+            "intent": "tool",
+            "tool": definition.name,
+            "parameters": parameters,
+            "template": template,
+            "slots": slots,
+            "vector": self.embed(goal),
+            "fingerprint": definition_fingerprint(definition),
+            "successes": 0,
+            "failures": 0,
+        }
+    
+    def _replay(self, key: str, entry: Dict[str, Any], tokens: List[str], exact: bool = False) -> Optional[Route]:
+        """Route from a pathway for a goal's words, or None if it does not apply."""
+        definition = self.registry.get_definition(entry["tool"])
+        if definition is None or definition_fingerprint(definition) != entry["fingerprint"]:
+            return None
+        confidence = self.confidence(entry)
+        if confidence < self.min_confidence:
+            return None
+        
+        parameters = dict(entry["parameters"])
+        if not exact:
+            parameters = self._fill_slots(entry, definition, tokens)
+            if parameters is None:
+                return None
+        
+        return Route(
+            intent=entry["intent"],
+            tool_name=entry["tool"],
+            parameters=parameters,
+            confidence=confidence,
+            pathway=key,
+        )
+    
+    @staticmethod
+    def _fill_slots(entry: Dict[str, Any], definition: ToolDefinition, tokens: List[str]) -> Optional[Dict[str, Any]]:
+        """Parameters with slots taken from the goal's words (None if the words differ)."""
+        template = entry["template"]
+        if len(tokens) != len(template):
+            return None
+        if any(t is not None and t != w for t, w in zip(template, tokens)):
+            return None  # Without slots, any different word is a miss
+        
+        types = {p["name"]: p.get("type") for p in definition.parameters}
+        parameters = dict(entry["parameters"])
+        for name, position in entry["slots"].items():
+            try:
+                parameters[name] = coerce_value(tokens[position], types.get(name))
+            except (TypeError, ValueError):
+                return None
+        return parameters
+    
+    def _shape_key(self, words: int) -> str:
+        return f"{self.SHAPE_KEY_PREFIX}{words}"
+    
+    async def _similar(self, goal: str):
+        """(key, route) of the closest replayable pathway, or (None, None)."""
+        # Only pathways of goals with as many words can be replayed (slots
+        # are positions), so only those are loaded and compared
+        tokens = goal_tokens(goal)
+        shape_key = self._shape_key(len(tokens))
+        keys = list(await self._redis.smembers(shape_key))
+        if not keys:
+            return None, None
+        
+        vector = self.embed(goal)
+        scored, gone = [], []
+        for key, raw in zip(keys, await self._redis.mget([f"{self.KEY_PREFIX}{k}" for k in keys])):
+            if raw is None:
+                gone.append(key)  # Expired, trimmed or invalidated
+                continue
+            entry = json.loads(raw)
+            similarity = cosine(vector, entry.get("vector") or [])
+            if similarity >= self.similarity_threshold:
+                scored.append((similarity, key, entry))
+        if gone:
+            await self._redis.srem(shape_key, *gone)
+        
+        for _, key, entry in sorted(scored, key=lambda s: s[0], reverse=True):
+            route = self._replay(key, entry, tokens)
+            if route:
+                return key, route
+        return None, None
+    
+    async def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        raw = await self._redis.get(f"{self.KEY_PREFIX}{key}")
+        return json.loads(raw) if raw else None
+    
+    async def _delete(self, key: str, tool_name: str) -> None:
+        await self._redis.delete(f"{self.KEY_PREFIX}{key}")
+        await self._redis.zrem(self.INDEX_KEY, key)
+        await self._redis.srem(f"{self.TOOL_KEY_PREFIX}{tool_name}", key)
+    
+    async def _trim(self) -> None:
+        """Drop the least recently used pathways beyond max_entries."""
+        excess = await self._redis.zcard(self.INDEX_KEY) - self.max_entries
+        if excess <= 0:
+            return
+        keys = await self._redis.zrange(self.INDEX_KEY, 0, excess - 1)
+        await self._redis.delete(*[f"{self.KEY_PREFIX}{k}" for k in keys])
+        await self._redis.zrem(self.INDEX_KEY, *keys)
+    
+    async def _flush_stale(self) -> None:
+        """Invalidate pathways of tools changed since the last call."""
+        while self._stale_tools:
+            tool_name = self._stale_tools.pop()
+            try:
+                await self.invalidate_tool(tool_name)
+            except Exception as e:
+                self._stale_tools.add(tool_name)
+                self._redis_failed(e)
+                return
+    
+    def _redis_available(self) -> bool:
+        return self._redis is not None and time.monotonic() >= self._redis_down_until
+    
+    def _redis_failed(self, e: Exception) -> None:
+        logger.debug(f"Pathway cache Redis unavailable: {e}")
+        metrics.counter("pathway_cache_errors").inc()
+        self._redis_down_until = time.monotonic() + self.REDIS_RETRY_SECONDS
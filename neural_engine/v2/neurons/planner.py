@@ -0,0 +1,305 @@
+"""
+Planner Neuron - Split a compound goal into a DAG of tool sub-goals.
+
+"Get my last 5 activities and the dashboard feed" needs two tools, but a
+goal otherwise runs one. The planner asks the LLM for the separate
+tasks and which ones need another's result:
+
+    s1: "Get my last 5 activities"        depends_on: []
+    s2: "Get my dashboard feed"           depends_on: []
+
+The orchestrator runs each step as a sub-goal as soon as its
+dependencies are done (bounded by config.plan_concurrency), so the wall
+time is the DAG's critical path, then merges the results.
+
+Plans that ran successfully are kept in Redis (PlanCache) and reused
+for the same goal, or one that differs only in a few words ("last 10
+activities"): those words are swapped into the step goals.
+"""
+
+import re
+import json
+import time
+import hashlib
+import logging
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, List, Optional
+
+import redis.asyncio as redis
+
+from ..core.base import Neuron
+from ..core.memory import GoalContext
+from ..core.metrics import metrics
+from .pathways import goal_tokens, normalize_goal
+
+logger = logging.getLogger(__name__)
+
+
+# Planning prompt (follows the goal prefix, which lists the tools)
+PLAN_PROMPT = """Split the user request into the separate tasks it asks for.
+
+Each step is a self-contained request that one tool can handle, written
+as an instruction. A step lists another in depends_on only if it needs
+that step's result. A request that is a single task gets one step.
+
+Respond with JSON:
+{"steps": [{"id": "s1", "goal": "...", "depends_on": []}, ...]}"""
+
+
+PLAN_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "steps": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "id": {"type": "string"},
+                    "goal": {"type": "string"},
+                    "depends_on": {"type": "array", "items": {"type": "string"}},
+                },
+                "required": ["id", "goal", "depends_on"],
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["steps"],
+    "additionalProperties": False,
+}
+
+# Words that join several requests in one goal
+COMPOUND_PATTERN = re.compile(r"\b(?:and|then|also|plus|after that)\b|[;&]", re.IGNORECASE)
+
+# Most steps a plan may have
+MAX_STEPS = 8
+
+
+def looks_compound(goal: str) -> bool:
+    """Whether a goal may hold several requests (worth a planning call)."""
+    return bool(COMPOUND_PATTERN.search(goal))
+
+
+@dataclass
+class PlanStep:
+    """One sub-goal of a plan."""
+    id: str
+    goal: str
+    depends_on: List[str] = field(default_factory=list)
+
+
+@dataclass
+class Plan:
+    """Sub-goals with dependencies (a DAG), in a valid execution order."""
+    steps: List[PlanStep]
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Plan':
+        """
+        Plan from an LLM answer or cache entry.
+        
+        Raises ValueError if it is not a DAG of at most MAX_STEPS steps.
+        """
+        steps = [
+            PlanStep(id=str(s["id"]), goal=str(s["goal"]).strip(), depends_on=[str(d) for d in s.get("depends_on") or []])
+            for s in data.get("steps") or []
+        ]
+        if not steps:
+            raise ValueError("plan has no steps")
+        if len(steps) > MAX_STEPS:
+            raise ValueError(f"plan has {len(steps)} steps (max {MAX_STEPS})")
+        
+        by_id = {s.id: s for s in steps}
+        if len(by_id) != len(steps):
+            raise ValueError("duplicate step ids")
+        for step in steps:
+            if not step.goal:
+                raise ValueError(f"step {step.id} has no goal")
+            unknown = [d for d in step.depends_on if d not in by_id]
+            if unknown:
+                raise ValueError(f"step {step.id} depends on unknown steps {unknown}")
+        
+        # Topological order (Kahn); leftovers are a cycle
+        ordered, done = [], set()
+        while len(ordered) < len(steps):
+            ready = [s for s in steps if s.id not in done and all(d in done for d in s.depends_on)]
+            if not ready:
+                raise ValueError("plan has a dependency cycle")
+            ordered.extend(ready)
+            done.update(s.id for s in ready)
+        
+        return cls(steps=ordered)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {"steps": [asdict(s) for s in self.steps]}
+    
+    def contains_words(self, words) -> bool:
+        """Whether every word occurs, as a whole word, in some step goal (case-insensitive)."""
+        return all(
+            any(re.search(r"(?<![\w])" + re.escape(w) + r"(?![\w])", s.goal, re.IGNORECASE) for s in self.steps)
+            for w in words
+        )
+    
+    def substitute(self, replacements: Dict[str, str]) -> 'Plan':
+        """Plan with whole words in the step goals replaced (case-insensitive)."""
+        if not replacements:
+            return self
+        pattern = re.compile(
+            r"(?<![\w])(" + "|".join(re.escape(w) for w in replacements) + r")(?![\w])", re.IGNORECASE
+        )
+        return Plan(steps=[
+            PlanStep(id=s.id, goal=pattern.sub(lambda m: replacements[m.group(1).lower()], s.goal), depends_on=s.depends_on)
+            for s in self.steps
+        ])
+
+
+class PlannerNeuron(Neuron):
+    """
+    Decompose a goal into a Plan.
+    
+    Returns a Plan of two or more steps, or None when the goal is a
+    single task (or the answer is unusable) - the caller then runs it
+    as one goal.
+    
+    Usage:
+        plan = (await planner.run(ctx)).data
+    """
+    
+    name = "planner"
+    
+    def __init__(self, config, cache: 'PlanCache' = None):
+        super().__init__(config)
+        self.cache = cache
+    
+    async def process(self, ctx: GoalContext, input_data: Any = None) -> Optional[Plan]:
+        """
+        Plan the goal.
+        
+        Args:
+            ctx: Goal context
+            input_data: Unused
+        
+        Returns:
+            Plan with several steps, or None
+        """
+        if self.cache is not None:
+            plan = await self.cache.lookup(ctx.goal_text)
+            if plan is not None:
+                ctx.add_message(self.name, "plan_cached", f"Reused plan with {len(plan.steps)} steps")
+                return plan
+        
+        try:
+            response = await self.llm.generate_json(
+                PLAN_PROMPT,
+                system=self.goal_prefix(ctx),
+                schema=PLAN_SCHEMA,
+                profile=self.config.llm_profile("plan"),
+                affinity=ctx.goal_id,
+            )
+            plan = Plan.from_dict(response)
+        except Exception as e:
+            ctx.add_message(self.name, "no_plan", f"Planning failed: {e}")
+            return None
+        
+        if len(plan.steps) < 2:
+            return None
+        
+        ctx.add_message(self.name, "planned", [s.goal for s in plan.steps])
+        return plan
+
+
+class PlanCache:
+    """
+    Plans that ran successfully, keyed by goal, shared through Redis.
+    
+    A goal with the same number of words as a cached one, differing in
+    at most max_changed_words distinct words, reuses its plan with those words
+    replaced in the step goals. It is a miss if a replaced word is not in
+    any step goal (the steps were reworded) or is also kept unchanged
+    elsewhere in the goal (it would be replaced there too).
+    
+    Redis keys:
+        plan:<hash>                 Plan JSON (TTL)
+        plan:shape:<words>          Hashes of plans whose goal has that many words
+    """
+    
+    KEY_PREFIX = "plan:"
+    REDIS_RETRY_SECONDS = 30  # Skip Redis this long after an error
+    
+    def __init__(
+        self,
+        redis_client: Optional[redis.Redis],
+        ttl_seconds: int = 30 * 24 * 3600,
+        max_changed_words: int = 2,
+    ):
+        self._redis = redis_client
+        self.ttl_seconds = ttl_seconds
+        self.max_changed_words = max_changed_words
+        self._redis_down_until = 0.0
+    
+    @staticmethod
+    def make_key(goal: str) -> str:
+        return hashlib.sha256(normalize_goal(goal).encode()).hexdigest()[:32]
+    
+    def _shape_key(self, tokens: List[str]) -> str:
+        return f"{self.KEY_PREFIX}shape:{len(tokens)}"
+    
+    async def lookup(self, goal: str) -> Optional[Plan]:
+        """Cached plan for this goal or a near-identical one."""
+        if not self._redis_available():
+            return None
+        
+        tokens = goal_tokens(goal)
+        try:
+            raw = await self._redis.get(f"{self.KEY_PREFIX}{self.make_key(goal)}")
+            if raw:
+                metrics.counter("plan_cache", outcome="hit").inc()
+                return Plan.from_dict(json.loads(raw))
+            
+            keys = list(await self._redis.smembers(self._shape_key(tokens)))
+            entries = await self._redis.mget([f"{self.KEY_PREFIX}{k}" for k in keys]) if keys else []
+        except Exception as e:
+            self._redis_failed(e)
+            return None
+        
+        for raw in entries:
+            if raw is None:
+                continue
+            entry = json.loads(raw)
+            changed = {(old, new) for old, new in zip(entry["tokens"], tokens) if old != new}
+            kept = {old for old, new in zip(entry["tokens"], tokens) if old == new}
+            replacements = dict(changed)
+            if len(replacements) != len(changed) or len(changed) > self.max_changed_words:
+                continue  # Too different, or the same word changed two ways
+            if kept & set(replacements):
+                continue  # Word changed in one place but kept in another; substitution can't tell them apart
+            plan = Plan.from_dict(entry)
+            if not plan.contains_words(replacements):
+                continue  # Steps don't use the changed words; substituting would do nothing
+            metrics.counter("plan_cache", outcome="similar").inc()
+            return plan.substitute(replacements)
+        
+        metrics.counter("plan_cache", outcome="miss").inc()
+        return None
+    
+    async def store(self, goal: str, plan: Plan) -> None:
+        """Remember a plan whose steps all succeeded."""
+        if not self._redis_available():
+            return
+        
+        tokens = goal_tokens(goal)
+        key = self.make_key(goal)
+        entry = {**plan.to_dict(), "tokens": tokens}
+        try:
+            await self._redis.set(f"{self.KEY_PREFIX}{key}", json.dumps(entry), ex=self.ttl_seconds)
+            await self._redis.sadd(self._shape_key(tokens), key)
+            await self._redis.expire(self._shape_key(tokens), self.ttl_seconds)
+        except Exception as e:
+            self._redis_failed(e)
+    
+    def _redis_available(self) -> bool:
+        return self._redis is not None and time.monotonic() >= self._redis_down_until
+    
+    def _redis_failed(self, e: Exception) -> None:
+        logger.debug(f"Plan cache Redis unavailable: {e}")
+        metrics.counter("plan_cache_errors").inc()
+        self._redis_down_until = time.monotonic() + self.REDIS_RETRY_SECONDS
@@ -0,0 +1,211 @@
+"""
+Router Neuron - Intent, tool and arguments in one LLM call.
+
+The staged tool path makes four calls before a tool runs (intent,
+capability, selection, params). The fused router sends one
+function-calling style prompt instead: the candidate tools are offered
+as argument schemas, and the answer names the intent, the tool and its
+arguments together.
+
+The answer is only trusted when it validates and the model is confident;
+otherwise the orchestrator falls back to the staged pipeline.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from ..core.base import Neuron
+from ..core.memory import GoalContext
+from ..tools import ToolDefinition, JSON_SCHEMA_TYPES
+from .intent import INTENTS
+
+
+# Routing prompt (follows the goal prefix, which lists the tools)
+ROUTE_PROMPT = """Decide how to handle the user request.
+
+Intents:
+- generative: Questions, explanations, conversation, creative writing
+- tool: Actions that need one of the available tools
+- memory_read: Asking about previously stored information
+- memory_write: Storing new information for later
+
+For "tool", name the tool and fill in its arguments from the user request:
+{parameters}
+
+Respond with JSON:
+{{"intent": "...", "tool": "tool_name or null", "arguments": {{...}}, "confidence": 0.0-1.0}}"""
+
+
+# Python types accepted for each JSON schema type
+_PYTHON_TYPES = {
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "array": (list,),
+    "object": (dict,),
+}
+
+
+def _route_schema(candidates: List[ToolDefinition]) -> Dict[str, Any]:
+    """
+    One branch per candidate tool (its own argument schema), plus one
+    for the tool-free intents, so the model can only emit a valid pairing.
+    """
+    branches = [
+        {
+            "type": "object",
+            "properties": {
+                "intent": {"const": "tool"},
+                "tool": {"const": d.name},
+                "arguments": d.to_json_schema(),
+                "confidence": {"type": "number"},
+            },
+            "required": ["intent", "tool", "arguments", "confidence"],
+            "additionalProperties": False,
+        }
+        for d in candidates
+    ]
+    branches.append({
+        "type": "object",
+        "properties": {
+            "intent": {"enum": [i for i in INTENTS if i != "tool"]},
+            "tool": {"type": "null"},
+            "arguments": {"type": "object", "additionalProperties": False},
+            "confidence": {"type": "number"},
+        },
+        "required": ["intent", "tool", "arguments", "confidence"],
+        "additionalProperties": False,
+    })
+    return {"anyOf": branches}
+
+
+def validate_arguments(definition: ToolDefinition, arguments: Any) -> Optional[str]:
+    """Why the arguments do not fit the tool's parameters (None if they do)."""
+    if not isinstance(arguments, dict):
+        return "arguments is not an object"
+    
+    params = {p["name"]: p for p in definition.parameters}
+    
+    unknown = set(arguments) - set(params)
+    if unknown:
+        return f"unknown arguments: {sorted(unknown)}"
+    
+    missing = [name for name in definition.required_params if name in params and name not in arguments]
+    if missing:
+        return f"missing arguments: {missing}"
+    
+    for name, value in arguments.items():
+        json_type = JSON_SCHEMA_TYPES.get(str(params[name].get("type", "")).lower())
+        expected = _PYTHON_TYPES.get(json_type)
+        if expected is None:
+            continue
+        if isinstance(value, bool) and json_type != "boolean":
+            return f"{name}: expected {json_type}, got boolean"
+        if not isinstance(value, expected):
+            return f"{name}: expected {json_type}, got {type(value).__name__}"
+    
+    return None
+
+
+@dataclass
+class Route:
+    """A routing decision (fused router, fast path or pathway cache)."""
+    intent: str
+    tool_name: Optional[str] = None
+    parameters: Dict[str, Any] = field(default_factory=dict)
+    confidence: float = 0.0
+    explicit: bool = False  # Named by the user (fast path), not inferred
+    pathway: Optional[str] = None  # Key of the learned pathway it replays (pathways.py)
+    
+    def tool_spec(self) -> Dict[str, Any]:
+        """Input for ToolNeuron.run() that skips its selection stages."""
+        return {"tool": self.tool_name, "parameters": self.parameters}
+
+
+class RouterNeuron(Neuron):
+    """
+    Route a goal in a single structured LLM call.
+    
+    Returns a Route, or None when the answer is invalid or below
+    min_confidence - the caller then runs the staged pipeline.
+    
+    Usage:
+        route = (await router.run(ctx, tool_neuron.candidates(goal))).data
+        if route is None:
+            ...  # staged pipeline
+    """
+    
+    name = "router"
+    
+    def __init__(self, config, min_confidence: float = None):
+        super().__init__(config)
+        if min_confidence is None:
+            min_confidence = config.fused_routing_min_confidence
+        self.min_confidence = min_confidence
+    
+    async def process(self, ctx: GoalContext, input_data: Any = None) -> Optional[Route]:
+        """
+        Route the goal.
+        
+        Args:
+            ctx: Goal context
+            input_data: Candidate ToolDefinitions
+        
+        Returns:
+            Route, or None to fall back to the staged pipeline
+        """
+        candidates: List[ToolDefinition] = list(input_data or [])
+        
+        parameters = "\n".join(
+            f"- {d.name}.{p['name']}: {p.get('description', p.get('type', 'any'))}"
+            for d in candidates
+            for p in d.parameters
+        ) or "(no tool takes arguments)"
+        
+        try:
+            response = await self.llm.generate_json(
+                ROUTE_PROMPT.format(parameters=parameters),
+                system=self.goal_prefix(ctx),
+                schema=_route_schema(candidates),
+                profile=self.config.llm_profile("route"),
+                affinity=ctx.goal_id,
+            )
+        except Exception as e:
+            ctx.add_message(self.name, "fallback", f"Routing call failed: {e}")
+            return None
+        
+        route, problem = self._validate(response, candidates)
+        if problem:
+            ctx.add_message(self.name, "fallback", problem)
+            return None
+        
+        return route
+    
+    def _validate(self, response: Dict[str, Any], candidates: List[ToolDefinition]):
+        """(Route, None) for a usable answer, else (None, reason)."""
+        intent = response.get("intent")
+        if intent not in INTENTS:
+            return None, f"Unknown intent: {intent!r}"
+        
+        try:
+            confidence = float(response.get("confidence", 0.0))
+        except (TypeError, ValueError):
+            return None, "Confidence is not a number"
+        if confidence < self.min_confidence:
+            return None, f"Low confidence ({confidence:.2f} < {self.min_confidence:.2f})"
+        
+        if intent != "tool":
+            return Route(intent=intent, confidence=confidence), None
+        
+        by_name = {d.name: d for d in candidates}
+        tool_name = response.get("tool")
+        if tool_name not in by_name:
+            return None, f"Tool is not a candidate: {tool_name!r}"
+        
+        arguments = response.get("arguments") or {}
+        problem = validate_arguments(by_name[tool_name], arguments)
+        if problem:
+            return None, f"Invalid arguments for {tool_name}: {problem}"
+        
+        return Route(intent=intent, tool_name=tool_name, parameters=arguments, confidence=confidence), None
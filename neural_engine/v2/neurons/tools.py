@@ -9,25 +9,30 @@ Flow:
 5. Execute tool with error recovery
 6. Return result or trigger recovery action
 
+A tool spec routed upstream (see router.py) skips steps 1-4. Retries
+reuse the candidates and tool chosen before (GoalContext.stages) and
+only repeat step 4 with the error context.
+
 Uses ToolRegistry for discovery and RecoveryEngine for error handling.
 """
 
 import json
+import asyncio
 from typing import Any, Dict, List, Optional
 
 from ..core.base import Neuron
 from ..core.memory import GoalContext
+from ..core.metrics import metrics
 from ..core.recovery import RecoveryEngine, RecoveryAction, FailureType
+from ..core.prompts import build_goal_prefix
 from ..tools import ToolRegistry, ToolDefinition, create_builtin_tools
 
 
-# Tool capability check prompt - can any of these tools handle the request?
-TOOL_CAPABILITY_PROMPT = """Can any of these tools handle this request?
-
-Available tools:
-{tools}
+# Stage prompts follow the goal prefix (tool catalog + user request), see
+# core/prompts.py - they must not repeat it, or the KV cache is lost.
 
-User request: {goal}
+# Tool capability check prompt - can any of these tools handle the request?
+TOOL_CAPABILITY_PROMPT = """Can any of the available tools handle the user request?
 
 Think carefully:
 1. Does the request require a specific capability (API call, data lookup, calculation)?
@@ -35,19 +40,14 @@ Think carefully:
 3. Would using a tool be better than just answering the question directly?
 
 Respond with JSON:
-{{"can_handle": true/false, "reason": "brief explanation", "best_tool": "tool_name or null"}}"""
+{"can_handle": true/false, "reason": "brief explanation", "best_tool": "tool_name or null"}"""
 
 
 # Tool selection prompt
-TOOL_SELECTION_PROMPT = """Select the best tool for this task.
-
-Available tools:
-{tools}
-
-Task: {goal}
+TOOL_SELECTION_PROMPT = """Select the best available tool for the user request.
 
 Respond with JSON:
-{{"tool": "tool_name", "reason": "why this tool"}}"""
+{"tool": "tool_name", "reason": "why this tool"}"""
 
 
 # Parameter extraction prompt - with error context if retrying
@@ -57,8 +57,6 @@ Tool: {tool_name}
 Description: {description}
 Parameters:
 {parameters}
-
-User Request: {goal}
 {error_context}
 Respond with JSON containing the parameter values. Example:
 {{"param1": "value1", "param2": "value2"}}
@@ -66,6 +64,34 @@ Respond with JSON containing the parameter values. Example:
 Extract the values from the user request:"""
 
 
+# JSON schemas for constrained decoding. Tool names are restricted to the
+# candidates shown in the prompt, so the model cannot invent one.
+
+def _capability_schema(tool_names: List[str]) -> Dict[str, Any]:
+    return {
+        "type": "object",
+        "properties": {
+            "can_handle": {"type": "boolean"},
+            "reason": {"type": "string"},
+            "best_tool": {"enum": tool_names + [None]},
+        },
+        "required": ["can_handle", "reason", "best_tool"],
+        "additionalProperties": False,
+    }
+
+
+def _selection_schema(tool_names: List[str]) -> Dict[str, Any]:
+    return {
+        "type": "object",
+        "properties": {
+            "tool": {"enum": tool_names},
+            "reason": {"type": "string"},
+        },
+        "required": ["tool", "reason"],
+        "additionalProperties": False,
+    }
+
+
 class ToolNeuron(Neuron):
     """
     Execute tools to perform actions.
@@ -118,39 +144,57 @@ class ToolNeuron(Neuron):
         
         Args:
             ctx: Goal context
-            input_data: Goal text or tool spec
+            input_data: Goal text, or a tool spec {"tool": name,
+                "parameters": {...}} already routed (skips steps 1-4)
         
         Returns:
             Tool execution result as string, or recovery action indicator
         """
+        if isinstance(input_data, dict) and input_data.get("tool"):
+            return await self._run_spec(ctx, input_data)
+        
         goal = input_data if isinstance(input_data, str) else ctx.goal_text
         
-        # Step 1: Search for candidate tools
-        candidates = self.registry.search(goal, limit=5)
+        # Stage results of earlier attempts at this goal (retry, refine):
+        # only parameter extraction is redone
+        memo = ctx.stages if goal == ctx.goal_text else {}
         
-        if not candidates:
-            # Fall back to all tools if no matches
-            candidates = list(self.registry.get_all_definitions().values())[:5]
+        # Step 1: Search for candidate tools
+        candidates = memo.get("candidates") or self.candidates(goal)
         
         if not candidates:
             # No tools at all - signal for fallback
             ctx.recovery_action = "fallback_generative"
             ctx.recovery_reason = "No tools available in registry"
             return "NO_TOOLS_AVAILABLE"
+        memo["candidates"] = candidates
         
-        # Step 2: Check if any tool can actually handle this request
-        capability_check = await self._check_capability(goal, candidates)
-        
-        if not capability_check["can_handle"]:
-            # No tool can handle this - signal for fallback
-            ctx.recovery_action = "fallback_generative"
-            ctx.recovery_reason = capability_check["reason"]
-            return f"NO_MATCHING_TOOL:{capability_check['reason']}"
+        # Shared prompt prefix for every LLM call below (KV cache reuse)
+        prefix = self._goal_prefix(ctx, goal, candidates)
+        llm_options = {"system": prefix, "affinity": ctx.goal_id}
         
-        # Step 3: Select best tool (use capability check result if available)
-        tool_name = capability_check.get("best_tool")
-        if not tool_name:
-            tool_name = await self._select_tool(goal, candidates)
+        tool_name = memo.get("tool")
+        if tool_name:
+            metrics.counter("tool_stages_reused").inc()
+        else:
+            # Step 2: Check if any tool can actually handle this request
+            # (already done if the orchestrator speculated on it)
+            capability_check = memo.get("capability")
+            if capability_check is None:
+                capability_check = await self._check_capability(goal, candidates, **llm_options)
+                memo["capability"] = capability_check
+            
+            if not capability_check["can_handle"]:
+                # No tool can handle this - signal for fallback
+                ctx.recovery_action = "fallback_generative"
+                ctx.recovery_reason = capability_check["reason"]
+                return f"NO_MATCHING_TOOL:{capability_check['reason']}"
+            
+            # Step 3: Select best tool (use capability check result if available)
+            tool_name = capability_check.get("best_tool")
+            if not tool_name:
+                tool_name = await self._select_tool(goal, candidates, **llm_options)
+            memo["tool"] = tool_name
         
         ctx.tool_name = tool_name
         
@@ -168,12 +212,41 @@ class ToolNeuron(Neuron):
         if hasattr(ctx, 'retry_error'):
             error_context = f"\nPrevious attempt failed: {ctx.retry_error}\nPlease fix the parameters.\n"
         
-        params = await self._extract_params(goal, definition, error_context)
+        params = await self._extract_params(goal, definition, error_context, **llm_options)
         ctx.parameters = params
         
         # Step 5: Execute tool with error handling
+        return await self._execute(ctx, goal, tool_name, tool, params)
+    
+    async def _run_spec(self, ctx: GoalContext, spec: Dict[str, Any]) -> str:
+        """Execute a tool chosen upstream (fused router) with its parameters."""
+        tool_name = spec["tool"]
+        ctx.tool_name = tool_name
+        
+        tool = self.registry.get(tool_name)
+        if not tool:
+            ctx.recovery_action = "forge_tool"
+            ctx.recovery_reason = f"Suggested tool '{tool_name}' not found"
+            return f"TOOL_NOT_FOUND:{tool_name}"
+        
+        params = dict(spec.get("parameters") or {})
+        ctx.parameters = params
+        ctx.stages["tool"] = tool_name  # A retry only re-extracts the parameters
+        
+        return await self._execute(ctx, ctx.goal_text, tool_name, tool, params)
+    
+    async def _execute(self, ctx: GoalContext, goal: str, tool_name: str, tool, params: Dict[str, Any]) -> str:
+        """
+        Run the tool and turn failures into recovery signals.
+        
+        Tools are blocking, so they run in a worker thread: the goal stays
+        cancellable, and the tool can poll current_cancel_token() to stop early.
+        """
+        if ctx.on_tool:
+            ctx.on_tool(tool_name)
+        
         try:
-            result = tool.execute(**params)
+            result = await asyncio.to_thread(tool.execute, **params)
             
             # Check for tool-level errors
             if isinstance(result, dict) and "error" in result:
@@ -194,6 +267,7 @@ class ToolNeuron(Neuron):
                 return f"TOOL_ERROR:{error_msg}"
             
             # Success - record for learning
+            ctx.tool_result = result
             result_str = self._format_result(result)
             self.recovery.record_success(
                 goal=goal,
@@ -220,6 +294,54 @@ class ToolNeuron(Neuron):
             
             return f"TOOL_EXCEPTION:{str(e)}"
     
+    async def check_capability(self, ctx: GoalContext, affinity: str = None) -> Optional[Dict[str, Any]]:
+        """
+        Run the capability check (step 2) for the goal ahead of process().
+        
+        The answer is kept in ctx.stages and process() reuses it. Used by
+        speculative routing, alongside intent classification; `affinity`
+        lets it run on another slot than the goal's other calls.
+        """
+        candidates = self.candidates(ctx.goal_text)
+        if not candidates:
+            return None
+        
+        check = await self._check_capability(
+            ctx.goal_text,
+            candidates,
+            system=self._goal_prefix(ctx, ctx.goal_text, candidates),
+            affinity=affinity or ctx.goal_id,
+        )
+        ctx.stages["capability"] = check
+        return check
+    
+    def candidates(self, goal: str) -> List[ToolDefinition]:
+        """Candidate tools for a goal (search, else the first registered)."""
+        candidates = self.registry.search(goal, limit=5)
+        
+        if not candidates:
+            # Fall back to all tools if no matches
+            candidates = list(self.registry.get_all_definitions().values())[:5]
+        
+        return candidates
+    
+    def _goal_prefix(self, ctx: GoalContext, goal: str, candidates: List[ToolDefinition]) -> str:
+        """Goal prefix with the candidate catalog, kept on ctx for later stages."""
+        tools_text = "\n".join([d.to_prompt_text() for d in candidates])
+        prefix = build_goal_prefix(goal, tools_text)
+        if goal == ctx.goal_text:
+            ctx.prompt_prefix = prefix
+        return prefix
+    
+    def prepare_prefix(self, ctx: GoalContext) -> str:
+        """
+        Set the goal's shared prompt prefix before any stage runs.
+        
+        The orchestrator calls this first so intent classification already
+        sends the prefix the tool stages will reuse.
+        """
+        return self._goal_prefix(ctx, ctx.goal_text, self.candidates(ctx.goal_text))
+    
     def _format_result(self, result: Any) -> str:
         """Format tool result as string."""
         if isinstance(result, dict):
@@ -229,14 +351,26 @@ class ToolNeuron(Neuron):
                 return json.dumps(result, indent=2)
         return str(result)
     
-    async def _check_capability(self, goal: str, candidates: List[ToolDefinition]) -> Dict[str, Any]:
+    async def _check_capability(
+        self,
+        goal: str,
+        candidates: List[ToolDefinition],
+        system: str = None,
+        affinity: str = None,
+    ) -> Dict[str, Any]:
         """Check if any tool can handle this request."""
-        tools_text = "\n".join([d.to_prompt_text() for d in candidates])
-        
-        prompt = TOOL_CAPABILITY_PROMPT.format(tools=tools_text, goal=goal)
+        if system is None:
+            system = build_goal_prefix(goal, "\n".join([d.to_prompt_text() for d in candidates]))
+        schema = _capability_schema([d.name for d in candidates])
         
         try:
-            response = await self.llm.generate_json(prompt)
+            response = await self.llm.generate_json(
+                TOOL_CAPABILITY_PROMPT,
+                system=system,
+                schema=schema,
+                profile=self.config.llm_profile("capability"),
+                affinity=affinity,
+            )
             can_handle = response.get("can_handle", False)
             reason = response.get("reason", "Unknown")
             best_tool = response.get("best_tool")
@@ -257,19 +391,30 @@ class ToolNeuron(Neuron):
             # On error, assume we can try (let execution fail instead)
             return {"can_handle": True, "reason": f"Capability check failed: {e}", "best_tool": None}
     
-    async def _select_tool(self, goal: str, candidates: List[ToolDefinition]) -> str:
+    async def _select_tool(
+        self,
+        goal: str,
+        candidates: List[ToolDefinition],
+        system: str = None,
+        affinity: str = None,
+    ) -> str:
         """Select the best tool from candidates."""
         # If only one candidate, use it
         if len(candidates) == 1:
             return candidates[0].name
         
-        # Format tools for prompt
-        tools_text = "\n".join([d.to_prompt_text() for d in candidates])
-        
-        prompt = TOOL_SELECTION_PROMPT.format(tools=tools_text, goal=goal)
+        if system is None:
+            system = build_goal_prefix(goal, "\n".join([d.to_prompt_text() for d in candidates]))
+        schema = _selection_schema([d.name for d in candidates])
         
         try:
-            response = await self.llm.generate_json(prompt)
+            response = await self.llm.generate_json(
+                TOOL_SELECTION_PROMPT,
+                system=system,
+                schema=schema,
+                profile=self.config.llm_profile("selection"),
+                affinity=affinity,
+            )
             selected = response.get("tool", candidates[0].name)
             
             # Validate selection is in candidates
@@ -283,7 +428,14 @@ class ToolNeuron(Neuron):
         except Exception:
             return candidates[0].name
     
-    async def _extract_params(self, goal: str, definition: ToolDefinition, error_context: str = "") -> Dict[str, Any]:
+    async def _extract_params(
+        self,
+        goal: str,
+        definition: ToolDefinition,
+        error_context: str = "",
+        system: str = None,
+        affinity: str = None,
+    ) -> Dict[str, Any]:
         """Extract parameters for tool call using LLM."""
         # If no parameters needed, return empty
         if not definition.parameters:
@@ -299,11 +451,16 @@ class ToolNeuron(Neuron):
             tool_name=definition.name,
             description=definition.description,
             parameters=params_text,
-            goal=goal,
             error_context=error_context,
         )
         
         try:
-            return await self.llm.generate_json(prompt)
+            return await self.llm.generate_json(
+                prompt,
+                system=system or build_goal_prefix(goal),
+                schema=definition.to_json_schema(),
+                profile=self.config.llm_profile("params"),
+                affinity=affinity,
+            )
         except Exception:
             return {}
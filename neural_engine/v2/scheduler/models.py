@@ -117,6 +117,18 @@ class ScheduledGoal:
     id: str
     goal: str  # The goal text to execute
     
+    # Explicit invocation: run this tool with these params (no LLM routing)
+    tool: Optional[str] = None
+    params: dict = field(default_factory=dict)
+    
+    # How a tool result is returned (raw, structured, rendered, llm).
+    # None = "rendered": nobody reads scheduled prose, so skip the LLM.
+    output_mode: Optional[str] = None
+    
+    # Seconds a run may take (None = no limit). Near the end, optional
+    # stages (LLM interpretation, retries, forging) are skipped.
+    timeout: Optional[float] = None
+    
     # Scheduling
     schedule_type: ScheduleType = ScheduleType.ON_DEMAND
     schedule_value: Optional[str] = None  # Cron expr or interval seconds
@@ -142,6 +154,10 @@ class ScheduledGoal:
         return {
             "id": self.id,
             "goal": self.goal,
+            "tool": self.tool,
+            "params": self.params,
+            "output_mode": self.output_mode,
+            "timeout": self.timeout,
             "schedule_type": self.schedule_type.value,
             "schedule_value": self.schedule_value,
             "enabled": self.enabled,
@@ -158,6 +174,10 @@ class ScheduledGoal:
         return cls(
             id=d["id"],
             goal=d["goal"],
+            tool=d.get("tool"),
+            params=d.get("params") or {},
+            output_mode=d.get("output_mode"),
+            timeout=d.get("timeout"),
             schedule_type=ScheduleType(d.get("schedule_type", "on_demand")),
             schedule_value=d.get("schedule_value"),
             conditions=conditions or [],
@@ -9,18 +9,39 @@ Features:
 - Circuit breaker for failing goals
 """
 
+import time
 import asyncio
+import inspect
 import uuid
 from datetime import datetime, timedelta
 from typing import Callable, Optional
 import logging
 
+from ..core.admission import llm_priority
+from ..core.output import output_mode
 from .models import ScheduledGoal, GoalState, ScheduledRun, ScheduleType
 from .store import GoalStore, InMemoryGoalStore
 
 logger = logging.getLogger(__name__)
 
 
+def executor_options(executor: Callable, options: dict) -> dict:
+    """
+    Keep the keyword options the executor accepts.
+    
+    Executors written for executor(goal_text) still work: goals naming a
+    tool or a timeout run them with the goal text alone.
+    """
+    try:
+        parameters = inspect.signature(executor).parameters.values()
+    except (TypeError, ValueError):
+        return {}
+    if any(p.kind == p.VAR_KEYWORD for p in parameters):
+        return options
+    names = {p.name for p in parameters}
+    return {k: v for k, v in options.items() if k in names}
+
+
 def parse_cron(expr: str) -> dict:
     """
     Parse simple cron expression.
@@ -100,7 +121,13 @@ class Scheduler:
         self._last_check: dict[str, datetime] = {}  # goal_id -> last check time
     
     def set_executor(self, executor: Callable[[str], dict]):
-        """Set the goal executor (usually orchestrator.process)."""
+        """
+        Set the goal executor (usually orchestrator.process).
+        
+        Goals naming a tool call it with tool= and params= keywords,
+        goals with a timeout with deadline= (time.monotonic()) - each
+        only when set and when the executor accepts it.
+        """
         self._executor = executor
     
     async def add_goal(self, goal: ScheduledGoal) -> None:
@@ -220,12 +247,22 @@ class Scheduler:
             raise RuntimeError("No executor set. Call set_executor() first.")
         
         try:
-            # Run the goal
-            result = self._executor(goal_text)
-            
-            # Handle async executor
-            if asyncio.iscoroutine(result):
-                result = await result
+            # Run the goal - its LLM calls queue behind interactive requests,
+            # and tool results are rendered without the LLM unless asked for
+            with llm_priority("scheduled"), output_mode(goal.output_mode or "rendered"):
+                options = {}
+                if goal.tool:
+                    options.update(tool=goal.tool, params=goal.params)
+                if goal.timeout:
+                    options["deadline"] = time.monotonic() + goal.timeout
+                accepted = executor_options(self._executor, options)
+                if accepted.keys() != options.keys():
+                    logger.debug(f"Executor ignores {sorted(options.keys() - accepted.keys())} of {goal.id}")
+                result = self._executor(goal_text, **accepted)
+                
+                # Handle async executor
+                if asyncio.iscoroutine(result):
+                    result = await result
             
             run.success = result.get("success", True) if isinstance(result, dict) else True
             run.result = result if isinstance(result, dict) else {"response": str(result)}
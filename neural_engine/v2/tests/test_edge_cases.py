@@ -25,8 +25,8 @@ class TestLLMEdgeCases:
         config = Config.for_testing()
         llm = LLMClient.from_config(config)
         
-        # Mock the sync method to raise timeout
-        with patch.object(llm, '_generate_sync') as mock_gen:
+        # Mock the HTTP call to raise timeout
+        with patch.object(llm, '_post_completion') as mock_gen:
             mock_gen.side_effect = TimeoutError("Request timed out")
             
             with pytest.raises(TimeoutError):
@@ -41,7 +41,7 @@ class TestLLMEdgeCases:
         config = Config.for_testing()
         llm = LLMClient.from_config(config)
         
-        with patch.object(llm, '_generate_sync') as mock_gen:
+        with patch.object(llm, '_post_completion') as mock_gen:
             mock_gen.side_effect = Exception("Connection refused")
             
             with pytest.raises(Exception) as exc_info:
@@ -56,7 +56,7 @@ class TestLLMEdgeCases:
         config = Config.for_testing()
         llm = LLMClient.from_config(config)
         
-        with patch.object(llm, '_generate_sync') as mock_gen:
+        with patch.object(llm, '_post_completion') as mock_gen:
             mock_gen.return_value = "This is not JSON at all"
             
             result = await llm.generate_json("test")
@@ -72,7 +72,7 @@ class TestLLMEdgeCases:
         config = Config.for_testing()
         llm = LLMClient.from_config(config)
         
-        with patch.object(llm, '_generate_sync') as mock_gen:
+        with patch.object(llm, '_post_completion') as mock_gen:
             mock_gen.return_value = '```json\n{"key": "value"}\n```'
             
             result = await llm.generate_json("test")
@@ -87,7 +87,7 @@ class TestLLMEdgeCases:
         config = Config.for_testing()
         llm = LLMClient.from_config(config)
         
-        with patch.object(llm, '_generate_sync') as mock_gen:
+        with patch.object(llm, '_post_completion') as mock_gen:
             mock_gen.return_value = '```\n{"answer": 42}\n```'
             
             result = await llm.generate_json("test")
@@ -190,7 +190,7 @@ class TestNeuronEdgeCases:
         ctx = GoalContext(goal_id="test", goal_text="test")
         
         # Mock LLM to fail
-        with patch.object(neuron.llm, '_generate_sync') as mock_gen:
+        with patch.object(neuron.llm, '_post_completion') as mock_gen:
             mock_gen.side_effect = Exception("LLM failed")
             
             result = await neuron.run(ctx)
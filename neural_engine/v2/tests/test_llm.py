@@ -0,0 +1,1103 @@
+"""
+LLM Client Tests - Run the async client against local stub llama.cpp servers.
+
+No real model needed: each test starts an aiohttp stub that speaks the
+OpenAI-compatible /v1/chat/completions API.
+"""
+
+import json
+import pytest
+import asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+
+def _completion(content: str) -> dict:
+    """Minimal llama.cpp chat completion response body."""
+    return {"choices": [{"message": {"role": "assistant", "content": content}}]}
+
+
+class StubLLMServer:
+    """Stub llama.cpp server that records requests, connections and concurrency."""
+    
+    def __init__(self, delay: float = 0.0, content: str = "stub reply"):
+        self.delay = delay
+        self.content = content
+        self.requests = []
+        self.peers = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.server = None
+        
+        self.status = 200          # Completion status (500 = failing backend)
+        self.health_status = 200   # /health status (503 = loading model)
+        self.slots = [{"id": 0, "is_processing": False}]
+        self.timings = None        # llama.cpp `timings` block to return
+        self.aborted = 0           # Requests whose client hung up mid-generation
+    
+    async def handle_completion(self, request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        self.requests.append(body)
+        self.peers.add(request.transport.get_extra_info("peername"))
+        
+        if self.status != 200:
+            return web.json_response({"error": "backend failure"}, status=self.status)
+        
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.aborted += 1  # Client hung up: llama.cpp would stop decoding here
+            raise
+        finally:
+            self.in_flight -= 1
+        
+        if body.get("stream"):
+            return await self._stream(request)
+        
+        response = _completion(self.content)
+        if self.timings:
+            response["timings"] = self.timings
+        return web.json_response(response)
+    
+    async def handle_health(self, request: web.Request) -> web.Response:
+        return web.json_response({"status": "ok"}, status=self.health_status)
+    
+    async def handle_slots(self, request: web.Request) -> web.Response:
+        return web.json_response(self.slots)
+    
+    async def _stream(self, request: web.Request) -> web.StreamResponse:
+        """Send the content word by word as llama.cpp SSE chunks."""
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        for word in self.content.split(" "):
+            chunk = {"choices": [{"delta": {"content": word + " "}}]}
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        if self.timings:
+            final = {"choices": [{"delta": {}, "finish_reason": "stop"}], "timings": self.timings}
+            await response.write(f"data: {json.dumps(final)}\n\n".encode())
+        await response.write(b"data: [DONE]\n\n")
+        return response
+    
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", self.handle_completion)
+        app.router.add_get("/health", self.handle_health)
+        app.router.add_get("/slots", self.handle_slots)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        return str(self.server.make_url("/v1"))
+    
+    async def stop(self):
+        await self.server.close()
+
+
+@pytest.fixture
+async def stub_server():
+    from neural_engine.v2.core import LLMClient
+    
+    stub = StubLLMServer()
+    stub.base_url = await stub.start()
+    yield stub
+    await LLMClient.close_all()
+    await stub.stop()
+
+
+class TestLLMClient:
+    """Test the aiohttp-based LLMClient."""
+    
+    @pytest.mark.asyncio
+    async def test_generate_returns_content(self, stub_server):
+        """generate() returns the stripped message content."""
+        from neural_engine.v2.core import LLMClient
+        
+        stub_server.content = "  hello  "
+        llm = LLMClient(base_url=stub_server.base_url)
+        
+        assert await llm.generate("Say hello", system="Be brief") == "hello"
+        
+        sent = stub_server.requests[0]
+        assert sent["messages"][0] == {"role": "system", "content": "Be brief"}
+        assert sent["messages"][1] == {"role": "user", "content": "Say hello"}
+    
+    @pytest.mark.asyncio
+    async def test_connections_are_reused(self, stub_server):
+        """Sequential calls reuse one keep-alive connection."""
+        from neural_engine.v2.core import LLMClient
+        
+        llm = LLMClient(base_url=stub_server.base_url)
+        for _ in range(5):
+            await llm.generate("ping")
+        
+        assert len(stub_server.requests) == 5
+        assert len(stub_server.peers) == 1
+    
+    @pytest.mark.asyncio
+    async def test_concurrency_not_capped_by_thread_pool(self, stub_server):
+        """More than 4 calls can be in flight at once."""
+        from neural_engine.v2.core import LLMClient
+        
+        stub_server.delay = 0.2
+        llm = LLMClient(base_url=stub_server.base_url, max_connections=8)
+        
+        await asyncio.gather(*[llm.generate(f"q{i}") for i in range(8)])
+        
+        assert stub_server.max_in_flight == 8
+    
+    @pytest.mark.asyncio
+    async def test_pool_limit_bounds_concurrency(self, stub_server):
+        """max_connections caps in-flight requests."""
+        from neural_engine.v2.core import LLMClient
+        
+        stub_server.delay = 0.1
+        llm = LLMClient(base_url=stub_server.base_url, max_connections=2)
+        
+        await asyncio.gather(*[llm.generate(f"q{i}") for i in range(6)])
+        
+        assert stub_server.max_in_flight == 2
+    
+    @pytest.mark.asyncio
+    async def test_per_call_timeout(self, stub_server):
+        """A per-call timeout overrides the client default."""
+        from neural_engine.v2.core import LLMClient
+        
+        stub_server.delay = 1.0
+        llm = LLMClient(base_url=stub_server.base_url, timeout=30)
+        
+        with pytest.raises(asyncio.TimeoutError):
+            await llm.generate("slow", timeout=0.1)
+    
+    @pytest.mark.asyncio
+    async def test_clients_share_pool(self, stub_server):
+        """Separate clients with the same limits share connections."""
+        from neural_engine.v2.core import LLMClient
+        
+        a = LLMClient(base_url=stub_server.base_url)
+        b = LLMClient(base_url=stub_server.base_url)
+        
+        assert await a._get_session() is await b._get_session()
+
+
+class TestStreaming:
+    """Test token streaming over llama.cpp SSE."""
+    
+    @pytest.mark.asyncio
+    async def test_stream_yields_tokens(self, stub_server):
+        """stream() yields tokens in order and requests stream=true."""
+        from neural_engine.v2.core import LLMClient
+        
+        stub_server.content = "one two three"
+        llm = LLMClient(base_url=stub_server.base_url)
+        
+        tokens = [t async for t in llm.stream("Count")]
+        
+        assert tokens == ["one ", "two ", "three "]
+        assert stub_server.requests[0]["stream"] is True
+    
+    @pytest.mark.asyncio
+    async def test_generative_neuron_streams_to_context(self, stub_server):
+        """GenerativeNeuron forwards tokens to ctx.on_token."""
+        from neural_engine.v2.core import Config, GoalContext
+        from neural_engine.v2.neurons import GenerativeNeuron
+        
+        stub_server.content = "Python is a language"
+        config = Config.for_testing()
+        config.llm_base_url = stub_server.base_url
+        neuron = GenerativeNeuron(config)
+        
+        received = []
+        ctx = GoalContext(goal_id="stream", goal_text="Explain Python", on_token=received.append)
+        
+        result = await neuron.process(ctx)
+        
+        assert len(received) == 4
+        assert result == "Python is a language"
+    
+    @pytest.mark.asyncio
+    async def test_orchestrator_stream_ends_with_result(self):
+        """Orchestrator.stream() yields tokens then the final result."""
+        from neural_engine.v2.core import Config, Orchestrator
+        
+        orchestrator = await Orchestrator.from_config(Config.for_testing())
+        
+        async def fake_process(goal, on_token=None, **kwargs):
+            for token in ["Hel", "lo"]:
+                on_token(token)
+            return {"success": True, "goal_id": "g1", "result": "Hello"}
+        
+        orchestrator.process = fake_process
+        events = [e async for e in orchestrator.stream("Hi")]
+        
+        assert [e["text"] for e in events[:-1]] == ["Hel", "lo"]
+        assert events[-1]["type"] == "result"
+        assert events[-1]["result"] == "Hello"
+
+
+@pytest.fixture
+async def stub_pair():
+    from neural_engine.v2.core import LLMClient
+    
+    stubs = [StubLLMServer(), StubLLMServer()]
+    for stub in stubs:
+        stub.base_url = await stub.start()
+    yield stubs
+    await LLMClient.close_all()
+    for stub in stubs:
+        await stub.stop()
+
+
+class TestBackendPool:
+    """Test routing over several llama.cpp endpoints."""
+    
+    @pytest.mark.asyncio
+    async def test_comma_separated_base_url(self):
+        """LLM_BASE_URL may list several endpoints."""
+        from neural_engine.v2.core import LLMClient
+        
+        llm = LLMClient(base_url="http://a:8080/v1, http://b:8080/v1/")
+        
+        assert [b.base_url for b in llm.pool.backends] == ["http://a:8080/v1", "http://b:8080/v1"]
+        assert llm.pool.backends[0].root_url == "http://a:8080"
+    
+    @pytest.mark.asyncio
+    async def test_least_outstanding_routing(self, stub_pair):
+        """Concurrent requests are spread evenly over endpoints."""
+        from neural_engine.v2.core import LLMClient
+        
+        for stub in stub_pair:
+            stub.delay = 0.1
+        llm = LLMClient(base_urls=[s.base_url for s in stub_pair])
+        
+        await asyncio.gather(*[llm.generate(f"q{i}") for i in range(6)])
+        
+        assert [len(s.requests) for s in stub_pair] == [3, 3]
+        assert all(b.outstanding == 0 for b in llm.pool.backends)
+    
+    @pytest.mark.asyncio
+    async def test_failed_request_retried_on_other_endpoint(self, stub_pair):
+        """A 5xx is retried elsewhere; repeated failures eject the endpoint."""
+        from neural_engine.v2.core import LLMClient
+        
+        bad, good = stub_pair
+        bad.status = 500
+        llm = LLMClient(base_urls=[bad.base_url, good.base_url], failure_threshold=2)
+        
+        for _ in range(4):
+            assert await llm.generate("hi") == "stub reply"
+        
+        # Ejected after two failures, never tried again
+        assert len(bad.requests) == 2
+        assert len(good.requests) == 4
+        assert llm.pool.backends[0].state == "open"
+    
+    @pytest.mark.asyncio
+    async def test_client_errors_do_not_eject(self, stub_pair):
+        """A 4xx is the request's fault, not the endpoint's."""
+        import aiohttp
+        from neural_engine.v2.core import LLMClient
+        
+        stub_pair[0].status = 400
+        llm = LLMClient(base_urls=[stub_pair[0].base_url], failure_threshold=1)
+        
+        with pytest.raises(aiohttp.ClientResponseError):
+            await llm.generate("bad")
+        
+        assert llm.pool.backends[0].state == "closed"
+    
+    @pytest.mark.asyncio
+    async def test_half_open_trial_restores_endpoint(self, stub_pair):
+        """After the cool-down one trial request decides recovery."""
+        from neural_engine.v2.core import LLMClient, NoBackendAvailable
+        
+        stub = stub_pair[0]
+        stub.status = 500
+        llm = LLMClient(base_urls=[stub.base_url], failure_threshold=1, reset_timeout=60)
+        
+        with pytest.raises(Exception):
+            await llm.generate("hi")
+        with pytest.raises(NoBackendAvailable):
+            await llm.generate("hi")
+        
+        stub.status = 200
+        llm.pool.reset_timeout = 0
+        assert await llm.generate("hi") == "stub reply"
+        assert llm.pool.backends[0].state == "closed"
+    
+    @pytest.mark.asyncio
+    async def test_health_check_routes_around_loading_server(self, stub_pair):
+        """An endpoint answering 503 on /health gets no traffic."""
+        from neural_engine.v2.core import LLMClient
+        
+        loading, ready = stub_pair
+        loading.health_status = 503
+        llm = LLMClient(base_urls=[loading.base_url, ready.base_url])
+        
+        await llm.pool.check(await llm._get_session())
+        for _ in range(3):
+            await llm.generate("hi")
+        
+        assert llm.pool.backends[0].healthy is False
+        assert len(loading.requests) == 0
+        assert len(ready.requests) == 3
+    
+    @pytest.mark.asyncio
+    async def test_idle_slots_break_ties(self, stub_pair):
+        """With equal load, the endpoint with more idle slots wins."""
+        from neural_engine.v2.core import LLMClient
+        
+        busy, idle = stub_pair
+        busy.slots = [{"id": 0, "is_processing": True}, {"id": 1, "state": 1}]
+        idle.slots = [{"id": 0, "is_processing": False}, {"id": 1, "state": 0}]
+        llm = LLMClient(base_urls=[busy.base_url, idle.base_url])
+        
+        await llm.pool.check(await llm._get_session())
+        await llm.generate("hi")
+        
+        assert [b.slots_idle for b in llm.pool.backends] == [0, 2]
+        assert len(idle.requests) == 1
+
+
+class TestStructuredOutput:
+    """Test JSON-schema constrained decoding."""
+    
+    @pytest.mark.asyncio
+    async def test_generate_json_sends_schema(self, stub_server):
+        """schema= is sent as response_format and the reply parsed directly."""
+        from neural_engine.v2.core import LLMClient
+        
+        stub_server.content = '{"key": "name"}'
+        schema = {"type": "object", "properties": {"key": {"type": "string"}}}
+        llm = LLMClient(base_url=stub_server.base_url)
+        
+        assert await llm.generate_json("Extract", schema=schema) == {"key": "name"}
+        
+        response_format = stub_server.requests[0]["response_format"]
+        assert response_format["type"] == "json_schema"
+        assert response_format["json_schema"]["schema"] == schema
+    
+    @pytest.mark.asyncio
+    async def test_generate_json_without_schema_unchanged(self, stub_server):
+        """Without a schema the request has no response_format."""
+        from neural_engine.v2.core import LLMClient
+        
+        stub_server.content = '```json\n{"a": 1}\n```'
+        llm = LLMClient(base_url=stub_server.base_url)
+        
+        assert await llm.generate_json("Extract") == {"a": 1}
+        assert "response_format" not in stub_server.requests[0]
+    
+    @pytest.mark.asyncio
+    async def test_generate_json_always_returns_object(self, stub_server):
+        """An array or scalar from a server ignoring the schema is not returned."""
+        from neural_engine.v2.core import LLMClient
+        
+        schema = {"type": "object", "properties": {"key": {"type": "string"}}}
+        llm = LLMClient(base_url=stub_server.base_url)
+        
+        for content in ('["name"]', '42', '"name"'):
+            stub_server.content = content
+            result = await llm.generate_json("Extract", schema=schema)
+            assert result == {"raw": content, "error": "Failed to parse JSON"}
+    
+    def test_tool_definition_schema(self):
+        """ToolDefinition.parameters become a JSON schema."""
+        from neural_engine.v2.tools import ToolDefinition
+        
+        definition = ToolDefinition(
+            name="update_activity",
+            description="Update an activity",
+            parameters=[
+                {"name": "activity_id", "type": "integer"},
+                {"name": "commute", "type": "boolean"},
+                {"name": "note", "type": "whatever"},
+            ],
+            required_params=["activity_id"],
+        )
+        
+        schema = definition.to_json_schema()
+        
+        assert schema["properties"] == {
+            "activity_id": {"type": "integer"},
+            "commute": {"type": "boolean"},
+            "note": {},
+        }
+        assert schema["required"] == ["activity_id"]
+        assert schema["additionalProperties"] is False
+    
+    @pytest.mark.asyncio
+    async def test_tool_neuron_constrains_tool_names(self, stub_server):
+        """Capability and parameter calls restrict output to real tools/params."""
+        from neural_engine.v2.core import Config
+        from neural_engine.v2.neurons import ToolNeuron
+        
+        config = Config.for_testing()
+        config.llm_base_url = stub_server.base_url
+        neuron = ToolNeuron(config)
+        calculator = neuron.registry.get("calculate").get_definition()
+        
+        stub_server.content = '{"can_handle": true, "reason": "math", "best_tool": "calculate"}'
+        check = await neuron._check_capability("2+2", [calculator])
+        stub_server.content = '{"expression": "2+2"}'
+        params = await neuron._extract_params("2+2", calculator)
+        
+        capability_schema = stub_server.requests[0]["response_format"]["json_schema"]["schema"]
+        assert capability_schema["properties"]["best_tool"]["enum"] == ["calculate", None]
+        assert check["best_tool"] == "calculate"
+        
+        param_schema = stub_server.requests[1]["response_format"]["json_schema"]["schema"]
+        assert param_schema["required"] == ["expression"]
+        assert params == {"expression": "2+2"}
+
+
+class TestProfiles:
+    """Test per-call-site LLM profiles."""
+    
+    @pytest.mark.asyncio
+    async def test_profile_sets_request_fields(self, stub_server):
+        """max_tokens, temperature, stop and model come from the profile."""
+        from neural_engine.v2.core import LLMClient, LLMProfile
+        
+        profile = LLMProfile(max_tokens=16, temperature=0.0, stop=["\n"], model="small")
+        llm = LLMClient(base_url=stub_server.base_url)
+        
+        await llm.generate("classify", profile=profile)
+        await llm.generate("classify", profile=profile, max_tokens=32)
+        
+        first, second = stub_server.requests
+        assert (first["max_tokens"], first["temperature"], first["stop"], first["model"]) == (16, 0.0, ["\n"], "small")
+        assert second["max_tokens"] == 32
+    
+    @pytest.mark.asyncio
+    async def test_profile_timeout(self, stub_server):
+        """The profile's timeout bounds the call."""
+        from neural_engine.v2.core import LLMClient, LLMProfile
+        
+        stub_server.delay = 1.0
+        llm = LLMClient(base_url=stub_server.base_url, timeout=30)
+        
+        with pytest.raises(asyncio.TimeoutError):
+            await llm.generate("slow", profile=LLMProfile(timeout=0.1))
+    
+    def test_env_overrides(self, monkeypatch):
+        """LLM_PROFILE_<NAME>_<FIELD> overrides a default profile."""
+        from neural_engine.v2.core import Config
+        
+        monkeypatch.setenv("LLM_PROFILE_FORGE_MODEL", "coder")
+        monkeypatch.setenv("LLM_PROFILE_INTENT_MAX_TOKENS", "4")
+        monkeypatch.setenv("LLM_PROFILE_INTENT_STOP", "\n,.")
+        config = Config.from_env()
+        
+        assert config.llm_profile("forge").model == "coder"
+        assert config.llm_profile("forge").priority == "forge"
+        assert config.llm_profile("intent").max_tokens == 4
+        assert config.llm_profile("intent").stop == ["\n", "."]
+        assert config.llm_profile("unknown").max_tokens == 2048
+    
+    @pytest.mark.asyncio
+    async def test_intent_neuron_uses_tight_budget(self, stub_server):
+        """IntentNeuron asks for a few deterministic tokens only."""
+        from neural_engine.v2.core import Config, GoalContext
+        from neural_engine.v2.neurons import IntentNeuron
+        
+        stub_server.content = "tool"
+        config = Config.for_testing()
+        config.llm_base_url = stub_server.base_url
+        
+        ctx = GoalContext(goal_id="p1", goal_text="What is 2+2?")
+        assert await IntentNeuron(config).process(ctx) == "tool"
+        
+        sent = stub_server.requests[0]
+        assert sent["max_tokens"] == config.llm_profile("intent").max_tokens
+        assert sent["temperature"] == 0.0
+
+
+class TestAdmission:
+    """Test the priority admission layer in front of llama.cpp slots."""
+    
+    @pytest.fixture(autouse=True)
+    def reset_metrics(self):
+        from neural_engine.v2.core import metrics
+        metrics.reset()
+    
+    @pytest.mark.asyncio
+    async def test_waiters_admitted_by_priority(self):
+        """interactive > scheduled > forge, FIFO within a priority."""
+        from neural_engine.v2.core import AdmissionController
+        
+        admission = AdmissionController(limit=1)
+        await admission.acquire("interactive")  # Hold the only slot
+        
+        order = []
+        
+        async def wait(name, priority):
+            await admission.acquire(priority)
+            order.append(name)
+            admission.release()
+        
+        waiters = [
+            asyncio.create_task(wait("forge", "forge")),
+            asyncio.create_task(wait("scheduled-1", "scheduled")),
+            asyncio.create_task(wait("interactive", "interactive")),
+            asyncio.create_task(wait("scheduled-2", "scheduled")),
+        ]
+        await asyncio.sleep(0)
+        assert admission.queue_depth == 4
+        
+        admission.release()
+        await asyncio.gather(*waiters)
+        
+        assert order == ["interactive", "scheduled-1", "scheduled-2", "forge"]
+        assert admission.in_flight == 0
+    
+    @pytest.mark.asyncio
+    async def test_expired_waiters_are_dropped(self):
+        """A waiter past its deadline times out and never takes a slot."""
+        import time
+        from neural_engine.v2.core import AdmissionController, metrics
+        
+        admission = AdmissionController(limit=1)
+        await admission.acquire()
+        
+        with pytest.raises(asyncio.TimeoutError):
+            await admission.acquire("scheduled", deadline=time.monotonic() + 0.05)
+        
+        admission.release()
+        assert admission.in_flight == 0
+        assert admission.queue_depth == 0
+        assert metrics.counter("llm_admission_expired", priority="scheduled").value == 1
+    
+    @pytest.mark.asyncio
+    async def test_in_flight_matches_server_slots(self, stub_server):
+        """The client never has more requests in flight than /slots reports."""
+        from neural_engine.v2.core import LLMClient, metrics
+        
+        stub_server.delay = 0.1
+        stub_server.slots = [{"id": 0, "is_processing": False}, {"id": 1, "is_processing": False}]
+        llm = LLMClient(base_url=stub_server.base_url, max_connections=16)
+        await llm.pool.check(await llm._get_session())
+        
+        await asyncio.gather(*[llm.generate(f"q{i}") for i in range(6)])
+        
+        assert llm.admission.limit == 2
+        assert stub_server.max_in_flight == 2
+        assert metrics.histogram("llm_queue_wait_ms", priority="interactive").count == 6
+    
+    @pytest.mark.asyncio
+    async def test_queue_wait_counts_against_timeout(self, stub_server):
+        """A call stuck in the queue past its timeout never reaches the server."""
+        from neural_engine.v2.core import LLMClient
+        
+        stub_server.delay = 0.5
+        llm = LLMClient(base_url=stub_server.base_url, max_in_flight=1)
+        
+        slow = asyncio.create_task(llm.generate("slow"))
+        await asyncio.sleep(0.05)
+        with pytest.raises(asyncio.TimeoutError):
+            await llm.generate("queued", timeout=0.1)
+        await slow
+        
+        assert [r["messages"][-1]["content"] for r in stub_server.requests] == ["slow"]
+    
+    def test_scheduled_context_demotes_priority(self):
+        """llm_priority() lowers interactive call sites, never raises forge."""
+        from neural_engine.v2.core import LLMClient, LLMProfile, llm_priority
+        
+        assert LLMClient._priority(None, LLMProfile()) == "interactive"
+        with llm_priority("scheduled"):
+            assert LLMClient._priority(None, LLMProfile()) == "scheduled"
+            assert LLMClient._priority(None, LLMProfile(priority="forge")) == "forge"
+    
+    @pytest.mark.asyncio
+    async def test_scheduler_runs_goals_at_scheduled_priority(self):
+        """The scheduler daemon marks its goals' LLM calls as scheduled."""
+        from neural_engine.v2.core.admission import effective_priority
+        from neural_engine.v2.scheduler import Scheduler, ScheduledGoal, ScheduleType
+        
+        seen = []
+        
+        async def executor(goal):
+            seen.append(effective_priority())
+            return {"success": True}
+        
+        scheduler = Scheduler(executor=executor)
+        await scheduler.add_goal(ScheduledGoal(id="g", goal="check", schedule_type=ScheduleType.ON_DEMAND))
+        await scheduler.run_now("g")
+        
+        assert seen == ["scheduled"]
+        assert effective_priority() == "interactive"
+
+
+class TestPromptReuse:
+    """Test KV cache reuse across a goal's pipeline stages."""
+    
+    @pytest.mark.asyncio
+    async def test_stages_share_goal_prefix(self, stub_server):
+        """Intent, capability and params calls send one identical system prompt."""
+        from neural_engine.v2.core import Config, GoalContext
+        from neural_engine.v2.neurons import IntentNeuron, ToolNeuron
+        
+        stub_server.content = '{"can_handle": true, "reason": "math", "best_tool": "calculate"}'
+        config = Config.for_testing()
+        config.llm_base_url = stub_server.base_url
+        
+        ctx = GoalContext(goal_id="g1", goal_text="What is 2+2?")
+        tool_neuron = ToolNeuron(config)
+        tool_neuron.prepare_prefix(ctx)
+        
+        await IntentNeuron(config).process(ctx)
+        await tool_neuron.process(ctx)
+        
+        systems = [r["messages"][0]["content"] for r in stub_server.requests]
+        assert len(systems) == 3
+        assert len(set(systems)) == 1
+        assert systems[0].endswith("User request: What is 2+2?")
+        assert all(r["cache_prompt"] is True for r in stub_server.requests)
+    
+    @pytest.mark.asyncio
+    async def test_generative_prompt_has_no_catalog(self, stub_server):
+        """A plain answer sends a short system prompt: no tools, goal once."""
+        from neural_engine.v2.core import Config, GoalContext
+        from neural_engine.v2.neurons import GenerativeNeuron, ToolNeuron
+        
+        stub_server.content = "Hello!"
+        config = Config.for_testing()
+        config.llm_base_url = stub_server.base_url
+        
+        ctx = GoalContext(goal_id="g1", goal_text="Say hello")
+        ToolNeuron(config).prepare_prefix(ctx)
+        assert "Available tools" in ctx.prompt_prefix
+        
+        await GenerativeNeuron(config).process(ctx)
+        
+        messages = stub_server.requests[0]["messages"]
+        assert "Available tools" not in messages[0]["content"]
+        assert sum(m["content"].count("Say hello") for m in messages) == 1
+    
+    @pytest.mark.asyncio
+    async def test_goal_pinned_to_slot(self, stub_server):
+        """Calls of one goal reuse a slot; new goals are spread over slots."""
+        from neural_engine.v2.core import LLMClient
+        
+        stub_server.slots = [{"id": 0, "is_processing": False}, {"id": 1, "is_processing": False}]
+        llm = LLMClient(base_url=stub_server.base_url)
+        await llm.pool.check(await llm._get_session())
+        
+        await llm.generate("intent", affinity="g1")
+        await llm.generate("other goal", affinity="g2")
+        await llm.generate("params", affinity="g1")
+        await llm.generate("no goal")
+        
+        slots = [r.get("id_slot") for r in stub_server.requests]
+        assert slots == [0, 1, 0, None]
+    
+    @pytest.mark.asyncio
+    async def test_held_slots_not_shared(self, stub_server):
+        """With every slot held by a live goal, new goals get none until one ends."""
+        from neural_engine.v2.core import LLMClient
+        
+        stub_server.slots = [{"id": 0, "is_processing": False}, {"id": 1, "is_processing": False}]
+        llm = LLMClient(base_url=stub_server.base_url)
+        await llm.pool.check(await llm._get_session())
+        
+        for goal in ("g1", "g2", "g3"):
+            await llm.generate("intent", affinity=goal)
+        llm.release_affinity("g1")
+        await llm.generate("params", affinity="g3")
+        await llm.generate("params", affinity="g2")
+        
+        slots = [r.get("id_slot") for r in stub_server.requests]
+        assert slots == [0, 1, None, 0, 1]
+    
+    @pytest.mark.asyncio
+    async def test_prompt_cache_can_be_disabled(self, stub_server):
+        """prompt_cache=False (LLM_PROMPT_CACHE=false) sends neither field."""
+        from neural_engine.v2.core import LLMClient
+        
+        llm = LLMClient(base_url=stub_server.base_url, prompt_cache=False)
+        await llm.generate("q", affinity="g1")
+        
+        sent = stub_server.requests[0]
+        assert "id_slot" not in sent
+        assert "cache_prompt" not in sent
+    
+    @pytest.mark.asyncio
+    async def test_cache_key_ignores_slot(self, stub_server):
+        """Two goals asking the same deterministic question share a cache entry."""
+        from neural_engine.v2.core import LLMClient, LLMCache
+        
+        stub_server.slots = [{"id": 0, "is_processing": False}, {"id": 1, "is_processing": False}]
+        llm = LLMClient(base_url=stub_server.base_url, cache=LLMCache())
+        await llm.pool.check(await llm._get_session())
+        
+        await llm.generate("same", temperature=0.0, affinity="g1")
+        await llm.generate("same", temperature=0.0, affinity="g2")
+        
+        assert len(stub_server.requests) == 1
+
+
+class TestUsage:
+    """Test per-call token and timing instrumentation."""
+    
+    TIMINGS = {"prompt_n": 120, "prompt_ms": 300.0, "cache_n": 80, "predicted_n": 20, "predicted_ms": 500.0}
+    
+    @pytest.fixture(autouse=True)
+    def reset_metrics(self):
+        from neural_engine.v2.core import metrics
+        metrics.reset()
+    
+    @pytest.mark.asyncio
+    async def test_call_recorded_from_timings(self, stub_server):
+        """Tokens and prefill/decode ms come from llama.cpp's timings."""
+        from neural_engine.v2.core import LLMClient, LLMProfile, collect_llm_calls, metrics
+        
+        stub_server.timings = self.TIMINGS
+        llm = LLMClient(base_url=stub_server.base_url, model="qwen")
+        
+        with collect_llm_calls() as calls:
+            await llm.generate("q", profile=LLMProfile(name="intent"))
+        
+        call, = calls
+        assert (call.profile, call.model, call.backend) == ("intent", "qwen", stub_server.base_url.rstrip("/"))
+        assert (call.prompt_tokens, call.completion_tokens, call.cached_tokens) == (120, 20, 80)
+        assert (call.prefill_ms, call.decode_ms) == (300.0, 500.0)
+        assert call.decode_tps == 40.0
+        assert call.total_ms >= call.queue_ms
+        
+        assert metrics.histogram("llm_prefill_ms", profile="intent").sum == 300.0
+        assert metrics.counter("llm_prompt_tokens_total", profile="intent").value == 120
+    
+    @pytest.mark.asyncio
+    async def test_collectors_nest(self, stub_server):
+        """A call is seen by every enclosing collector, summarized per profile."""
+        from neural_engine.v2.core import LLMClient, LLMProfile, collect_llm_calls, summarize_llm_calls
+        
+        stub_server.timings = self.TIMINGS
+        llm = LLMClient(base_url=stub_server.base_url)
+        
+        with collect_llm_calls() as goal_calls:
+            with collect_llm_calls() as stage_calls:
+                await llm.generate("a", profile=LLMProfile(name="intent"))
+            await asyncio.gather(
+                llm.generate("b", profile=LLMProfile(name="params")),
+                llm.generate("c", profile=LLMProfile(name="params")),
+            )
+        
+        assert len(stage_calls) == 1
+        summary = summarize_llm_calls(goal_calls)
+        assert summary["calls"] == 3
+        assert summary["prompt_tokens"] == 360
+        assert summary["by_profile"]["params"]["calls"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_cache_hit_recorded(self, stub_server):
+        """A response served from the cache is a call without tokens."""
+        from neural_engine.v2.core import LLMClient, LLMCache, collect_llm_calls, metrics
+        
+        stub_server.timings = self.TIMINGS
+        llm = LLMClient(base_url=stub_server.base_url, cache=LLMCache())
+        
+        with collect_llm_calls() as calls:
+            await llm.generate("same", temperature=0.0)
+            await llm.generate("same", temperature=0.0)
+        
+        assert [c.cache_hit for c in calls] == [False, True]
+        assert calls[1].prompt_tokens == 0
+        assert metrics.counter("llm_prompt_tokens_total", profile="default").value == 120
+    
+    @pytest.mark.asyncio
+    async def test_stream_recorded_from_final_chunk(self, stub_server):
+        """Streaming calls read timings from the last SSE chunk."""
+        from neural_engine.v2.core import LLMClient, LLMProfile, collect_llm_calls
+        
+        stub_server.timings = self.TIMINGS
+        llm = LLMClient(base_url=stub_server.base_url)
+        
+        with collect_llm_calls() as calls:
+            async for _ in llm.stream("tell me", profile=LLMProfile(name="generative")):
+                pass
+        
+        call, = calls
+        assert call.profile == "generative"
+        assert (call.prompt_tokens, call.decode_ms) == (120, 500.0)
+
+
+class TestCancellation:
+    """Test cancelling LLM calls and goals."""
+    
+    @staticmethod
+    def _orchestrator(config, intent_run):
+        from unittest.mock import AsyncMock, MagicMock
+        from neural_engine.v2.core import Orchestrator
+        from neural_engine.v2.neurons import ToolNeuron
+        
+        intent_neuron = MagicMock()
+        intent_neuron.run = intent_run
+        return Orchestrator(
+            config=config,
+            intent_neuron=intent_neuron,
+            generative_neuron=MagicMock(),
+            tool_neuron=ToolNeuron(config),
+            memory_neuron=MagicMock(),
+            event_bus=AsyncMock(),
+            thought_tree=AsyncMock(),
+        )
+    
+    @pytest.mark.asyncio
+    async def test_cancel_closes_connection(self, stub_server):
+        """Cancelling the calling task drops the HTTP connection."""
+        from neural_engine.v2.core import LLMClient, metrics
+        
+        metrics.reset()
+        stub_server.delay = 0.3
+        llm = LLMClient(base_url=stub_server.base_url)
+        
+        task = asyncio.create_task(llm.generate("long answer"))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        
+        await asyncio.sleep(0.3)
+        assert stub_server.aborted == 1
+        assert llm.admission.in_flight == 0
+        assert llm.pool.backends[0].outstanding == 0
+        assert metrics.counter("llm_cancelled", profile="default").value == 1
+    
+    @pytest.mark.asyncio
+    async def test_stream_close_closes_connection(self, stub_server):
+        """Abandoning a stream mid-answer drops the HTTP connection."""
+        from neural_engine.v2.core import LLMClient
+        
+        stub_server.content = " ".join(["word"] * 200)
+        llm = LLMClient(base_url=stub_server.base_url)
+        
+        stream = llm.stream("story")
+        assert await stream.__anext__()
+        await stream.aclose()
+        
+        assert llm.admission.in_flight == 0
+        assert llm.pool.backends[0].outstanding == 0
+    
+    @pytest.mark.asyncio
+    async def test_goal_deadline_bounds_llm_calls(self, stub_server):
+        """Inside a cancel scope, calls stop at the goal's deadline."""
+        import time
+        from neural_engine.v2.core import LLMClient, CancelToken, cancel_scope
+        
+        stub_server.delay = 1.0
+        llm = LLMClient(base_url=stub_server.base_url, timeout=30)
+        
+        started = time.monotonic()
+        with cancel_scope(CancelToken.with_timeout(0.1)):
+            with pytest.raises(asyncio.TimeoutError):
+                await llm.generate("slow")
+        assert time.monotonic() - started < 0.5
+    
+    @pytest.mark.asyncio
+    async def test_process_deadline(self):
+        """A goal past its deadline returns a cancelled result."""
+        import time
+        from neural_engine.v2.core import Config
+        
+        async def slow_intent(ctx, goal):
+            await asyncio.sleep(5)
+        
+        orchestrator = self._orchestrator(Config.for_testing(), slow_intent)
+        result = await orchestrator.process("What is 2+2?", deadline=time.monotonic() + 0.1)
+        
+        assert result["success"] is False
+        assert result["cancelled"] is True
+        assert "deadline exceeded" in result["error"]
+    
+    @pytest.mark.asyncio
+    async def test_process_cancel_token(self):
+        """token.cancel() aborts the running goal; the token reaches neurons."""
+        from neural_engine.v2.core import Config, CancelToken, current_cancel_token
+        
+        seen = []
+        
+        async def slow_intent(ctx, goal):
+            seen.append(current_cancel_token() is ctx.cancel)
+            await asyncio.sleep(5)
+        
+        token = CancelToken()
+        orchestrator = self._orchestrator(Config.for_testing(), slow_intent)
+        task = asyncio.create_task(orchestrator.process("What is 2+2?", cancel=token))
+        await asyncio.sleep(0.05)
+        token.cancel("client disconnected")
+        result = await task
+        
+        assert seen == [True]
+        assert result["cancelled"] is True
+        assert result["error"] == "Goal cancelled: client disconnected"
+
+
+class FakeRedis:
+    """Dict-backed stand-in for the few redis.asyncio calls the cache uses."""
+    
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+    
+    async def get(self, key):
+        return self.data.get(key)
+    
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+        self.ttls[key] = ex
+
+
+class TestLLMCache:
+    """Test the two-tier deterministic response cache."""
+    
+    @pytest.fixture(autouse=True)
+    def reset_metrics(self):
+        from neural_engine.v2.core import metrics
+        metrics.reset()
+    
+    @pytest.mark.asyncio
+    async def test_repeated_deterministic_call_hits_cache(self, stub_server):
+        """Identical temperature=0 calls reach llama.cpp once."""
+        from neural_engine.v2.core import LLMClient, LLMCache
+        
+        cache = LLMCache()
+        llm = LLMClient(base_url=stub_server.base_url, cache=cache)
+        
+        for _ in range(3):
+            assert await llm.generate("classify", temperature=0.0) == "stub reply"
+        
+        assert len(stub_server.requests) == 1
+        stats = cache.stats()
+        assert stats["misses"] == 1
+        assert stats["hits_memory"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_key_covers_generation_settings(self, stub_server):
+        """Different system prompt or max_tokens is a different entry."""
+        from neural_engine.v2.core import LLMClient, LLMCache
+        
+        llm = LLMClient(base_url=stub_server.base_url, cache=LLMCache())
+        
+        await llm.generate("q", temperature=0.0)
+        await llm.generate("q", system="other", temperature=0.0)
+        await llm.generate("q", temperature=0.0, max_tokens=16)
+        
+        assert len(stub_server.requests) == 3
+    
+    @pytest.mark.asyncio
+    async def test_sampled_calls_bypass_cache(self, stub_server):
+        """temperature > 0 is never cached."""
+        from neural_engine.v2.core import LLMClient, LLMCache
+        
+        llm = LLMClient(base_url=stub_server.base_url, cache=LLMCache())
+        
+        await llm.generate("story", temperature=0.7)
+        await llm.generate("story", temperature=0.7)
+        
+        assert len(stub_server.requests) == 2
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_calls_are_coalesced(self, stub_server):
+        """Single-flight: concurrent identical calls share one request."""
+        from neural_engine.v2.core import LLMClient, LLMCache
+        
+        stub_server.delay = 0.1
+        cache = LLMCache()
+        llm = LLMClient(base_url=stub_server.base_url, cache=cache)
+        
+        results = await asyncio.gather(*[llm.generate("same", temperature=0.0) for _ in range(5)])
+        
+        assert results == ["stub reply"] * 5
+        assert len(stub_server.requests) == 1
+        assert cache.stats()["coalesced"] == 4
+    
+    @pytest.mark.asyncio
+    async def test_redis_tier_shared_between_processes(self, stub_server):
+        """A second process (empty LRU) is served from Redis with TTL."""
+        from neural_engine.v2.core import LLMClient, LLMCache
+        
+        redis_client = FakeRedis()
+        first = LLMClient(base_url=stub_server.base_url, cache=LLMCache(redis_client, ttl_seconds=60))
+        second = LLMClient(base_url=stub_server.base_url, cache=LLMCache(redis_client, ttl_seconds=60))
+        
+        await first.generate("shared", temperature=0.0)
+        assert await second.generate("shared", temperature=0.0) == "stub reply"
+        
+        assert len(stub_server.requests) == 1
+        assert second.cache.stats()["hits_redis"] == 1
+        assert list(redis_client.ttls.values()) == [60]
+    
+    @pytest.mark.asyncio
+    async def test_stats_are_per_instance(self, stub_server):
+        """Each cache reports its own counts; metrics get the totals."""
+        from neural_engine.v2.core import LLMClient, LLMCache, metrics
+        
+        first = LLMClient(base_url=stub_server.base_url, cache=LLMCache())
+        second = LLMClient(base_url=stub_server.base_url, cache=LLMCache())
+        
+        await first.generate("a", temperature=0.0)
+        await first.generate("a", temperature=0.0)
+        await second.generate("b", temperature=0.0)
+        
+        assert first.cache.stats()["misses"] == 1
+        assert first.cache.stats()["hits_memory"] == 1
+        assert second.cache.stats()["misses"] == 1
+        assert second.cache.stats()["hits_memory"] == 0
+        assert metrics.counter("llm_cache_misses").value == 2
+    
+    @pytest.mark.asyncio
+    async def test_failures_are_not_cached(self):
+        """A failing computation propagates and is retried next time."""
+        from neural_engine.v2.core import LLMCache
+        
+        cache = LLMCache()
+        calls = []
+        
+        async def flaky():
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError("llama.cpp down")
+            return "ok"
+        
+        with pytest.raises(RuntimeError):
+            await cache.get_or_compute("k", flaky)
+        assert await cache.get_or_compute("k", flaky) == "ok"
+    
+    def test_lru_evicts_oldest(self):
+        """The in-process tier is bounded."""
+        from neural_engine.v2.core import LLMCache
+        
+        cache = LLMCache(max_entries=2)
+        for key in ["a", "b", "c"]:
+            cache._remember(key, key)
+        
+        assert list(cache._lru) == ["b", "c"]
+
+
+class TestSharedClient:
+    """Test that the system shares one client per config."""
+    
+    def test_config_returns_same_client(self):
+        """Config.get_llm() is cached."""
+        from neural_engine.v2.core import Config
+        
+        config = Config.for_testing()
+        
+        assert config.get_llm() is config.get_llm()
+    
+    def test_neurons_and_forge_share_client(self):
+        """Every neuron and ToolForge use the config's client."""
+        from neural_engine.v2.core import Config
+        from neural_engine.v2.neurons import IntentNeuron, GenerativeNeuron, ToolNeuron
+        from neural_engine.v2.forge import ToolForge
+        
+        config = Config.for_testing()
+        tool_neuron = ToolNeuron(config)
+        forge = ToolForge(config, tool_neuron.registry)
+        
+        llm = config.get_llm()
+        assert IntentNeuron(config).llm is llm
+        assert GenerativeNeuron(config).llm is llm
+        assert tool_neuron.llm is llm
+        assert forge.llm is llm
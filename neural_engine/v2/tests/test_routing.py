@@ -0,0 +1,840 @@
+"""
+Routing Tests - How goals reach a tool, against stub llama.cpp servers.
+
+Covers the paths that skip or shorten the staged pipeline
+(intent → capability → selection → params), and the pathway cache
+that replays learned routes.
+"""
+
+import json
+import time
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from neural_engine.v2.tests import test_llm
+from neural_engine.v2.tests.test_llm import stub_server  # noqa: F401 (fixture)
+
+
+def _config(stub):
+    from neural_engine.v2.core import Config
+    
+    config = Config.for_testing()
+    config.llm_base_url = stub.base_url
+    return config
+
+
+def _quiet(neuron):
+    """Neuron whose run() records events and thoughts in mocks, not Redis."""
+    neuron._event_bus = AsyncMock()
+    neuron._thought_tree = AsyncMock()
+    return neuron
+
+
+def _orchestrator(config, **neurons):
+    from neural_engine.v2.core import Orchestrator
+    from neural_engine.v2.neurons import ToolNeuron
+    
+    parts = dict(
+        intent_neuron=MagicMock(run=AsyncMock()),
+        generative_neuron=MagicMock(run=AsyncMock()),
+        tool_neuron=_quiet(ToolNeuron(config)),
+        memory_neuron=MagicMock(run=AsyncMock()),
+    )
+    parts.update(neurons)
+    return Orchestrator(config=config, event_bus=AsyncMock(), thought_tree=AsyncMock(), **parts)
+
+
+class TestFusedRouting:
+    """Test intent, tool and arguments in one structured call."""
+    
+    @pytest.mark.asyncio
+    async def test_route_schema_offers_tool_argument_schemas(self, stub_server):
+        """Each candidate is a schema branch pairing its name with its arguments."""
+        from neural_engine.v2.core import GoalContext
+        from neural_engine.v2.neurons import RouterNeuron, ToolNeuron
+        
+        config = _config(stub_server)
+        calculator = ToolNeuron(config).registry.get_definition("calculate")
+        stub_server.content = json.dumps(
+            {"intent": "tool", "tool": "calculate", "arguments": {"expression": "2+2"}, "confidence": 0.9}
+        )
+        
+        route = await RouterNeuron(config).process(GoalContext(goal_id="g1", goal_text="2+2"), [calculator])
+        
+        assert route.tool_spec() == {"tool": "calculate", "parameters": {"expression": "2+2"}}
+        branches = stub_server.requests[0]["response_format"]["json_schema"]["schema"]["anyOf"]
+        assert branches[0]["properties"]["tool"] == {"const": "calculate"}
+        assert branches[0]["properties"]["arguments"]["required"] == ["expression"]
+        assert branches[-1]["properties"]["tool"] == {"type": "null"}
+    
+    @pytest.mark.asyncio
+    async def test_invalid_or_unsure_answers_fall_back(self, stub_server):
+        """Low confidence, unknown tools and mistyped arguments return None."""
+        from neural_engine.v2.core import GoalContext
+        from neural_engine.v2.neurons import RouterNeuron, ToolNeuron
+        
+        config = _config(stub_server)
+        calculator = ToolNeuron(config).registry.get_definition("calculate")
+        router = RouterNeuron(config, min_confidence=0.7)
+        
+        answers = [
+            {"intent": "tool", "tool": "calculate", "arguments": {"expression": "1"}, "confidence": 0.4},
+            {"intent": "tool", "tool": "weather", "arguments": {}, "confidence": 0.9},
+            {"intent": "tool", "tool": "calculate", "arguments": {"expression": 4}, "confidence": 0.9},
+            {"intent": "tool", "tool": "calculate", "arguments": {}, "confidence": 0.9},
+        ]
+        for answer in answers:
+            stub_server.content = json.dumps(answer)
+            ctx = GoalContext(goal_id="g1", goal_text=f"goal {answer}")
+            assert await router.process(ctx, [calculator]) is None
+            assert ctx.messages[-1]["type"] == "fallback"
+    
+    @pytest.mark.asyncio
+    async def test_fused_goal_makes_one_routing_call(self, stub_server):
+        """A routed tool goal runs the tool after a single routing call."""
+        from neural_engine.v2.neurons import RouterNeuron
+        
+        config = _config(stub_server)
+        config.fused_routing = True
+        stub_server.content = json.dumps(
+            {"intent": "tool", "tool": "calculate", "arguments": {"expression": "6*7"}, "confidence": 0.95}
+        )
+        orchestrator = _orchestrator(config, router_neuron=_quiet(RouterNeuron(config)))
+        orchestrator._interpret_tool_result = AsyncMock(return_value=None)
+        
+        result = await orchestrator.process("calculate 6*7")
+        
+        assert result["success"] is True
+        assert result["intent"] == "tool"
+        assert result["result"] == "42"
+        assert len(stub_server.requests) == 1
+        orchestrator.intent_neuron.run.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_fallback_runs_staged_pipeline(self, stub_server):
+        """An unusable routing answer hands the goal to IntentNeuron."""
+        from neural_engine.v2.core.base import NeuronResult
+        from neural_engine.v2.neurons import RouterNeuron
+        
+        config = _config(stub_server)
+        stub_server.content = json.dumps({"intent": "generative", "tool": None, "arguments": {}, "confidence": 0.1})
+        intent_neuron = MagicMock(run=AsyncMock(return_value=NeuronResult(success=True, data="generative")))
+        generative_neuron = MagicMock(run=AsyncMock(return_value=NeuronResult(success=True, data="hi")))
+        orchestrator = _orchestrator(
+            config,
+            router_neuron=_quiet(RouterNeuron(config)),
+            intent_neuron=intent_neuron,
+            generative_neuron=generative_neuron,
+        )
+        
+        result = await orchestrator.process("hello there")
+        
+        assert result["result"] == "hi"
+        intent_neuron.run.assert_called_once()
+
+
+class TestFastPath:
+    """Test rule-based routing of explicit tool invocations."""
+    
+    @pytest.fixture
+    def registry(self):
+        from neural_engine.v2.tools import ToolRegistry
+        
+        registry = ToolRegistry()
+        registry.register_function(
+            "strava_reciprocate_kudos",
+            lambda **kwargs: {"result": kwargs},
+            "Give kudos back",
+            [
+                {"name": "count", "type": "integer"},
+                {"name": "max_age_hours", "type": "integer"},
+                {"name": "dry_run", "type": "boolean"},
+                {"name": "note", "type": "string"},
+            ],
+        )
+        return registry
+    
+    def test_parses_typed_arguments(self, registry):
+        """key=value pairs are coerced to the declared parameter types."""
+        from neural_engine.v2.neurons import parse_tool_invocation
+        
+        route = parse_tool_invocation(
+            "Use strava_reciprocate_kudos with count=30 and max_age_hours=24, dry_run=yes note='well done'",
+            registry,
+        )
+        
+        assert route.intent == "tool"
+        assert route.explicit is True
+        assert route.tool_spec() == {
+            "tool": "strava_reciprocate_kudos",
+            "parameters": {"count": 30, "max_age_hours": 24, "dry_run": True, "note": "well done"},
+        }
+        assert parse_tool_invocation("run strava_reciprocate_kudos", registry).parameters == {}
+    
+    def test_anything_else_is_left_to_the_llm(self, registry):
+        """Unknown tools, unknown or mistyped arguments and prose return None."""
+        from neural_engine.v2.neurons import parse_tool_invocation
+        
+        goals = [
+            "Use strava_give_kudos with count=3",
+            "Use strava_reciprocate_kudos with count=30 and limit=5",
+            "Use strava_reciprocate_kudos with count=lots",
+            "Use strava_reciprocate_kudos with count=30 for my recent friends",
+            "Give kudos back to everyone who gave me kudos",
+        ]
+        for goal in goals:
+            assert parse_tool_invocation(goal, registry) is None, goal
+    
+    @pytest.mark.asyncio
+    async def test_explicit_goal_makes_no_llm_calls(self, stub_server):
+        """A fast-path goal runs the tool and returns its raw output."""
+        config = _config(stub_server)
+        orchestrator = _orchestrator(config)
+        
+        result = await orchestrator.process("Use calculate with expression=6*7")
+        
+        assert result["success"] is True
+        assert result["result"] == "42"
+        assert stub_server.requests == []
+        orchestrator.intent_neuron.run.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_structured_invocation(self, stub_server):
+        """process(tool=..., params=...) coerces params and rejects bad ones."""
+        config = _config(stub_server)
+        orchestrator = _orchestrator(config)
+        
+        result = await orchestrator.process("scheduled", tool="calculate", params={"expression": "2**5"})
+        assert result["result"] == "32"
+        
+        result = await orchestrator.process("scheduled", tool="calculate", params={"precision": 2})
+        assert result["success"] is False
+        assert result["error"].startswith("Invalid tool invocation: unknown arguments")
+        assert stub_server.requests == []
+
+
+class TestOutputModes:
+    """Test how tool results are returned (raw, structured, rendered, llm)."""
+    
+    @staticmethod
+    def _orchestrator(config):
+        orchestrator = _orchestrator(config)
+        orchestrator.tool_neuron.registry.register_function(
+            "count_items",
+            lambda items="": {"count": len(items.split(","))},
+            "Count comma-separated items",
+            [{"name": "items", "type": "string"}],
+            renderer="{count} items",
+        )
+        return orchestrator
+    
+    @pytest.mark.asyncio
+    async def test_modes_without_llm(self, stub_server):
+        """raw, structured and rendered make no LLM call."""
+        orchestrator = self._orchestrator(_config(stub_server))
+        goal = "Use count_items with items='a,b,c'"
+        
+        rendered = await orchestrator.process(goal)
+        structured = await orchestrator.process(goal, output_mode="structured")
+        raw = await orchestrator.process(goal, output_mode="raw")
+        
+        assert rendered["output_mode"] == "rendered"
+        assert rendered["result"] == "3 items"
+        assert structured["data"] == {"count": 3}
+        assert json.loads(structured["result"]) == {"count": 3}
+        assert json.loads(raw["result"]) == {"count": 3}
+        assert "data" not in raw
+        assert stub_server.requests == []
+    
+    @pytest.mark.asyncio
+    async def test_llm_mode_interprets(self, stub_server):
+        """output_mode="llm" rewrites the tool result with the interpret profile."""
+        stub_server.content = "You have three items."
+        orchestrator = self._orchestrator(_config(stub_server))
+        
+        result = await orchestrator.process("Use count_items with items='a,b,c'", output_mode="llm")
+        
+        assert result["result"] == "You have three items."
+        assert len(stub_server.requests) == 1
+    
+    @pytest.mark.asyncio
+    async def test_context_mode_and_validation(self, stub_server):
+        """output_mode() sets the default for goals in the block; unknown modes fail."""
+        from neural_engine.v2.core import output_mode
+        
+        config = _config(stub_server)
+        config.output_mode = "llm"
+        orchestrator = self._orchestrator(config)
+        
+        with output_mode("raw"):
+            result = await orchestrator.process("count", tool="count_items", params={"items": "a"})
+        assert result["output_mode"] == "raw"
+        
+        with pytest.raises(ValueError):
+            await orchestrator.process("count", output_mode="prose")
+
+    
+    @pytest.mark.asyncio
+    async def test_retried_tool_uses_output_mode(self, stub_server):
+        """A tool that succeeds only on retry is still rendered in the goal's mode."""
+        orchestrator = self._orchestrator(_config(stub_server))
+        attempts = []
+        
+        def flaky(items=""):
+            attempts.append(items)
+            if len(attempts) == 1:
+                return {"error": "try again"}
+            return {"count": len(items.split(","))}
+        
+        orchestrator.tool_neuron.registry.register_function(
+            "flaky_count", flaky, "Count items, flakily", [{"name": "items", "type": "string"}], renderer="{count} items"
+        )
+        orchestrator.tool_neuron.recovery.analyze_failure = MagicMock(
+            return_value=MagicMock(action="retry", reason="flaky", context={})
+        )
+        
+        stub_server.content = '{"items": "a,b"}'  # Retry re-extracts the parameters
+        
+        result = await orchestrator.process("Use flaky_count with items='a,b'", output_mode="rendered")
+        
+        assert len(attempts) == 2
+        assert result["result"] == "2 items"
+
+
+class FakeRedis(test_llm.FakeRedis):
+    """FakeRedis with the key, set and sorted-set calls the pathway cache uses."""
+    
+    async def mget(self, keys):
+        return [self.data.get(k) for k in keys]
+    
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+    
+    async def expire(self, key, seconds):
+        self.ttls[key] = seconds
+    
+    async def sadd(self, key, *members):
+        self.data.setdefault(key, set()).update(members)
+    
+    async def srem(self, key, *members):
+        self.data.get(key, set()).difference_update(members)
+    
+    async def smembers(self, key):
+        return set(self.data.get(key, set()))
+    
+    async def zadd(self, key, mapping):
+        self.data.setdefault(key, {}).update(mapping)
+    
+    async def zrem(self, key, *members):
+        for member in members:
+            self.data.get(key, {}).pop(member, None)
+    
+    async def zcard(self, key):
+        return len(self.data.get(key, {}))
+    
+    async def zrange(self, key, start, end):
+        members = sorted(self.data.get(key, {}), key=self.data.get(key, {}).get)
+        return members[start:None if end == -1 else end + 1]
+
+
+class TestPathwayCache:
+    """Test replaying learned goal → tool routes."""
+    
+    @pytest.fixture
+    def registry(self):
+        from neural_engine.v2.tools import ToolRegistry
+        
+        registry = ToolRegistry()
+        registry.register_function(
+            "recent_runs", lambda count=5: {"result": count}, "List recent runs", [{"name": "count", "type": "integer"}]
+        )
+        return registry
+    
+    @pytest.mark.asyncio
+    async def test_similar_goal_fills_slots(self, registry):
+        """Parameters found in the goal's words are re-read from the new goal."""
+        from neural_engine.v2.neurons import PathwayCache
+        
+        pathways = PathwayCache(FakeRedis(), registry)
+        await pathways.record("Show my last 5 runs", "recent_runs", {"count": 5}, success=True)
+        
+        exact = await pathways.lookup("show my last 5 runs.")
+        similar = await pathways.lookup("Show my last 12 runs!")
+        
+        assert exact.tool_spec() == {"tool": "recent_runs", "parameters": {"count": 5}}
+        assert similar.parameters == {"count": 12}
+        assert similar.pathway == exact.pathway
+        assert await pathways.lookup("show my last few runs") is None
+        assert await pathways.lookup("what is the weather in Paris") is None
+    
+    @pytest.mark.asyncio
+    async def test_similar_goal_needs_slots_and_same_shape(self, registry):
+        """Pathways without slots only replay exactly; other shapes are not loaded."""
+        from neural_engine.v2.neurons import PathwayCache
+        
+        redis = FakeRedis()
+        pathways = PathwayCache(redis, registry, similarity_threshold=0.5)
+        goal = "list the recent runs from my watch for the weekly training summary report"
+        await pathways.record(goal, "recent_runs", {"count": 3}, success=True)  # No slot: 3 not a word
+        await pathways.record("Show my last 5 runs", "recent_runs", {"count": 5}, success=True)
+        
+        loaded = []
+        mget = redis.mget
+        
+        async def tracking_mget(keys):
+            loaded.extend(keys)
+            return await mget(keys)
+        
+        redis.mget = tracking_mget
+        
+        assert (await pathways.lookup(goal)).parameters == {"count": 3}
+        assert await pathways.lookup(goal.replace("weekly", "monthly")) is None
+        assert len(loaded) == 1  # Only the same-shape pathway was compared
+    
+    @pytest.mark.asyncio
+    async def test_failures_lower_confidence(self, registry):
+        """A replayed route that fails stops being replayed, then is deleted."""
+        from neural_engine.v2.neurons import PathwayCache
+        
+        redis_client = FakeRedis()
+        pathways = PathwayCache(redis_client, registry, min_confidence=0.6)
+        await pathways.record("show my last 5 runs", "recent_runs", {"count": 5}, success=True)
+        route = await pathways.lookup("show my last 8 runs")
+        
+        await pathways.record("show my last 8 runs", "recent_runs", route.parameters, False, pathway=route.pathway)
+        assert await pathways.lookup("show my last 5 runs") is None
+        
+        for _ in range(2):
+            await pathways.record("show my last 5 runs", "recent_runs", {"count": 5}, success=False)
+        assert redis_client.data["pathway:index"] == {}
+    
+    @pytest.mark.asyncio
+    async def test_tool_changes_invalidate(self, registry):
+        """Re-registering, unregistering or retiring a tool drops its pathways."""
+        from neural_engine.v2.forge import ToolForge
+        from neural_engine.v2.neurons import PathwayCache
+        
+        pathways = PathwayCache(FakeRedis(), registry)
+        goal = "show my last 5 runs"
+        
+        async def relearn():
+            await pathways.record(goal, "recent_runs", {"count": 5}, success=True)
+            assert await pathways.lookup(goal) is not None
+        
+        await relearn()
+        registry.register_function("recent_runs", lambda count=5: {}, "List runs", [{"name": "count", "type": "integer"}])
+        assert await pathways.lookup(goal) is None
+        
+        await relearn()
+        forge = ToolForge(MagicMock(), registry)
+        forge.record_success("recent_runs", 10)
+        forge.retire_tool("recent_runs")
+        assert await pathways.lookup(goal) is None
+        
+        await relearn()
+        registry.unregister("recent_runs")
+        assert await pathways.lookup(goal) is None
+    
+    @pytest.mark.asyncio
+    async def test_hit_skips_routing_llm_calls(self, stub_server):
+        """The second run of a routed goal makes no LLM call."""
+        from neural_engine.v2.neurons import RouterNeuron, PathwayCache
+        
+        config = _config(stub_server)
+        config.output_mode = "raw"
+        stub_server.content = json.dumps(
+            {"intent": "tool", "tool": "calculate", "arguments": {"expression": "6*7"}, "confidence": 0.95}
+        )
+        orchestrator = _orchestrator(config, router_neuron=_quiet(RouterNeuron(config)))
+        orchestrator.pathway_cache = PathwayCache(FakeRedis(), orchestrator.tool_neuron.registry)
+        
+        first = await orchestrator.process("calculate 6*7")
+        second = await orchestrator.process("Calculate 6*7.")
+        
+        assert first["result"] == second["result"] == "42"
+        assert len(stub_server.requests) == 1
+        orchestrator.intent_neuron.run.assert_not_called()
+        assert second["messages"][0]["data"].startswith("Pathway cache: calculate")
+
+
+class TestSpeculativeRouting:
+    """Test the capability check running alongside intent classification."""
+    
+    @pytest.fixture(autouse=True)
+    def reset_metrics(self):
+        from neural_engine.v2.core import metrics
+        metrics.reset()
+    
+    @staticmethod
+    def _intent(intent, delay):
+        from neural_engine.v2.core.base import NeuronResult
+        
+        async def run(ctx, goal):
+            await asyncio.sleep(delay)
+            return NeuronResult(success=True, data=intent)
+        
+        return MagicMock(run=AsyncMock(side_effect=run))
+    
+    @pytest.mark.asyncio
+    async def test_tool_intent_keeps_the_check(self, stub_server):
+        """The speculative capability answer replaces ToolNeuron's own call."""
+        from neural_engine.v2.core import metrics
+        
+        config = _config(stub_server)
+        config.speculative_routing = True
+        stub_server.content = json.dumps({"can_handle": False, "reason": "not a tool task", "best_tool": None})
+        orchestrator = _orchestrator(
+            config,
+            intent_neuron=self._intent("tool", 0.2),
+            generative_neuron=MagicMock(run=AsyncMock(return_value=MagicMock(success=True, data="answer"))),
+        )
+        
+        result = await orchestrator.process("what is two plus two")
+        
+        assert result["result"] == "answer"
+        capability_calls = [r for r in stub_server.requests if r["max_tokens"] == config.llm_profile("capability").max_tokens]
+        assert len(capability_calls) == len(stub_server.requests) == 1
+        assert metrics.counter("speculative_routing", outcome="committed").value == 1
+    
+    @pytest.mark.asyncio
+    async def test_other_intent_cancels_the_check(self, stub_server):
+        """A non-tool intent cancels the check still in flight."""
+        from neural_engine.v2.core import metrics
+        
+        config = _config(stub_server)
+        config.speculative_routing = True
+        stub_server.delay = 1.0
+        orchestrator = _orchestrator(
+            config,
+            intent_neuron=self._intent("generative", 0.05),
+            generative_neuron=MagicMock(run=AsyncMock(return_value=MagicMock(success=True, data="hi"))),
+        )
+        
+        result = await orchestrator.process("tell me a joke")
+        await asyncio.sleep(0.1)
+        
+        assert result["result"] == "hi"
+        assert stub_server.aborted == 1
+        assert metrics.counter("speculative_routing", outcome="cancelled").value == 1
+
+
+class TestStageMemoization:
+    """Test that tool retries only redo parameter extraction."""
+    
+    @pytest.mark.asyncio
+    async def test_retry_reuses_selected_tool(self, stub_server):
+        """A second attempt skips capability and selection, and sends the error."""
+        from neural_engine.v2.core import GoalContext
+        from neural_engine.v2.neurons import ToolNeuron
+        
+        config = _config(stub_server)
+        neuron = ToolNeuron(config)
+        ctx = GoalContext(goal_id="g1", goal_text="compute two plus two")
+        
+        stub_server.content = json.dumps({"can_handle": True, "reason": "math", "best_tool": "calculate"})
+        first = await neuron.process(ctx)
+        assert first.startswith("TOOL_")
+        assert len(stub_server.requests) == 2  # capability, params
+        
+        ctx.retry_error = "expression is required"
+        stub_server.content = json.dumps({"expression": "2+2"})
+        retry = await neuron.process(ctx)
+        
+        assert retry == "4"
+        assert len(stub_server.requests) == 3
+        assert "expression is required" in stub_server.requests[-1]["messages"][-1]["content"]
+
+
+class TestGoalCoalescing:
+    """Test identical concurrent goals sharing one run."""
+    
+    @staticmethod
+    def _orchestrator(config, calls, coalesce=True):
+        config.goal_coalescing = True
+        orchestrator = _orchestrator(config)
+        
+        def send_kudos(athlete=""):
+            calls.append(athlete)
+            time.sleep(0.2)
+            return {"result": f"kudos sent to {athlete}"}
+        
+        orchestrator.tool_neuron.registry.register_function(
+            "send_kudos", send_kudos, "Give kudos", [{"name": "athlete", "type": "string"}], coalesce=coalesce
+        )
+        return orchestrator
+    
+    @pytest.mark.asyncio
+    async def test_identical_goals_share_one_run(self, stub_server):
+        """Concurrent identical goals run the tool once; others run on their own."""
+        calls = []
+        orchestrator = self._orchestrator(_config(stub_server), calls)
+        
+        results = await asyncio.gather(
+            orchestrator.process("Use send_kudos with athlete=ann"),
+            orchestrator.process("use send_kudos with athlete=ann."),
+            orchestrator.process("Use send_kudos with athlete=bob"),
+        )
+        
+        assert calls == ["ann", "bob"] or calls == ["bob", "ann"]
+        assert results[1]["coalesced"] is True
+        assert results[1]["goal_id"] == results[0]["goal_id"]
+        assert results[1]["result"] == "kudos sent to ann"
+        assert "coalesced" not in results[2]
+        
+        # Finished goals are not shared without a window
+        await orchestrator.process("Use send_kudos with athlete=ann")
+        assert len(calls) == 3
+    
+    @pytest.mark.asyncio
+    async def test_side_effecting_tools_never_coalesce(self, stub_server):
+        """A tool with coalesce=False runs once per goal."""
+        calls = []
+        orchestrator = self._orchestrator(_config(stub_server), calls, coalesce=False)
+        
+        results = await asyncio.gather(*[orchestrator.process("Use send_kudos with athlete=ann") for _ in range(2)])
+        
+        assert calls == ["ann", "ann"]
+        assert results[0]["goal_id"] != results[1]["goal_id"]
+
+
+class TestDeadlines:
+    """Test optional stages being dropped near a goal's deadline."""
+    
+    @pytest.mark.asyncio
+    async def test_interpretation_dropped_near_deadline(self, stub_server):
+        """With little time left, the tool output is returned without the LLM."""
+        config = _config(stub_server)
+        config.output_mode = "llm"
+        config.deadline_stage_reserve = 10.0
+        orchestrator = _orchestrator(config)
+        
+        result = await orchestrator.process("Use calculate with expression=6*7", output_mode="llm", deadline=time.monotonic() + 5)
+        
+        assert result["result"] == "42"
+        assert result["dropped_stages"] == ["interpret"]
+        assert stub_server.requests == []
+    
+    @pytest.mark.asyncio
+    async def test_retry_dropped_near_deadline(self, stub_server):
+        """A failing tool is not retried when the deadline is close."""
+        from neural_engine.v2.core.base import NeuronResult
+        
+        config = _config(stub_server)
+        orchestrator = _orchestrator(
+            config,
+            generative_neuron=MagicMock(run=AsyncMock(return_value=NeuronResult(success=True, data="fallback"))),
+        )
+        orchestrator.tool_neuron.recovery.analyze_failure = MagicMock(
+            return_value=MagicMock(action="retry", reason="flaky", context={})
+        )
+        orchestrator.tool_neuron.registry.register_function("flaky", lambda: {"error": "try again"}, "Flaky tool")
+        
+        result = await orchestrator.process("Use flaky", deadline=time.monotonic() + 1)
+        
+        assert result["result"] == "fallback"
+        assert result["dropped_stages"] == ["retry"]
+
+
+class TestPlanning:
+    """Test compound goals run as a DAG of concurrent sub-goals."""
+    
+    @staticmethod
+    def _orchestrator(config, plan, calls):
+        from neural_engine.v2.core.base import NeuronResult
+        
+        orchestrator = _orchestrator(
+            config,
+            intent_neuron=MagicMock(run=AsyncMock(return_value=NeuronResult(success=True, data="tool"))),
+            planner_neuron=MagicMock(run=AsyncMock(return_value=NeuronResult(success=True, data=plan)), cache=None),
+        )
+        
+        def report(name=""):
+            calls.append((name, time.monotonic()))
+            time.sleep(0.3)
+            return {"result": f"{name} report"}
+        
+        orchestrator.tool_neuron.registry.register_function(
+            "report", report, "Fetch a report", [{"name": "name", "type": "string"}], renderer="{result}"
+        )
+        return orchestrator
+    
+    @pytest.mark.asyncio
+    async def test_independent_steps_run_concurrently(self, stub_server):
+        """Wall time is the critical path, and results are merged in plan order."""
+        from neural_engine.v2.neurons import Plan
+        
+        plan = Plan.from_dict({"steps": [
+            {"id": "s1", "goal": "Use report with name=runs", "depends_on": []},
+            {"id": "s2", "goal": "Use report with name=rides", "depends_on": []},
+            {"id": "s3", "goal": "Use report with name=swims", "depends_on": []},
+        ]})
+        calls = []
+        orchestrator = self._orchestrator(_config(stub_server), plan, calls)
+        
+        started = time.monotonic()
+        result = await orchestrator.process("Get my runs, rides and swims reports", output_mode="rendered")
+        
+        assert result["success"] is True
+        assert time.monotonic() - started < 0.8
+        assert [s["result"] for s in result["steps"]] == ["runs report", "rides report", "swims report"]
+        assert result["result"].index("runs report") < result["result"].index("swims report")
+        assert stub_server.requests == []
+    
+    @pytest.mark.asyncio
+    async def test_dependencies_run_first(self, stub_server):
+        """A step starts only after the steps it depends on; concurrency is bounded."""
+        from neural_engine.v2.neurons import Plan
+        
+        plan = Plan.from_dict({"steps": [
+            {"id": "s3", "goal": "Use report with name=summary", "depends_on": ["s1", "s2"]},
+            {"id": "s1", "goal": "Use report with name=runs", "depends_on": []},
+            {"id": "s2", "goal": "Use report with name=rides", "depends_on": []},
+        ]})
+        config = _config(stub_server)
+        config.plan_concurrency = 1
+        calls = []
+        orchestrator = self._orchestrator(config, plan, calls)
+        
+        result = await orchestrator.process("Get my runs and rides reports, then summarize", output_mode="rendered")
+        
+        assert result["success"] is True
+        assert [name for name, _ in calls] == ["runs", "rides", "summary"]
+        assert calls[1][1] - calls[0][1] >= 0.3  # One at a time
+    
+    def test_rejects_cycles(self):
+        """A plan must be a DAG."""
+        from neural_engine.v2.neurons import Plan
+        
+        with pytest.raises(ValueError):
+            Plan.from_dict({"steps": [
+                {"id": "s1", "goal": "a", "depends_on": ["s2"]},
+                {"id": "s2", "goal": "b", "depends_on": ["s1"]},
+            ]})
+    
+    @pytest.mark.asyncio
+    async def test_cached_plan_reused_for_similar_goal(self):
+        """A goal differing in a word reuses the plan with that word swapped."""
+        from neural_engine.v2.neurons import Plan, PlanCache
+        
+        cache = PlanCache(FakeRedis())
+        await cache.store("Get my last 5 runs and my last 5 rides", Plan.from_dict({"steps": [
+            {"id": "s1", "goal": "Get my last 5 runs", "depends_on": []},
+            {"id": "s2", "goal": "Get my last 5 rides", "depends_on": []},
+        ]}))
+        
+        plan = await cache.lookup("Get my last 10 runs and my last 10 rides")
+        
+        assert [s.goal for s in plan.steps] == ["Get my last 10 runs", "Get my last 10 rides"]
+        assert await cache.lookup("Summarize my week and email it to me") is None
+        
+        # "5" changed once but kept once: replacing it everywhere would be wrong
+        assert await cache.lookup("Get my last 10 runs and my last 5 rides") is None
+        
+        # Steps reworded by the planner: the changed word is not in them
+        await cache.store("Delete my 3 runs and my 3 rides", Plan.from_dict({"steps": [
+            {"id": "s1", "goal": "Remove recent runs", "depends_on": []},
+            {"id": "s2", "goal": "Remove recent rides", "depends_on": []},
+        ]}))
+        assert await cache.lookup("Show my 3 runs and my 3 rides") is None
+
+
+class TestBatch:
+    """Test process_many: bounded concurrency, shared runs, streamed results."""
+    
+    @staticmethod
+    def _orchestrator(config, calls):
+        orchestrator = _orchestrator(config)
+        
+        def report(name=""):
+            calls.append(name)
+            time.sleep(0.2)
+            return {"result": f"{name} report"}
+        
+        orchestrator.tool_neuron.registry.register_function(
+            "report", report, "Fetch a report", [{"name": "name", "type": "string"}], renderer="{result}"
+        )
+        return orchestrator
+    
+    @pytest.mark.asyncio
+    async def test_results_streamed_as_completed(self, stub_server):
+        """Every goal yields one result with its index; identical goals run once."""
+        calls = []
+        orchestrator = self._orchestrator(_config(stub_server), calls)
+        goals = [
+            "Use report with name=runs",
+            "Use report with name=rides",
+            "use report with name=runs",
+            "Use report with name=swims",
+        ]
+        
+        started = time.monotonic()
+        results = [r async for r in orchestrator.process_many(goals, concurrency=2, output_mode="rendered")]
+        
+        assert sorted(r["index"] for r in results) == [0, 1, 2, 3]
+        assert {r["index"]: r["result"] for r in results}[2] == "runs report"
+        assert sorted(calls) == ["rides", "runs", "swims"]
+        assert [r["index"] for r in results if r.get("coalesced")] == [2]
+        assert 0.4 <= time.monotonic() - started < 0.8  # Two at a time
+    
+    @pytest.mark.asyncio
+    async def test_closing_cancels_remaining_goals(self, stub_server):
+        """Goals not yet started never run once the caller stops reading."""
+        calls = []
+        orchestrator = self._orchestrator(_config(stub_server), calls)
+        goals = [f"Use report with name=r{i}" for i in range(4)]
+        
+        results = orchestrator.process_many(goals, concurrency=1, output_mode="rendered")
+        first = await results.__anext__()
+        await results.aclose()
+        await asyncio.sleep(0.3)
+        
+        assert first["success"] is True
+        assert len(calls) <= 2
+    
+    @pytest.mark.asyncio
+    async def test_batch_runs_not_shared_with_other_callers(self, stub_server):
+        """Identical goals share a run within the batch, never with process() callers."""
+        calls = []
+        config = _config(stub_server)
+        config.goal_coalescing = True
+        orchestrator = self._orchestrator(config, calls)
+        goals = ["Use report with name=runs", "use report with name=runs"]
+        
+        async def batch():
+            return [r async for r in orchestrator.process_many(goals, output_mode="rendered")]
+        
+        results, single = await asyncio.gather(
+            batch(), orchestrator.process("Use report with name=runs", output_mode="rendered")
+        )
+        
+        assert calls == ["runs", "runs"]  # Once for the batch, once for the caller
+        assert [r["index"] for r in results if r.get("coalesced")] in ([0], [1])
+        assert not single.get("coalesced")
+    
+    @pytest.mark.asyncio
+    async def test_goal_that_raises_yields_error_result(self, stub_server):
+        """A goal whose processing raises still yields one (failed) result."""
+        calls = []
+        orchestrator = self._orchestrator(_config(stub_server), calls)
+        process = orchestrator._process
+        
+        async def flaky(goal, *args):
+            if "broken" in goal:
+                raise RuntimeError("thought store down")
+            return await process(goal, *args)
+        
+        orchestrator._process = flaky
+        goals = ["Use report with name=runs", "Use report with name=broken"]
+        
+        async def collect():
+            return [r async for r in orchestrator.process_many(goals, output_mode="rendered")]
+        
+        results = await asyncio.wait_for(collect(), timeout=5)  # Used to hang
+        
+        by_index = {r["index"]: r for r in results}
+        assert by_index[0]["success"] is True
+        assert by_index[1]["success"] is False
+        assert "thought store down" in by_index[1]["error"]
+        assert by_index[1]["goal"] == goals[1] and by_index[1]["goal_id"]
@@ -6,6 +6,7 @@ Tests periodic execution, state persistence, conditions, and self-modification.
 
 import pytest
 import asyncio
+import time
 from datetime import datetime, timedelta
 from unittest.mock import Mock, AsyncMock
 
@@ -200,6 +201,66 @@ class TestScheduler:
         assert run.skipped is False
         assert run.result == {"success": True, "result": "done"}
     
+    @pytest.mark.asyncio
+    async def test_run_passes_tool_and_params(self, scheduler):
+        """Goals naming a tool hand it and its params to the executor."""
+        goal = ScheduledGoal(
+            id="kudos",
+            goal="Use strava_reciprocate_kudos with count=30",
+            tool="strava_reciprocate_kudos",
+            params={"count": 30},
+        )
+        await scheduler.add_goal(goal)
+        
+        await scheduler.run_now("kudos")
+        
+        scheduler._executor.assert_called_once_with(
+            "Use strava_reciprocate_kudos with count=30",
+            tool="strava_reciprocate_kudos",
+            params={"count": 30},
+        )
+    
+    @pytest.mark.asyncio
+    async def test_run_passes_deadline(self, scheduler):
+        """Goals with a timeout hand the executor a deadline."""
+        await scheduler.add_goal(ScheduledGoal(id="bounded", goal="Summarize", timeout=30))
+        
+        before = time.monotonic()
+        await scheduler.run_now("bounded")
+        
+        deadline = scheduler._executor.call_args.kwargs["deadline"]
+        assert before + 30 <= deadline <= time.monotonic() + 30
+    
+    @pytest.mark.asyncio
+    async def test_run_with_single_argument_executor(self):
+        """Executors taking only the goal text still run tool and timeout goals."""
+        seen = []
+        scheduler = Scheduler(executor=lambda goal: seen.append(goal) or {"success": True})
+        await scheduler.add_goal(ScheduledGoal(
+            id="kudos", goal="Use strava_reciprocate_kudos with count=30",
+            tool="strava_reciprocate_kudos", params={"count": 30}, timeout=30,
+        ))
+        
+        run = await scheduler.run_now("kudos")
+        
+        assert run.success is True
+        assert seen == ["Use strava_reciprocate_kudos with count=30"]
+    
+    @pytest.mark.asyncio
+    async def test_run_sets_output_mode(self):
+        """Scheduled goals render tool results without the LLM by default."""
+        from neural_engine.v2.core import current_output_mode
+        
+        modes = []
+        scheduler = Scheduler(executor=lambda goal: modes.append(current_output_mode()) or {"success": True})
+        await scheduler.add_goal(ScheduledGoal(id="default", goal="Default"))
+        await scheduler.add_goal(ScheduledGoal(id="prose", goal="Prose", output_mode="llm"))
+        
+        await scheduler.run_now("default")
+        await scheduler.run_now("prose")
+        
+        assert modes == ["rendered", "llm"]
+    
     @pytest.mark.asyncio
     async def test_run_updates_state(self, scheduler):
         """Running updates goal state."""
@@ -0,0 +1,539 @@
+"""
+Telemetry Tests - Events and thoughts in Redis, against an in-memory fake.
+
+Covers the buffered writer that keeps event and thought writes off the
+goal's path, the per-goal event index, consumer groups, thought
+retention and archiving, and the compact event and thought encoding.
+"""
+
+import time
+import asyncio
+import pytest
+
+
+class FakePipeline:
+    """Queues commands and runs them against FakeRedis on execute()."""
+    
+    def __init__(self, redis):
+        self._redis = redis
+        self._commands = []
+    
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self._commands.append((name, args, kwargs))
+            return self
+        return queue
+    
+    async def execute(self):
+        await self._redis.before_execute()
+        self._redis.pipelines += 1
+        return [await getattr(self._redis, name)(*args, **kwargs) for name, args, kwargs in self._commands]
+
+
+def _order(stream_id):
+    return tuple(int(part) for part in stream_id.split("-"))
+
+
+class FakeRedis:
+    """Dict-backed stand-in for the stream, hash and sorted-set calls telemetry uses."""
+    
+    def __init__(self):
+        self.streams = {}
+        self.hashes = {}
+        self.zsets = {}
+        self.ttls = {}
+        self.groups = {}  # (stream, group) -> {"last": id, "pending": {id: [consumer, delivered_ms]}}
+        self.commands = []  # Names of the commands run, in order
+        self.pipelines = 0
+        self._last_ms = 0
+        self._seq = 0
+    
+    async def before_execute(self):
+        """Hook for slow or failing Redis."""
+    
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+    
+    async def xadd(self, key, fields, maxlen=None, approximate=True):
+        self.commands.append("xadd")
+        ms = int(time.time() * 1000)
+        if ms <= self._last_ms:
+            self._seq += 1
+        else:
+            self._last_ms, self._seq = ms, 0
+        stream_id = f"{self._last_ms}-{self._seq}"
+        entries = self.streams.setdefault(key, [])
+        entries.append((stream_id, {k: str(v) for k, v in fields.items()}))
+        if maxlen:
+            del entries[:-maxlen]
+        return stream_id
+    
+    async def xrevrange(self, key, max="+", min="-", count=None):
+        self.commands.append("xrevrange")
+        return list(reversed(self.streams.get(key, [])))[:count]
+    
+    async def xgroup_create(self, key, group, id="$", mkstream=False):
+        from redis.exceptions import ResponseError
+        
+        if (key, group) in self.groups:
+            raise ResponseError("BUSYGROUP Consumer Group name already exists")
+        entries = self.streams.setdefault(key, [])
+        last = entries[-1][0] if id == "$" and entries else "0-0"
+        self.groups[(key, group)] = {"last": last, "pending": {}}
+    
+    async def xreadgroup(self, group, consumer, streams, count=None, block=None):
+        self.commands.append("xreadgroup")
+        results = []
+        for key, from_id in streams.items():
+            state = self.groups[(key, group)]
+            entries = dict(self.streams.get(key, []))
+            if from_id == ">":
+                ids = [i for i in entries if _order(i) > _order(state["last"])][:count]
+                if ids:
+                    state["last"] = ids[-1]
+                for i in ids:
+                    state["pending"][i] = [consumer, time.time() * 1000]
+            else:
+                ids = sorted(
+                    (i for i, (owner, _) in state["pending"].items() if owner == consumer and _order(i) > _order(from_id)),
+                    key=_order,
+                )[:count]
+            if ids:
+                results.append([key, [(i, dict(entries[i]) if i in entries else None) for i in ids]])
+        if not results and block:
+            await asyncio.sleep(0.01)
+        return results
+    
+    async def xack(self, key, group, *ids):
+        self.commands.append("xack")
+        pending = self.groups[(key, group)]["pending"]
+        return sum(pending.pop(i, None) is not None for i in ids)
+    
+    async def xautoclaim(self, key, group, consumer, min_idle_time, start_id="0-0", count=None):
+        self.commands.append("xautoclaim")
+        pending = self.groups[(key, group)]["pending"]
+        entries = dict(self.streams.get(key, []))
+        now = time.time() * 1000
+        ids = sorted(
+            (i for i, (_, delivered) in pending.items() if now - delivered >= min_idle_time and _order(i) >= _order(start_id)),
+            key=_order,
+        )[:count]
+        for i in ids:
+            pending[i] = [consumer, now]
+        return ["0-0", [(i, dict(entries[i]) if i in entries else None) for i in ids], []]
+    
+    async def hset(self, key, field=None, value=None, mapping=None):
+        self.commands.append("hset")
+        self.hashes.setdefault(key, {}).update(mapping or {field: value})
+    
+    async def hget(self, key, field):
+        self.commands.append("hget")
+        return self.hashes.get(key, {}).get(field)
+    
+    async def hgetall(self, key):
+        self.commands.append("hgetall")
+        return dict(self.hashes.get(key, {}))
+    
+    async def hmget(self, key, keys):
+        self.commands.append("hmget")
+        return [self.hashes.get(key, {}).get(k) for k in keys]
+    
+    async def zadd(self, key, mapping):
+        self.commands.append("zadd")
+        self.zsets.setdefault(key, {}).update(mapping)
+    
+    async def expire(self, key, seconds):
+        self.commands.append("expire")
+        self.ttls[key] = seconds
+    
+    async def zrangebyscore(self, key, min, max, start=None, num=None):
+        low = float(min) if min != "-inf" else float("-inf")
+        members = sorted((score, m) for m, score in self.zsets.get(key, {}).items() if low <= score <= float(max))
+        return [m for _, m in members][start or 0:(start or 0) + num if num else None]
+    
+    async def zrangebylex(self, key, min, max):
+        self.commands.append("zrangebylex")
+        
+        def within(m):
+            low = m >= min[1:] if min[0] == "[" else m > min[1:]
+            high = m <= max[1:] if max[0] == "[" else m < max[1:]
+            return low and high
+        return sorted(m for m in self.zsets.get(key, {}) if within(m))
+    
+    async def exists(self, *keys):
+        return sum(key in self.hashes or key in self.zsets or key in self.streams for key in keys)
+    
+    async def zremrangebyscore(self, key, min, max):
+        await asyncio.gather(*(self.zrem(key, m) for m in await self.zrangebyscore(key, min, max)))
+    
+    async def zremrangebyrank(self, key, start, end):
+        members = sorted(self.zsets.get(key, {}), key=self.zsets.get(key, {}).get)
+        end = len(members) + end if end < 0 else end
+        for m in members[start:end + 1]:
+            self.zsets[key].pop(m)
+    
+    async def zrem(self, key, *members):
+        for m in members:
+            self.zsets.get(key, {}).pop(m, None)
+    
+    async def delete(self, *keys):
+        for key in keys:
+            self.hashes.pop(key, None)
+            self.streams.pop(key, None)
+            self.zsets.pop(key, None)
+            self.ttls.pop(key, None)
+
+
+class FakeStorage:
+    """StorageClient stand-in (namespace, key) -> value."""
+    
+    def __init__(self):
+        self.data = {}
+    
+    def get(self, namespace, key, default=None):
+        return self.data.get((namespace, key), default)
+    
+    def set(self, namespace, key, value, ttl_seconds=None):
+        self.data[(namespace, key)] = value
+        return True
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    from neural_engine.v2.core import metrics
+    metrics.reset()
+
+
+class TestTelemetryWriter:
+    """Test buffered, pipelined event and thought writes."""
+    
+    @pytest.mark.asyncio
+    async def test_writes_batched_into_one_pipeline(self):
+        """Emits and thoughts return without Redis; a flush sends them together."""
+        from neural_engine.v2.core import TelemetryWriter, EventBus, EventType, ThoughtTree
+        
+        redis = FakeRedis()
+        writer = TelemetryWriter(redis)
+        bus = EventBus(redis, writer=writer)
+        tree = ThoughtTree(redis, writer=writer)
+        
+        await tree.create_root("g1", "What is 2+2?")
+        for _ in range(3):
+            await bus.emit(event_type=EventType.NEURON_START, source="intent", goal_id="g1")
+        await tree.complete("g1", "4")
+        
+        assert redis.commands == []
+        assert writer.queue_depth == 5
+        
+        await writer.flush()
+        
+        assert redis.pipelines == 1
+        assert redis.commands == ["hset", "zadd"] + ["xadd", "xadd"] * 3 + ["hset"]
+        root = await tree.get_root("g1")
+        assert root.status == "completed"
+        assert root.metadata["result"] == "4"
+    
+    @pytest.mark.asyncio
+    async def test_overflow_policies(self):
+        """A full queue drops the oldest or the newest write, and counts it."""
+        from neural_engine.v2.core import TelemetryWriter, EventBus, EventType, metrics
+        
+        for overflow, kept in [("drop_oldest", ["n2", "n3"]), ("drop_newest", ["n0", "n1"])]:
+            redis = FakeRedis()
+            writer = TelemetryWriter(redis, max_queue=2, overflow=overflow)
+            bus = EventBus(redis, writer=writer)
+            
+            for i in range(4):
+                await bus.emit(event_type=EventType.NEURON_START, source=f"n{i}", goal_id="g1")
+            await writer.flush()
+            
+            assert [fields["n"] for _, fields in redis.streams[bus.STREAM_KEY]] == kept
+        
+        assert metrics.counter("telemetry_dropped", reason="overflow").value == 4
+        
+        with pytest.raises(ValueError):
+            TelemetryWriter(FakeRedis(), overflow="block")
+    
+    @pytest.mark.asyncio
+    async def test_slow_redis_never_blocks_emit(self):
+        """Emits return at once while a batch is stuck in Redis."""
+        from neural_engine.v2.core import TelemetryWriter, EventBus, EventType
+        
+        redis = FakeRedis()
+        release = asyncio.Event()
+        
+        async def stuck():
+            await release.wait()
+        
+        redis.before_execute = stuck
+        writer = TelemetryWriter(redis, batch_size=2)
+        bus = EventBus(redis, writer=writer)
+        
+        await bus.emit(event_type=EventType.GOAL_START, source="orchestrator", goal_id="g1")
+        await asyncio.sleep(0.01)  # Background batch now waiting on Redis
+        
+        started = time.monotonic()
+        for _ in range(100):
+            await bus.emit(event_type=EventType.NEURON_START, source="intent", goal_id="g1")
+        assert time.monotonic() - started < 0.1
+        
+        release.set()
+        await writer.close()
+        assert len(redis.streams[bus.STREAM_KEY]) == 101
+
+
+class TestGoalEventIndex:
+    """Test event lookup by goal through the per-goal streams."""
+    
+    @pytest.mark.asyncio
+    async def test_goal_events_survive_other_traffic(self):
+        """A goal's events are found however many events landed since."""
+        from neural_engine.v2.core import EventBus, EventType, ThoughtTree
+        
+        redis = FakeRedis()
+        bus = EventBus(redis, goal_ttl=3600)
+        
+        await bus.emit(event_type=EventType.GOAL_START, source="orchestrator", goal_id="g1")
+        await bus.emit(event_type=EventType.NEURON_START, source="intent", goal_id="g1")
+        for i in range(300):
+            await bus.emit(event_type=EventType.NEURON_START, source="intent", goal_id=f"other{i}")
+        redis.commands.clear()
+        
+        events = await bus.get_events(goal_id="g1", limit=10)
+        intent = await bus.get_events(goal_id="g1", neuron_type="intent")
+        
+        assert [e.event_type for e in events] == [EventType.NEURON_START, EventType.GOAL_START]
+        assert [e.neuron_type for e in intent] == ["intent"]
+        assert redis.commands == ["xrevrange", "xrevrange"]
+        assert redis.ttls[f"{bus.GOAL_STREAM_PREFIX}g1"] == 3600
+        
+        tree = ThoughtTree(redis, ttl_seconds=3600)
+        await tree.create_root("g1", "What is 2+2?")
+        assert redis.ttls[f"{tree.KEY_PREFIX}g1"] == 3600
+    
+    def test_from_config_reads_and_writes_one_redis(self):
+        """The bus reads from the configured Redis the writer sends to."""
+        from neural_engine.v2.core import Config, EventBus
+        
+        config = Config.for_testing()
+        config.redis_host, config.redis_port = "events.internal", 6390
+        bus = EventBus.from_config(config)
+        
+        assert bus._redis is config._ensure_redis() is bus._writer._redis
+        assert bus._redis.connection_pool.connection_kwargs["host"] == "events.internal"
+
+
+class TestConsumerGroups:
+    """Test sharing the event stream between the consumers of a group."""
+    
+    @staticmethod
+    async def _emit(bus, n):
+        from neural_engine.v2.core import EventType
+        
+        for i in range(n):
+            await bus.emit(event_type=EventType.NEURON_START, source=f"n{i}", goal_id="g1")
+    
+    @pytest.mark.asyncio
+    async def test_consumers_share_the_stream(self):
+        """Each event goes to one consumer; acknowledged events are done."""
+        from neural_engine.v2.core import EventBus
+        
+        redis = FakeRedis()
+        bus = EventBus(redis)
+        await bus.ensure_group("archive", start_id="0")
+        await bus.ensure_group("archive")  # Already there
+        await self._emit(bus, 10)
+        
+        first = await bus.consume("archive", "w1", batch_size=6).__anext__()
+        second = await bus.consume("archive", "w2", batch_size=6).__anext__()
+        
+        assert [e.neuron_type for e in first + second] == [f"n{i}" for i in range(10)]
+        assert {e.neuron_type for e in first}.isdisjoint(e.neuron_type for e in second)
+        
+        await bus.ack("archive", *[e.event_id for e in first + second])
+        assert redis.groups[(bus.STREAM_KEY, "archive")]["pending"] == {}
+    
+    @pytest.mark.asyncio
+    async def test_pending_events_recovered(self):
+        """Unacknowledged events come back to the consumer, or are claimed by another."""
+        from neural_engine.v2.core import EventBus
+        
+        redis = FakeRedis()
+        bus = EventBus(redis, claim_idle_ms=50)
+        await bus.ensure_group("metrics", start_id="0")
+        await self._emit(bus, 3)
+        
+        lost = await bus.consume("metrics", "w1").__anext__()  # w1 crashes before ack
+        again = await bus.consume("metrics", "w1").__anext__()  # w1 restarts
+        assert [e.event_id for e in again] == [e.event_id for e in lost]
+        
+        await asyncio.sleep(0.06)
+        claimed = await bus.consume("metrics", "w2").__anext__()
+        assert [e.event_id for e in claimed] == [e.event_id for e in lost]
+        assert {owner for owner, _ in redis.groups[(bus.STREAM_KEY, "metrics")]["pending"].values()} == {"w2"}
+    
+    @pytest.mark.asyncio
+    async def test_process_group_acks_handled_batches(self):
+        """A batch is acknowledged once the handler returns, not when it raises."""
+        from neural_engine.v2.core import EventBus
+        
+        redis = FakeRedis()
+        bus = EventBus(redis)
+        await bus.ensure_group("learning", start_id="0")
+        await self._emit(bus, 4)
+        handled = []
+        
+        async def handler(events):
+            handled.append([e.neuron_type for e in events])
+            if len(handled) == 1:
+                raise RuntimeError("store down")
+        
+        worker = asyncio.create_task(bus.process_group("learning", "w1", handler, batch_size=2))
+        await asyncio.sleep(0.05)
+        worker.cancel()
+        
+        assert handled == [["n0", "n1"], ["n2", "n3"]]
+        pending = redis.groups[(bus.STREAM_KEY, "learning")]["pending"]
+        assert sorted(pending) == sorted(i for i, f in redis.streams[bus.STREAM_KEY][:2])
+
+
+class TestThoughtRetention:
+    """Test thought TTLs, index trimming and archiving of old trees."""
+    
+    @pytest.mark.asyncio
+    async def test_ttls_and_index_trimming(self):
+        """Failed trees are kept longer; the index keeps the newest goals."""
+        from neural_engine.v2.core import ThoughtTree
+        
+        redis = FakeRedis()
+        tree = ThoughtTree(redis, ttl_seconds=100, failed_ttl_seconds=1000, index_max_goals=2)
+        
+        for goal_id in ("g1", "g2", "g3"):
+            await tree.create_root(goal_id, "goal")
+        await tree.complete("g2", "done")
+        await tree.fail("g3", "boom")
+        
+        assert set(redis.zsets[tree.INDEX_KEY]) == {"g2", "g3"}
+        assert redis.ttls[f"{tree.KEY_PREFIX}g2"] == 100
+        assert redis.ttls[f"{tree.KEY_PREFIX}g3"] == 1000
+    
+    @pytest.mark.asyncio
+    async def test_compactor_archives_old_completed_trees(self):
+        """Old completed trees move to the archive and can still be read."""
+        from neural_engine.v2.core import ThoughtTree, ThoughtArchive, ThoughtCompactor
+        
+        redis = FakeRedis()
+        archive = ThoughtArchive(FakeStorage())
+        tree = ThoughtTree(redis, archive=archive)
+        
+        for goal_id in ("old_done", "old_failed", "new_done"):
+            await tree.create_root(goal_id, f"goal {goal_id}")
+            await tree.add_thought(f"root_{goal_id}", "intent processing", "action", goal_id=goal_id)
+        await tree.complete("old_done", "4")
+        await tree.fail("old_failed", "boom")
+        await tree.complete("new_done", "5")
+        
+        index = redis.zsets[tree.INDEX_KEY]
+        two_days_ago = time.time() - 48 * 3600
+        index.update({"old_done": two_days_ago, "old_failed": two_days_ago, "expired": two_days_ago})
+        
+        archived = await ThoughtCompactor(tree, archive, older_than_hours=24, batch_size=1).compact_once()
+        
+        assert archived == 1
+        assert set(index) == {"old_failed", "new_done"}
+        assert f"{tree.KEY_PREFIX}old_done" not in redis.hashes
+        
+        thoughts = await tree.get_thoughts("old_done")
+        assert [t.thought_type for t in thoughts] == ["goal", "action"]
+        root = await tree.get_root("old_done")
+        assert root.status == "completed"
+        assert root.metadata["result"] == "4"
+    
+    @pytest.mark.asyncio
+    async def test_cli_modes_start_compactor(self):
+        """Long-running CLI modes archive trees when thought_archive is on."""
+        from types import SimpleNamespace
+        from neural_engine.v2.cli import start_compactor
+        from neural_engine.v2.core import Config, ThoughtTree, ThoughtArchive
+        
+        config = Config.for_testing()
+        orchestrator = SimpleNamespace(thought_tree=ThoughtTree(FakeRedis(), archive=ThoughtArchive(FakeStorage())))
+        assert start_compactor(config, orchestrator) is None
+        
+        config.thought_archive = True
+        compactor = start_compactor(config, orchestrator)
+        assert compactor._task is not None and not compactor._task.done()
+        await compactor.stop()
+
+
+class TestCompactEncoding:
+    """Test the fixed-schema event and thought records and the children index."""
+    
+    @pytest.mark.asyncio
+    async def test_event_fields_and_previews(self):
+        """Events are short fields with a numeric timestamp; previews stay bounded."""
+        from neural_engine.v2.core import EventBus, EventType, Preview
+        
+        rendered = []
+        
+        class Output:
+            def __repr__(self):
+                rendered.append(self)
+                return "<output>"
+        
+        redis = FakeRedis()
+        bus = EventBus(redis)
+        output = [{"id": i, "text": "x" * 1000, "raw": Output()} for i in range(10000)]
+        
+        await bus.emit(event_type=EventType.NEURON_COMPLETE, source="tool", goal_id="g1",
+                       data={"result": Preview(output), "duration_ms": 12})
+        
+        _, fields = redis.streams[bus.STREAM_KEY][0]
+        assert set(fields) == {"t", "n", "g", "ts", "m"}
+        assert float(fields["ts"]) == pytest.approx(time.time(), abs=5)
+        assert len(fields["m"]) < 300
+        
+        # Entries in the older format are still read
+        redis.streams[bus.STREAM_KEY].append(("1-0", {
+            "event_type": "neuron_start", "neuron_type": "intent", "goal_id": "g1",
+            "timestamp": "2026-01-01T00:00:00+00:00", "metadata": '{"input": "hi"}', "event_id": "old",
+        }))
+        events = await bus.get_events(limit=10)
+        
+        assert [e.event_type for e in events] == [EventType.NEURON_START, EventType.NEURON_COMPLETE]
+        assert events[0].timestamp == 1767225600.0
+        assert events[0].metadata == {"input": "hi"}
+        assert events[1].metadata["result"].startswith("[{'id': 0, 'raw': <output>, 'text': 'xxx")
+        assert len(rendered) < 10  # Not the 10000 items
+        assert events[1].event_id == redis.streams[bus.STREAM_KEY][0][0]
+    
+    @pytest.mark.asyncio
+    async def test_children_index_walks(self):
+        """get_children and get_thoughts(parent_id) read only the subtree."""
+        import json
+        from neural_engine.v2.core import ThoughtTree
+        
+        redis = FakeRedis()
+        tree = ThoughtTree(redis, ttl_seconds=100)
+        root = await tree.create_root("g1", "goal")
+        plan = await tree.add_thought(root.thought_id, "plan", "reasoning")
+        step = await tree.add_thought(plan.thought_id, "step", "action", goal_id="g1")
+        await tree.add_thought(step.thought_id, "result", "result", goal_id="g1")
+        await tree.add_thought(root.thought_id, "answer", "result")
+        redis.commands.clear()
+        
+        children = await tree.get_children("g1", plan.thought_id)
+        below = await tree.get_thoughts("g1", parent_id=plan.thought_id)
+        
+        assert [t.content for t in children] == ["step"]
+        assert [t.content for t in below] == ["step", "result"]
+        assert "hgetall" not in redis.commands
+        assert redis.ttls[f"{tree.KEY_PREFIX}g1{tree.CHILDREN_SUFFIX}"] == 100
+        
+        # Trees stored before the index fall back to the whole tree
+        legacy = {"thought_id": "t1", "goal_id": "g2", "content": "old", "thought_type": "action",
+                  "parent_id": "root_g2", "timestamp": "2026-01-01T00:00:00+00:00", "metadata": {}, "status": "active"}
+        redis.hashes[f"{tree.KEY_PREFIX}g2"] = {"t1": json.dumps(legacy)}
+        
+        old = await tree.get_children("g2", "root_g2")
+        assert [(t.content, t.timestamp) for t in old] == [("old", 1767225600.0)]
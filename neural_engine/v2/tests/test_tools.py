@@ -31,6 +31,18 @@ class TestToolDefinition:
         assert "Does something" in text
 
 
+    def test_render_template_and_function(self):
+        """A renderer is a template over the result's fields or a function."""
+        from neural_engine.v2.tools import ToolDefinition
+        
+        template = ToolDefinition(name="t", description="", renderer="{count} kudos given")
+        function = ToolDefinition(name="f", description="", renderer=lambda r: f"{len(r['items'])} items")
+        
+        assert template.render({"count": 3}) == "3 kudos given"
+        assert function.render({"items": [1, 2]}) == "2 items"
+        assert ToolDefinition(name="n", description="").render({"count": 3}) is None
+
+
 class TestToolRegistry:
     """Test ToolRegistry."""
     
@@ -14,12 +14,23 @@ import importlib
 import inspect
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Dict, Any, List, Optional, Callable
+from typing import Dict, Any, List, Optional, Callable, Union
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+# Parameter type names used in definitions -> JSON schema types
+JSON_SCHEMA_TYPES = {
+    "string": "string", "str": "string",
+    "integer": "integer", "int": "integer",
+    "number": "number", "float": "number",
+    "boolean": "boolean", "bool": "boolean",
+    "array": "array", "list": "array",
+    "object": "object", "dict": "object",
+}
+
+
 @dataclass
 class ToolDefinition:
     """
@@ -43,6 +54,26 @@ class ToolDefinition:
     module_name: Optional[str] = None
     class_name: Optional[str] = None
     
+    # Output renderer: a str.format template over the result's fields
+    # ("{count} kudos given"; {result} is the whole result) or a function
+    # result -> str. Used by the "rendered" output mode instead of the LLM.
+    renderer: Optional[Union[str, Callable[[Any], str]]] = field(default=None, repr=False)
+    
+    # Whether identical concurrent goals may share one run of this tool
+    # (Config.goal_coalescing). False for side effects every request must cause.
+    coalesce: bool = True
+    
+    def render(self, result: Any) -> Optional[str]:
+        """Render a result with this tool's renderer (None if it has none)."""
+        if self.renderer is None:
+            return None
+        if callable(self.renderer):
+            return self.renderer(result)
+        
+        fields = dict(result) if isinstance(result, dict) else {}
+        fields.setdefault("result", result)
+        return self.renderer.format_map(fields)
+    
     def to_prompt_text(self) -> str:
         """Format for LLM prompts."""
         params_text = ", ".join([
@@ -50,6 +81,20 @@ class ToolDefinition:
             for p in self.parameters
         ])
         return f"- {self.name}({params_text}): {self.description}"
+    
+    def to_json_schema(self) -> Dict[str, Any]:
+        """JSON schema for this tool's arguments (for constrained decoding)."""
+        properties = {}
+        for p in self.parameters:
+            json_type = JSON_SCHEMA_TYPES.get(str(p.get("type", "")).lower())
+            properties[p["name"]] = {"type": json_type} if json_type else {}
+        
+        return {
+            "type": "object",
+            "properties": properties,
+            "required": [name for name in self.required_params if name in properties],
+            "additionalProperties": False,
+        }
 
 
 class Tool(ABC):
@@ -60,6 +105,10 @@ class Tool(ABC):
     - get_definition(): Return ToolDefinition
     - execute(**kwargs): Run the tool
     
+    execute() runs in a worker thread. Long-running tools can check
+    core.cancel.current_cancel_token() and return early once the goal
+    is cancelled or past its deadline.
+    
     Example:
         class MyTool(Tool):
             def get_definition(self):
@@ -102,13 +151,43 @@ class ToolRegistry:
     def __init__(self):
         self._tools: Dict[str, Tool] = {}
         self._definitions: Dict[str, ToolDefinition] = {}
+        self._listeners: List[Callable[[str, str], None]] = []
+    
+    def add_listener(self, callback: Callable[[str, str], None]) -> None:
+        """
+        Call callback(tool_name, event) when a tool changes.
+        
+        Events: registered, replaced (re-registered), unregistered,
+        retired (ToolForge).
+        """
+        self._listeners.append(callback)
+    
+    def notify_changed(self, name: str, event: str) -> None:
+        """Tell listeners a tool changed (listener errors are logged, not raised)."""
+        for callback in self._listeners:
+            try:
+                callback(name, event)
+            except Exception as e:
+                logger.warning(f"Tool listener failed for {name} ({event}): {e}")
     
     def register(self, tool: Tool) -> None:
         """Register a single tool."""
         definition = tool.get_definition()
+        replaced = definition.name in self._tools
         self._tools[definition.name] = tool
         self._definitions[definition.name] = definition
         logger.info(f"Registered tool: {definition.name}")
+        self.notify_changed(definition.name, "replaced" if replaced else "registered")
+    
+    def unregister(self, name: str) -> bool:
+        """Remove a tool. Returns False if it was not registered."""
+        if name not in self._tools:
+            return False
+        del self._tools[name]
+        self._definitions.pop(name, None)
+        logger.info(f"Unregistered tool: {name}")
+        self.notify_changed(name, "unregistered")
+        return True
     
     def register_function(
         self,
@@ -412,6 +491,7 @@ def create_builtin_tools(config) -> List[Tool]:
                 domain="memory",
                 concepts=["store", "save", "remember", "persist"],
                 synonyms=["remember that", "my name is", "save this"],
+                coalesce=False,  # Every "remember ..." request is stored
             )
         
         def execute(self, key: str = "", value: str = "", **kwargs):
@@ -986,6 +986,11 @@ class StravaCollectKudosGiversTool(Tool):
             domain="fitness",
             concepts=["strava", "kudos", "collect", "givers", "social", "track"],
             synonyms=["who gave me kudos", "track kudos givers", "collect kudos"],
+            renderer=(
+                "Checked {activities_checked} activities: {total_kudos_found} kudos, "
+                "{new_givers} new and {updated_givers} returning givers "
+                "({total_known_givers} known)."
+            ),
         )
     
     def execute(self, hours_back: int = 48, max_activities: int = 10, **kwargs) -> Dict[str, Any]:
@@ -1143,6 +1148,21 @@ class StravaListKudosGiversTool(Tool):
         }
 
 
+def _render_reciprocate_kudos(result: Dict[str, Any]) -> str:
+    """One line per kudos given (or that would be, in a dry run)."""
+    dry_run = result.get("dry_run")
+    kudos = result.get("would_kudos" if dry_run else "kudos_given", [])
+    verb = "Would give" if dry_run else "Gave"
+    
+    lines = [
+        f"{verb} {len(kudos)} kudos ({result.get('activities_checked', 0)} activities checked, "
+        f"{result.get('already_kudoed', 0)} already kudoed, {len(result.get('failed', []))} failed)."
+    ]
+    for k in kudos:
+        lines.append(f"- {k.get('athlete')}: {k.get('activity')} ({k.get('their_kudos_to_you', 0)} kudos to you)")
+    return "\n".join(lines)
+
+
 class StravaReciprocateKudosTool(Tool):
     """
     Automatically give kudos to athletes who have given you kudos.
@@ -1176,6 +1196,7 @@ class StravaReciprocateKudosTool(Tool):
             domain="fitness",
             concepts=["strava", "kudos", "reciprocate", "auto", "give back"],
             synonyms=["reciprocate kudos", "give kudos back", "auto kudos", "kudos exchange"],
+            renderer=_render_reciprocate_kudos,
         )
     
     def execute(self, count: int = 20, max_age_hours: int = None, dry_run: bool = False, **kwargs) -> Dict[str, Any]:
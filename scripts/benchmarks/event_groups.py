@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Event Consumer Group Benchmark - Throughput of sharing the event stream.
+
+Fills a scratch stream with synthetic events, then drains it with a
+consumer group of 1..N worker processes (each reading batches and
+acknowledging them, as EventBus.process_group does), and reports events
+per second for each worker count and batch size. A plain XREAD reader
+(EventBus.subscribe) is measured as the baseline.
+
+Runs against a local Redis and only touches its own keys (deleted after).
+
+Usage:
+  python scripts/benchmarks/event_groups.py --redis localhost:6379
+  python scripts/benchmarks/event_groups.py --events 50000 --workers 1,2,4 --batch 10,100,500
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import multiprocessing
+
+import redis.asyncio as redis
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from neural_engine.v2.core import EventBus, EventType
+
+
+class BenchBus(EventBus):
+    """EventBus on a scratch stream, so real events are left alone."""
+    STREAM_KEY = "bench:events"
+    GOAL_STREAM_PREFIX = "bench:events:goal:"
+    MAX_LEN = 10_000_000
+
+
+def connect(address: str) -> redis.Redis:
+    host, _, port = address.partition(":")
+    return redis.Redis(host=host, port=int(port or 6379), decode_responses=True)
+
+
+async def fill(address: str, events: int) -> None:
+    r = connect(address)
+    await r.delete(BenchBus.STREAM_KEY)
+    bus = BenchBus(r)
+    for start in range(0, events, 1000):
+        pipe = r.pipeline(transaction=False)
+        for i in range(start, min(start + 1000, events)):
+            fields = {"event_type": EventType.NEURON_COMPLETE.value, "neuron_type": "intent", "goal_id": f"g{i % 500}",
+                      "metadata": '{"result": "tool", "duration_ms": 12}'}
+            pipe.xadd(bus.STREAM_KEY, fields)
+        await pipe.execute()
+    await r.aclose()
+
+
+async def drain(address: str, group: str, consumer: str, batch: int, total: int, done) -> None:
+    """Consume and ack until the group has handled `total` events."""
+    bus = BenchBus(connect(address))
+    async for events in bus.consume(group, consumer, batch_size=batch, block_ms=100):
+        await bus.ack(group, *[e.event_id for e in events])
+        with done.get_lock():
+            done.value += len(events)
+        if done.value >= total:
+            break
+
+
+def worker(address: str, group: str, consumer: str, batch: int, total: int, done) -> None:
+    async def run():
+        task = asyncio.create_task(drain(address, group, consumer, batch, total, done))
+        while not task.done() and done.value < total:
+            await asyncio.sleep(0.01)
+        task.cancel()
+    asyncio.run(run())
+
+
+def run_group(address: str, workers: int, batch: int, total: int) -> float:
+    """Seconds for `workers` processes in a fresh group to handle every event."""
+    group = f"bench-{workers}-{batch}-{time.monotonic_ns()}"
+    asyncio.run(BenchBus(connect(address)).ensure_group(group, start_id="0"))
+    
+    done = multiprocessing.Value("i", 0)
+    processes = [
+        multiprocessing.Process(target=worker, args=(address, group, f"w{i}", batch, total, done))
+        for i in range(workers)
+    ]
+    started = time.perf_counter()
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
+    return time.perf_counter() - started
+
+
+async def run_subscribe(address: str, total: int) -> float:
+    """Seconds for one XREAD subscriber to see every event."""
+    bus = BenchBus(connect(address))
+    seen = 0
+    started = time.perf_counter()
+    async for _ in bus.subscribe(last_id="0"):
+        seen += 1
+        if seen >= total:
+            break
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--redis", default=os.environ.get("REDIS_ADDRESS", "localhost:6379"), help="host:port")
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker process counts")
+    parser.add_argument("--batch", default="10,100", help="Comma-separated batch sizes")
+    args = parser.parse_args()
+    
+    asyncio.run(fill(args.redis, args.events))
+    try:
+        seconds = asyncio.run(run_subscribe(args.redis, args.events))
+        print(f"{'reader':22} {'batch':>6} {'seconds':>8} {'events/s':>10}")
+        print(f"{'subscribe (XREAD)':22} {10:6} {seconds:8.2f} {args.events / seconds:10.0f}")
+        
+        for batch in (int(b) for b in args.batch.split(",")):
+            for workers in (int(w) for w in args.workers.split(",")):
+                seconds = run_group(args.redis, workers, batch, args.events)
+                label = f"group x{workers}"
+                print(f"{label:22} {batch:6} {seconds:8.2f} {args.events / seconds:10.0f}")
+    finally:
+        async def cleanup():
+            r = connect(args.redis)
+            await r.delete(BenchBus.STREAM_KEY)
+            await r.aclose()
+        asyncio.run(cleanup())
+
+
+if __name__ == "__main__":
+    main()
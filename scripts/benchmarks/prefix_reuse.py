@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Prefix Reuse Benchmark - Prefill cost of one goal's pipeline stages.
+
+Sends the stage prompts of a goal (intent, capability, selection, params,
+interpretation) to llama.cpp twice:
+
+  cold   - cache_prompt off: every stage prefills its whole prompt
+  reuse  - cache_prompt on and the goal pinned to one slot (id_slot):
+           the shared goal prefix is prefilled once
+
+and reports llama.cpp's own timings (prompt_n tokens, prompt_ms).
+
+Usage:
+  python scripts/benchmarks/prefix_reuse.py --url http://localhost:8080/v1
+  python scripts/benchmarks/prefix_reuse.py --dry-run   # No server: prompt sizes only
+"""
+
+import os
+import sys
+import uuid
+import asyncio
+import argparse
+import aiohttp
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from neural_engine.v2.core import Config, GoalContext
+from neural_engine.v2.neurons import ToolNeuron
+from neural_engine.v2.neurons.intent import INTENT_PROMPT
+from neural_engine.v2.neurons.tools import (
+    TOOL_CAPABILITY_PROMPT,
+    TOOL_SELECTION_PROMPT,
+    PARAM_EXTRACTION_PROMPT,
+)
+
+GOALS = [
+    "What is 1234 * 5678?",
+    "Calculate the square root of 7921",
+    "What time is it in Tokyo right now?",
+    "Add 17.5 and 4.25, then tell me the result",
+]
+
+
+def stage_prompts(tool_neuron: ToolNeuron, goal: str):
+    """(system, user) messages for each stage, as the pipeline builds them."""
+    ctx = GoalContext(goal_id=uuid.uuid4().hex, goal_text=goal)
+    prefix = tool_neuron.prepare_prefix(ctx)
+    tool = tool_neuron.candidates(goal)[0]
+    params = PARAM_EXTRACTION_PROMPT.format(
+        tool_name=tool.name,
+        description=tool.description,
+        parameters="\n".join(f"- {p['name']}: {p.get('description', '')}" for p in tool.parameters),
+        error_context="",
+    )
+    interpret = "A tool returned this data for the user request:\n42\n\nFormat this data as a human-friendly answer."
+    
+    return [
+        (name, prefix, user)
+        for name, user in [
+            ("intent", INTENT_PROMPT),
+            ("capability", TOOL_CAPABILITY_PROMPT),
+            ("selection", TOOL_SELECTION_PROMPT),
+            ("params", params),
+            ("interpret", interpret),
+        ]
+    ]
+
+
+async def run_goal(session, url: str, stages, reuse: bool, slot: int):
+    """Send one goal's stages; returns (prompt tokens, prompt ms) summed."""
+    tokens, ms = 0, 0.0
+    for _, system, user in stages:
+        payload = {
+            "messages": [{"role": "system", "content": system}, {"role": "user", "content": user}],
+            "max_tokens": 1,
+            "temperature": 0.0,
+            "cache_prompt": reuse,
+        }
+        if reuse:
+            payload["id_slot"] = slot
+        
+        async with session.post(f"{url}/chat/completions", json=payload) as response:
+            response.raise_for_status()
+            timings = (await response.json()).get("timings", {})
+        
+        tokens += timings.get("prompt_n", 0)
+        ms += timings.get("prompt_ms", 0.0)
+    return tokens, ms
+
+
+def dry_run(goals):
+    print(f"{'goal':40} {'cold chars':>11} {'reuse chars':>12} {'saved':>7}")
+    for goal, stages in goals:
+        cold = sum(len(system) + len(user) for _, system, user in stages)
+        reuse = len(stages[0][1]) + sum(len(user) for _, _, user in stages)
+        print(f"{goal[:40]:40} {cold:11} {reuse:12} {1 - reuse / cold:7.0%}")
+
+
+async def benchmark(url: str, goals, slot: int):
+    async with aiohttp.ClientSession() as session:
+        print(f"{'goal':40} {'mode':6} {'prompt_n':>9} {'prompt_ms':>10}")
+        totals = {"cold": [0, 0.0], "reuse": [0, 0.0]}
+        
+        for goal, stages in goals:
+            for mode in ("cold", "reuse"):
+                tokens, ms = await run_goal(session, url, stages, reuse=(mode == "reuse"), slot=slot)
+                totals[mode][0] += tokens
+                totals[mode][1] += ms
+                print(f"{goal[:40]:40} {mode:6} {tokens:9} {ms:10.1f}")
+        
+        (cold_n, cold_ms), (reuse_n, reuse_ms) = totals["cold"], totals["reuse"]
+        print()
+        print(f"prefill tokens: {cold_n} -> {reuse_n} ({1 - reuse_n / max(cold_n, 1):.0%} fewer)")
+        print(f"prefill time:   {cold_ms:.0f}ms -> {reuse_ms:.0f}ms ({1 - reuse_ms / max(cold_ms, 1e-9):.0%} less)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=os.environ.get("LLM_BASE_URL", "http://localhost:8080/v1"))
+    parser.add_argument("--slot", type=int, default=0, help="Slot to pin reuse runs to")
+    parser.add_argument("--dry-run", action="store_true", help="Only compare prompt sizes")
+    args = parser.parse_args()
+    
+    tool_neuron = ToolNeuron(Config.for_testing())
+    goals = [(goal, stage_prompts(tool_neuron, goal)) for goal in GOALS]
+    
+    if args.dry_run:
+        dry_run(goals)
+    else:
+        asyncio.run(benchmark(args.url.rstrip("/"), goals, args.slot))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Telemetry Encoding Benchmark - CPU time and Redis bytes per goal.
+
+Encodes the events and thoughts of a synthetic goal (goal start, then a
+start/thought/complete per neuron with a large tool output, then the
+goal completion) two ways:
+    before  - asdict + JSON fields, str(value)[:200] previews, ISO
+              timestamps, thoughts as JSON objects
+    after   - Event.to_fields / Thought.to_record, Preview, numeric
+              timestamps, plus the children index members
+
+and reports CPU milliseconds and payload bytes (field names + values of
+the stream entries, both streams, and of the thought hash) per goal.
+With --redis, each encoding is also written to scratch keys and sized
+with MEMORY USAGE (deleted after).
+
+Usage:
+  python scripts/benchmarks/telemetry_encoding.py
+  python scripts/benchmarks/telemetry_encoding.py --neurons 6 --output-items 2000 --goals 200
+  python scripts/benchmarks/telemetry_encoding.py --redis localhost:6379
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+from dataclasses import asdict
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from neural_engine.v2.core import Event, EventType, Preview
+from neural_engine.v2.core.memory import Thought
+
+
+def tool_output(items: int):
+    return [{"id": i, "name": f"Activity {i}", "distance_m": 5012.4 + i, "splits": list(range(20))} for i in range(items)]
+
+
+def goal_telemetry(neurons: int, output: list, encode):
+    """(stream entries, thought hash fields) of one goal, encoded by Before or After."""
+    goal_id = str(uuid.uuid4())
+    entries, thoughts = [], {}
+    
+    entries.append(encode.event(EventType.GOAL_START, "orchestrator", goal_id, {"goal": "How far did I run this week?"}))
+    root = Thought(thought_id=f"root_{goal_id}", goal_id=goal_id, content="How far did I run this week?", thought_type="goal")
+    thoughts.update(encode.thought(root))
+    
+    for n in range(neurons):
+        entries.append(encode.event(EventType.NEURON_START, f"neuron{n}", goal_id, {"input": encode.preview("How far did I run this week?")}))
+        thought = Thought(thought_id=str(uuid.uuid4()), goal_id=goal_id, content=f"neuron{n} processing",
+                          thought_type="action", parent_id=root.thought_id, metadata={"neuron": f"neuron{n}"})
+        thoughts.update(encode.thought(thought))
+        entries.append(encode.event(EventType.NEURON_COMPLETE, f"neuron{n}", goal_id,
+                                    {"result": encode.preview(output), "duration_ms": 42, "llm_calls": []}))
+    
+    entries.append(encode.event(EventType.GOAL_COMPLETE, "orchestrator", goal_id, {"result": "You ran 42.2 km."}))
+    root.status = "completed"
+    root.metadata["result"] = "You ran 42.2 km."
+    thoughts.update(encode.thought(root))
+    return entries, thoughts
+
+
+class Before:
+    """Encoding as it was: asdict, JSON fields, str() previews, ISO timestamps."""
+    
+    @staticmethod
+    def preview(value):
+        return str(value)[:200]
+    
+    @staticmethod
+    def event(event_type, source, goal_id, data):
+        event = Event(event_type=event_type, neuron_type=source, goal_id=goal_id, metadata=data)
+        d = asdict(event)
+        d["event_type"] = event_type.value
+        d["timestamp"] = datetime.fromtimestamp(event.timestamp, timezone.utc).isoformat()
+        d = {k: v for k, v in d.items() if v is not None}
+        for key in ["metadata", "input_data", "output_data"]:
+            if d.get(key) and isinstance(d[key], (dict, list)):
+                d[key] = json.dumps(d[key])
+        return d
+    
+    @staticmethod
+    def thought(thought):
+        d = asdict(thought)
+        d["timestamp"] = datetime.fromtimestamp(thought.timestamp, timezone.utc).isoformat()
+        return {thought.thought_id: json.dumps(d)}
+
+
+class After:
+    """Fixed-schema fields and records, Preview, children index."""
+    
+    preview = Preview
+    
+    @staticmethod
+    def event(event_type, source, goal_id, data):
+        return Event(event_type=event_type, neuron_type=source, goal_id=goal_id, metadata=data).to_fields()
+    
+    @staticmethod
+    def thought(thought):
+        fields = {thought.thought_id: thought.to_record()}
+        if thought.parent_id:
+            # Children index member (score 0) in its own sorted set
+            fields[f"children:{thought.parent_id}|{thought.thought_id}"] = ""
+        return fields
+
+
+def payload_bytes(entries, thoughts) -> int:
+    stream = sum(len(k) + len(str(v)) for fields in entries for k, v in fields.items())
+    return 2 * stream + sum(len(k) + len(v) for k, v in thoughts.items())  # Global + goal stream
+
+
+def measure(encode, neurons: int, output: list, goals: int):
+    started = time.process_time()
+    for _ in range(goals):
+        entries, thoughts = goal_telemetry(neurons, output, encode)
+    cpu_ms = (time.process_time() - started) * 1000 / goals
+    return cpu_ms, payload_bytes(entries, thoughts), (entries, thoughts)
+
+
+async def redis_bytes(address: str, entries, thoughts) -> int:
+    """MEMORY USAGE of one goal's stream, hash and children index."""
+    import redis.asyncio as redis
+    
+    host, _, port = address.partition(":")
+    r = redis.Redis(host=host, port=int(port or 6379), decode_responses=True)
+    keys = ["bench:telemetry:stream", "bench:telemetry:thoughts", "bench:telemetry:children"]
+    try:
+        await r.delete(*keys)
+        for fields in entries:
+            await r.xadd(keys[0], fields)
+        for field, value in thoughts.items():
+            if field.startswith("children:"):
+                await r.zadd(keys[2], {field.split(":", 1)[1]: 0})
+            else:
+                await r.hset(keys[1], field, value)
+        sizes = [await r.memory_usage(key) or 0 for key in keys]
+        return sizes[0] * 2 + sizes[1] + sizes[2]
+    finally:
+        await r.delete(*keys)
+        await r.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--neurons", type=int, default=4, help="Neurons run per goal")
+    parser.add_argument("--output-items", type=int, default=1000, help="Items in each neuron's result")
+    parser.add_argument("--goals", type=int, default=100, help="Goals encoded per measurement")
+    parser.add_argument("--redis", default=None, help="host:port to also measure MEMORY USAGE")
+    args = parser.parse_args()
+    
+    output = tool_output(args.output_items)
+    header = f"{'encoding':10} {'cpu ms/goal':>12} {'bytes/goal':>11}"
+    if args.redis:
+        header += f" {'redis bytes':>12}"
+    print(header)
+    
+    for name, encode in (("before", Before), ("after", After)):
+        cpu_ms, size, (entries, thoughts) = measure(encode, args.neurons, output, args.goals)
+        line = f"{name:10} {cpu_ms:12.3f} {size:11}"
+        if args.redis:
+            line += f" {asyncio.run(redis_bytes(args.redis, entries, thoughts)):12}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()